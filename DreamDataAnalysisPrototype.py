@@ -19,6 +19,7 @@ import networkx as nx
 from collections import Counter
 import json
 import os
+import sys
 from cryptography.fernet import Fernet
 import logging
 import shutil
@@ -29,6 +30,9 @@ import configparser
 import plotly.express as px
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from key_rotation import RotatingCipher
+
 # Load configuration
 config = configparser.ConfigParser()
 config.read(os.path.join('C:\\START\\WOLFIE_AGI_UI\\config', 'config.ini'))
@@ -210,9 +214,7 @@ if not os.path.exists(key_file):
     key = Fernet.generate_key()
     with open(key_file, 'wb') as f:
         f.write(key)
-with open(key_file, 'rb') as f:
-    key = f.read()
-cipher = Fernet(key)
+cipher = RotatingCipher(key_file)
 
 # SQLite setup
 db_path = os.path.join(BASE_DIR, 'dreams.db')
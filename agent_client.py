@@ -14,24 +14,65 @@
 import socketio
 import json
 import time
+import random
 import logging
+import threading
 from datetime import datetime
 import configparser
 import os
+from event_envelope import EVENT_FIELDS, EventBatcher, available_codecs, encode_batch
+from io_offload import OrderedExecutor
 
 class WebNodeAgentClient:
     """Web Node Agent Client for AI agents"""
     
-    def __init__(self, agent_id, agent_name, capabilities=None, server_url='http://localhost:5001'):
+    def __init__(self, agent_id, agent_name, capabilities=None, server_url='http://localhost:5001', batch_events=True,
+                 handler_workers=4, handler_queue_size=256, handler_overflow='drop_oldest'):
         self.agent_id = agent_id
         self.agent_name = agent_name
         self.capabilities = capabilities or []
         self.server_url = server_url
-        self.sio = socketio.Client()
+        # Reconnects are ours (jittered backoff + session resume), not the library's
+        self.sio = socketio.Client(reconnection=False)
         self.connected = False
+        self.running = False
         self.current_task = ""
         self.understanding_score = 0
         self.alignment_score = 0
+        self.presence = {}
+        self.presence_version = 0
+        self.delivery_seq = 0
+        # Highest live delivery_seq skipped while a backlog replay was in progress
+        self.mailbox_seen = 0
+        self.mailbox_replaying = False
+        # Acks are cumulative and only cover messages whose handler has finished
+        self.acked_seq = 0
+        self.unfinished_seqs = set()
+        self.dropped_seqs = set()
+        self._ack_lock = threading.Lock()
+        # Batched framing is used only once the server has agreed on a codec at connect
+        self.batch_events = batch_events
+        self.envelope_codec = None
+        self.batcher = None
+        self.frames_sent = 0
+        self.events_sent = 0
+        self.bytes_sent = 0
+        # Liveness: ping only after ping_interval without other traffic; status goes out only when it changes
+        self.ping_interval = 30
+        self.last_activity = 0.0
+        self.last_status_sent = None
+        self.heartbeat_thread = None
+        # Session resumption: the server replays agent events after last_event_seq when the token is valid
+        self.resume_token = None
+        self.last_event_seq = 0
+        self.session = None
+        self.reconnect_base = 1.0
+        self.reconnect_max = 60.0
+        # Dream fragment topic filters; None receives every fragment. Re-sent with each registration
+        self.fragment_topics = None
+        # Subclass handlers run here, never on the Socket.IO receive thread; one queue per conversation
+        self.handlers = OrderedExecutor(handler_workers, handler_queue_size, handler_overflow,
+                                        name=f'agent_{agent_id}', on_drop=self.handler_dropped)
         
         # Setup logging
         logging.basicConfig(
@@ -55,19 +96,28 @@ class WebNodeAgentClient:
             # Register agent with server
             self.register_agent()
         
+        @self.sio.event
+        def connected(data):
+            """Server greeting; carries the negotiated event envelope and ping interval"""
+            self.ping_interval = data.get('heartbeat', {}).get('ping_interval', self.ping_interval)
+            envelope = data.get('envelope')
+            if envelope and self.batch_events:
+                self.envelope_codec = envelope['codec']
+                self.batcher = EventBatcher(self.send_batch, envelope.get('max_events', 64),
+                                            envelope.get('max_delay_ms', 20) / 1000.0)
+                logging.info(f"Batched events enabled ({self.envelope_codec})")
+        
         @self.sio.event
         def disconnect():
             """Handle disconnection from server"""
             self.connected = False
+            self.envelope_codec = None
             logging.info(f"Disconnected from Web Node Server")
         
         @self.sio.event
         def agent_registered(data):
             """Handle agent registration response"""
-            if data['status'] == 'success':
-                logging.info(f"Successfully registered as {self.agent_id}")
-            else:
-                logging.error(f"Failed to register: {data.get('error', 'Unknown error')}")
+            self.on_agent_registered(data)
         
         @self.sio.event
         def agent_list_updated(agents_list):
@@ -77,6 +127,27 @@ class WebNodeAgentClient:
                 if agent['agent_id'] != self.agent_id:
                     logging.info(f"  - {agent['agent_name']} ({agent['agent_id']}): {agent['status']}")
         
+        @self.sio.event
+        def presence_snapshot(snapshot):
+            """Replace the local view of agent presence"""
+            self.presence_version = snapshot['version']
+            self.presence = {agent['agent_id']: agent for agent in snapshot['agents']}
+            logging.info(f"Presence snapshot v{self.presence_version}: {len(self.presence)} agents")
+        
+        @self.sio.event
+        def presence_delta(delta):
+            """Apply one presence change, resyncing if a version was missed"""
+            if delta['version'] <= self.presence_version:
+                return
+            if delta['version'] != self.presence_version + 1:
+                self.emit_event('presence_snapshot_request', {})
+                return
+            self.presence_version = delta['version']
+            agent = delta['agent']
+            self.presence[agent['agent_id']] = agent
+            if agent['agent_id'] != self.agent_id:
+                logging.info(f"Presence update from {agent['agent_id']}: {agent.get('status', 'unknown')}")
+        
         @self.sio.event
         def status_updated(data):
             """Handle status updates from other agents"""
@@ -92,17 +163,71 @@ class WebNodeAgentClient:
                 self.current_task = data['description']
                 self.update_status('processing', self.current_task)
         
+        @self.sio.event
+        def task_assigned(data):
+            """Handle a task the dispatcher assigned to this agent"""
+            if not self.note_event_seq(data):
+                return
+            logging.info(f"Task assigned to me: {data['task_id']} - {data['description']}")
+            self.current_task = data['description']
+            self.update_status('processing', self.current_task)
+            self.handlers.submit('tasks', 'task', self.handle_task, data)
+        
+        @self.sio.event
+        def task_revoked(data):
+            """Handle a task taken back by the server (e.g. missed deadline)"""
+            if not self.note_event_seq(data):
+                return
+            logging.warning(f"Task revoked: {data['task_id']} ({data.get('reason', 'unknown')})")
+            self.current_task = ""
+            self.update_status('active')
+        
+        @self.sio.event
+        def task_escalated(data):
+            """Handle an escalation of a task assigned to this agent"""
+            if self.note_event_seq(data):
+                logging.warning(f"Task escalated: {data['task_id']} (deadline {data.get('deadline')})")
+        
         @self.sio.event
         def message_received(data):
             """Handle incoming messages"""
+            seq = data.get('delivery_seq')
+            if seq is not None:
+                if seq <= self.delivery_seq:
+                    return
+                if seq != self.delivery_seq + 1:
+                    # Missed a delivery; the server resends in order from our last seq
+                    self.mailbox_seen = max(self.mailbox_seen, seq)
+                    if not self.mailbox_replaying:
+                        self.sync_mailbox()
+                    return
             logging.info(f"Message from {data['from_agent']}: {data['content']}")
-            self.handle_message(data)
+            if seq is not None:
+                self.delivery_seq = seq
+            self.dispatch_message(data)
+        
+        @self.sio.event
+        def message_batch(batch):
+            """Handle a page of mailbox backlog; its ack, once the handlers finish, pulls the next page"""
+            for message in batch['messages']:
+                if message['delivery_seq'] > self.delivery_seq:
+                    self.delivery_seq = message['delivery_seq']
+                    self.dispatch_message(message)
+            if batch['messages']:
+                logging.info(f"Replayed {len(batch['messages'])} queued messages up to seq {batch['last_seq']}")
+            self.delivery_seq = max(self.delivery_seq, batch['last_seq'])
+            self.ack_messages(force=batch['more'])
+            if not batch['more']:
+                self.mailbox_replaying = False
+                if self.mailbox_seen > self.delivery_seq:
+                    # A live message arrived after the final page was read
+                    self.sync_mailbox()
         
         @self.sio.event
         def dream_fragment_added(data):
             """Handle new dream fragment"""
             logging.info(f"New dream fragment: {data['summary'][:50]}...")
-            self.handle_dream_fragment(data)
+            self.handlers.submit('dream_fragments', 'dream_fragment', self.handle_dream_fragment, data)
     
     def register_agent(self):
         """Register agent with the server"""
@@ -113,16 +238,146 @@ class WebNodeAgentClient:
             'status': 'active',
             'understanding_score': self.understanding_score,
             'alignment_score': self.alignment_score,
-            'current_task': self.current_task
+            'current_task': self.current_task,
+            'resume_token': self.resume_token,
+            'last_event_seq': self.last_event_seq
         }
+        if self.fragment_topics is not None:
+            registration_data['fragment_topics'] = self.fragment_topics
         
-        self.sio.emit('agent_register', registration_data)
+        self.last_status_sent = self.status_snapshot('active')
+        # The server replays the mailbox backlog after every registration
+        self.mailbox_replaying = True
+        self.emit_event('agent_register', registration_data)
         logging.info(f"Sent registration data: {registration_data}")
     
-    def update_status(self, status, current_task=None):
-        """Update agent status"""
+    def emit_event(self, event, data, callback=None):
+        """Emit through the batch envelope when negotiated, otherwise as a plain event"""
+        self.last_activity = time.monotonic()
+        if self.envelope_codec and self.batcher is not None and callback is None and event in EVENT_FIELDS:
+            self.batcher.add(event, data)
+            return
+        if self.batcher is not None:
+            # Anything already batched must reach the server first
+            self.batcher.flush()
+        self.sio.emit(event, data, callback=callback)
+    
+    def send_batch(self, events):
+        """Send one event_batch frame (called by the batcher)"""
+        codec = self.envelope_codec
+        if codec is None:
+            # Envelope lost with the connection; fall back to plain events
+            for event, data in events:
+                self.sio.emit(event, data)
+            return
+        frame = encode_batch(events, codec)
+        self.sio.emit('event_batch', frame)
+        self.frames_sent += 1
+        self.events_sent += len(events)
+        self.bytes_sent += len(frame)
+    
+    def on_agent_registered(self, data):
+        """Keep the resume token from a registration response (extend in subclasses, calling super)"""
+        if data['status'] == 'success':
+            self.resume_token = data.get('resume_token', self.resume_token)
+            self.note_session(data)
+            if data.get('resumed'):
+                logging.info(f"Resumed session as {self.agent_id}")
+            else:
+                logging.info(f"Successfully registered as {self.agent_id}")
+        else:
+            logging.error(f"Failed to register: {data.get('error', 'Unknown error')}")
+    
+    def sync_mailbox(self):
+        """Ask the server to resend mailbox messages after our last processed seq"""
+        self.mailbox_replaying = True
+        self.emit_event('mailbox_sync', {'agent_id': self.agent_id, 'after_seq': self.delivery_seq})
+    
+    def note_session(self, data):
+        """A new session epoch (new token, server restart) starts event seqs over"""
+        session = data.get('session')
+        if session is not None and session != self.session:
+            self.session = session
+            self.last_event_seq = 0
+    
+    def note_event_seq(self, data):
+        """Track agent-targeted event seqs; False for a duplicate already handled (replay overlap)"""
+        # Events of a new session can arrive before the registration ack, so they carry the epoch too
+        self.note_session(data)
+        seq = data.get('event_seq')
+        if seq is None:
+            return True
+        if seq <= self.last_event_seq:
+            return False
+        self.last_event_seq = seq
+        return True
+    
+    def dispatch_message(self, data):
+        """Queue handle_message behind earlier messages from the same sender"""
+        seq = data.get('delivery_seq')
+        if seq is not None:
+            with self._ack_lock:
+                self.unfinished_seqs.add(seq)
+        self.handlers.submit(f"from:{data.get('from_agent')}", 'message', self.run_message_handler, data)
+    
+    def run_message_handler(self, data):
+        """Run handle_message on a handler thread, then let the ack move past it"""
+        try:
+            self.handle_message(data)
+        finally:
+            seq = data.get('delivery_seq')
+            if seq is not None:
+                with self._ack_lock:
+                    self.unfinished_seqs.discard(seq)
+                self.ack_messages()
+    
+    def handler_dropped(self, job, args, kwargs):
+        """A queued message was discarded on overflow; it stays unacked so the server resends it"""
+        seq = args[0].get('delivery_seq') if job == 'message' else None
+        if seq is None:
+            return
+        with self._ack_lock:
+            self.dropped_seqs.add(seq)
+        logging.warning(f"Handler queue full; message seq {seq} will be redelivered")
+        self.ack_messages()
+    
+    def ack_messages(self, force=False):
+        """Cumulative ack up to the first message whose handler has not finished
+        
+        During a replay the ack waits for the whole page, since each ack pulls the next one.
+        Once only dropped messages are left, the ack point is also where the mailbox resync starts.
+        """
+        with self._ack_lock:
+            resync = bool(self.unfinished_seqs) and self.unfinished_seqs <= self.dropped_seqs
+            if self.unfinished_seqs:
+                seq = min(self.unfinished_seqs) - 1
+            else:
+                seq = self.delivery_seq
+            if resync:
+                # Everything after the first dropped message is handled again (at-least-once)
+                self.delivery_seq = seq
+                self.unfinished_seqs.clear()
+                self.dropped_seqs.clear()
+            elif self.mailbox_replaying and self.unfinished_seqs:
+                return
+            if seq <= self.acked_seq and not force:
+                return
+            self.acked_seq = max(self.acked_seq, seq)
+        self.emit_event('message_ack', {'agent_id': self.agent_id, 'seq': seq})
+        if resync:
+            self.sync_mailbox()
+    
+    def status_snapshot(self, status):
+        return (status, self.current_task, self.understanding_score, self.alignment_score)
+    
+    def update_status(self, status, current_task=None, callback=None, force=False):
+        """Send agent status if it changed (or force); callback fires when the server has handled it"""
         if current_task:
             self.current_task = current_task
+        snapshot = self.status_snapshot(status)
+        if snapshot == self.last_status_sent and not force:
+            return
+        self.last_status_sent = snapshot
         
         status_data = {
             'agent_id': self.agent_id,
@@ -133,11 +388,11 @@ class WebNodeAgentClient:
             'timestamp': datetime.now().isoformat()
         }
         
-        self.sio.emit('status_update', status_data)
+        self.emit_event('status_update', status_data, callback=callback)
         logging.info(f"Status updated: {status} - {current_task}")
     
-    def send_message(self, to_agent, content, message_type='text'):
-        """Send message to another agent"""
+    def send_message(self, to_agent, content, message_type='text', callback=None):
+        """Send message to another agent; callback fires when the server has handled it"""
         message_data = {
             'from_agent': self.agent_id,
             'to_agent': to_agent,
@@ -145,7 +400,7 @@ class WebNodeAgentClient:
             'message_type': message_type
         }
         
-        self.sio.emit('send_message', message_data)
+        self.emit_event('send_message', message_data, callback=callback)
         logging.info(f"Message sent to {to_agent}: {content[:50]}...")
     
     def broadcast_message(self, content, message_type='text'):
@@ -163,17 +418,37 @@ class WebNodeAgentClient:
             'emotional_vibe': emotional_vibe
         }
         
-        self.sio.emit('dream_fragment', fragment_data)
+        self.emit_event('dream_fragment', fragment_data)
         logging.info(f"Dream fragment submitted: {summary[:50]}...")
     
+    def complete_task(self, task_id, status='completed'):
+        """Report an assigned task as completed or failed so the dispatcher frees this agent"""
+        self.emit_event('task_complete', {'agent_id': self.agent_id, 'task_id': task_id, 'status': status})
+        logging.info(f"Task {task_id} {status}")
+        self.current_task = ""
+        self.update_status('active')
+    
+    def subscribe_fragments(self, tags=None, themes=None, emotional_vibe=None):
+        """Receive only dream fragments sharing at least one tag (symbol), theme or emotional vibe"""
+        self.fragment_topics = {'tags': tags or [], 'themes': themes or [], 'emotional_vibe': emotional_vibe or []}
+        if self.connected:
+            self.emit_event('subscribe_fragments', self.fragment_topics)
+        logging.info(f"Subscribed to dream fragments: {self.fragment_topics}")
+    
+    def unsubscribe_fragments(self):
+        """Receive every dream fragment again"""
+        self.fragment_topics = None
+        if self.connected:
+            self.emit_event('unsubscribe_fragments', {})
+    
     def join_room(self, room_name):
         """Join a specific room"""
-        self.sio.emit('join_room', {'room': room_name})
+        self.emit_event('join_room', {'room': room_name})
         logging.info(f"Joined room: {room_name}")
     
     def leave_room(self, room_name):
         """Leave a specific room"""
-        self.sio.emit('leave_room', {'room': room_name})
+        self.emit_event('leave_room', {'room': room_name})
         logging.info(f"Left room: {room_name}")
     
     def handle_message(self, data):
@@ -184,40 +459,82 @@ class WebNodeAgentClient:
         """Handle new dream fragments (override in subclasses)"""
         pass
     
-    def start_heartbeat(self, interval=30):
-        """Start heartbeat to keep connection alive"""
+    def handle_task(self, data):
+        """Handle an assigned task (override in subclasses; call complete_task when done)"""
+        pass
+    
+    def ping(self, callback=None):
+        """Lightweight liveness signal; the server only refreshes the presence TTL"""
+        self.emit_event('agent_ping', {'agent_id': self.agent_id}, callback=callback)
+    
+    def start_heartbeat(self, interval=None):
+        """Start the liveness thread: a ping after each idle ping_interval, nothing while traffic flows"""
+        if interval:
+            self.ping_interval = interval
+        if self.heartbeat_thread is not None and self.heartbeat_thread.is_alive():
+            return
+        
         def heartbeat():
-            while self.connected:
-                self.update_status('active', self.current_task)
-                time.sleep(interval)
+            while self.running:
+                time.sleep(1)
+                if self.connected and time.monotonic() - self.last_activity >= self.ping_interval:
+                    try:
+                        self.ping()
+                    except Exception as e:
+                        logging.error(f"Ping failed: {str(e)}")
         
-        import threading
-        heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
-        heartbeat_thread.start()
-        logging.info(f"Heartbeat started with {interval}s interval")
+        self.heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+        self.heartbeat_thread.start()
+        logging.info(f"Heartbeat started, ping after {self.ping_interval}s idle")
     
     def connect_to_server(self):
         """Connect to the Web Node Server"""
         try:
-            self.sio.connect(self.server_url)
+            self.sio.connect(self.server_url, auth={'codecs': available_codecs() if self.batch_events else []})
+            self.running = True
             self.start_heartbeat()
             return True
         except Exception as e:
             logging.error(f"Failed to connect to server: {str(e)}")
             return False
     
+    def reconnect(self):
+        """Reconnect with jittered exponential backoff; registration then resumes the session"""
+        attempt = 0
+        while self.running and not self.connected:
+            delay = min(self.reconnect_max, self.reconnect_base * (2 ** attempt))
+            # Equal jitter: half fixed, half random, so a fleet dropped together does not return together
+            time.sleep(delay / 2 + random.uniform(0, delay / 2))
+            attempt += 1
+            try:
+                if self.sio.connected:
+                    self.sio.disconnect()
+                self.sio.connect(self.server_url, auth={'codecs': available_codecs() if self.batch_events else []})
+                logging.info(f"Reconnected after {attempt} attempts")
+                return True
+            except Exception as e:
+                logging.warning(f"Reconnect attempt {attempt} failed: {str(e)}")
+        return False
+    
     def disconnect_from_server(self):
         """Disconnect from the Web Node Server"""
+        self.running = False
         if self.connected:
+            if self.batcher is not None:
+                self.batcher.flush()
             self.sio.disconnect()
             logging.info("Disconnected from server")
+        # Queued handler work is dropped with the client; running handlers finish on their own
+        self.handlers.shutdown(wait=False)
     
     def run(self):
-        """Main run loop"""
+        """Main run loop; reconnects until stopped"""
         if self.connect_to_server():
             try:
                 # Keep the client running
-                while self.connected:
+                while self.running:
+                    if not self.connected:
+                        self.reconnect()
                     time.sleep(1)
             except KeyboardInterrupt:
                 logging.info("Shutting down agent client...")
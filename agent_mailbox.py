@@ -0,0 +1,104 @@
+# ID: [WOLFIE_AGI_UI_MAILBOX_20250923_001]
+# SUPERPOSITIONALLY: [dream_data_analysis, quantum_tabs, multi_agent_coordination, bridge_crew_tracking, web_node_system, offline_delivery]
+# DATE: 2025-09-23
+# TITLE: agent_mailbox.py — Per-Agent Offline Mailbox with Acknowledged Delivery
+# WHO: WOLFIE (Eric) - Project Architect & Dream Architect
+# WHAT: Delivery sequence numbers, client acks and paged backlog replay for agent-to-agent messages
+# WHERE: C:\START\WOLFIE_AGI_UI\
+# WHEN: 2025-09-23, 11:00 AM CDT (Sioux Falls Timezone)
+# WHY: Messages sent to an offline agent were stored but never delivered
+# HOW: mailbox table keyed (agent_id, seq); acked rows pruned; replay sends one page per ack so the loop never floods
+# HELP: Contact WOLFIE for message delivery issues
+# AGAPE: Love, patience, kindness, humility in multi-agent collaboration
+
+import json
+import logging
+from datetime import datetime
+from db_connection import get_connection
+
+
+class Mailbox:
+    """Durable per-agent message queue; delivery is at-least-once, clients dedupe by delivery_seq"""
+
+    def __init__(self, db_path, writer, backend, page_size=100):
+        self.db_path = db_path
+        self.writer = writer
+        self.backend = backend
+        self.page_size = page_size
+        self._floors = {}
+        self.replaying = set()
+
+    def init_tables(self, conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS mailbox (
+                agent_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                message TEXT,
+                created_at TEXT,
+                PRIMARY KEY (agent_id, seq)
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS mailbox_acks (
+                agent_id TEXT PRIMARY KEY,
+                acked_seq INTEGER NOT NULL
+            )
+        ''')
+
+    def load_floors(self, conn):
+        """Read the highest persisted seq of every agent once at startup, so store() never touches SQLite"""
+        rows = conn.execute('''
+            SELECT agent_id, MAX(seq) FROM (
+                SELECT agent_id, MAX(seq) AS seq FROM mailbox GROUP BY agent_id
+                UNION ALL SELECT agent_id, acked_seq FROM mailbox_acks
+            ) GROUP BY agent_id
+        ''').fetchall()
+        self._floors = {agent_id: seq or 0 for agent_id, seq in rows}
+
+    def store(self, agent_id, message):
+        """Assign the next delivery seq for agent_id and queue the message durably"""
+        seq = self.backend.incr('mailbox_seq', agent_id, self._floors.get(agent_id, 0))
+        message = dict(message, delivery_seq=seq)
+        self.writer.enqueue('''
+            INSERT OR REPLACE INTO mailbox (agent_id, seq, message, created_at)
+            VALUES (?, ?, ?, ?)
+        ''', (agent_id, seq, json.dumps(message), datetime.now().isoformat()))
+        return message
+
+    def ack(self, agent_id, seq):
+        """Record a cumulative ack and drop everything up to it"""
+        self.writer.enqueue_coalesced(('mailbox_ack', agent_id), '''
+            INSERT INTO mailbox_acks (agent_id, acked_seq) VALUES (?, ?)
+            ON CONFLICT(agent_id) DO UPDATE SET acked_seq = MAX(acked_seq, excluded.acked_seq)
+        ''', (agent_id, seq))
+        self.writer.enqueue_coalesced(('mailbox_prune', agent_id),
+                                      'DELETE FROM mailbox WHERE agent_id = ? AND seq <= ?', (agent_id, seq))
+
+    def next_page(self, agent_id, after_seq=None):
+        """Next page of committed undelivered messages; returns (messages, last_seq, more)
+
+        Rows still in the write-behind queue are not read here: an online agent gets them live,
+        and the client resyncs when a live delivery_seq is past the replayed ones.
+        """
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        if after_seq is None:
+            row = cursor.execute('SELECT acked_seq FROM mailbox_acks WHERE agent_id = ?', (agent_id,)).fetchone()
+            after_seq = row[0] if row else 0
+        cursor.execute('''
+            SELECT seq, message FROM mailbox WHERE agent_id = ? AND seq > ?
+            ORDER BY seq LIMIT ?
+        ''', (agent_id, after_seq, self.page_size + 1))
+        rows = cursor.fetchall()
+        conn.close()
+        more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        messages = [json.loads(row[1]) for row in rows]
+        last_seq = rows[-1][0] if rows else after_seq
+        if more:
+            self.replaying.add(agent_id)
+        else:
+            self.replaying.discard(agent_id)
+        if messages:
+            logging.info(f"Mailbox replay for {agent_id}: {len(messages)} messages up to seq {last_seq}")
+        return messages, last_seq, more
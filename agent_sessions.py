@@ -0,0 +1,71 @@
+# ID: [WOLFIE_AGI_UI_AGENT_SESSIONS_20250923_001]
+# SUPERPOSITIONALLY: [dream_data_analysis, quantum_tabs, multi_agent_coordination, bridge_crew_tracking, web_node_system, real_time_communication, session_resumption]
+# DATE: 2025-09-23
+# TITLE: agent_sessions.py — Resume Tokens and Missed-Event Replay for Web Node Agents
+# WHO: WOLFIE (Eric) - Project Architect & Dream Architect
+# WHAT: Per-agent resume tokens plus a bounded, sequenced log of events pushed to each agent
+# WHERE: C:\START\WOLFIE_AGI_UI\
+# WHEN: 2025-09-23, 11:00 AM CDT (Sioux Falls Timezone)
+# WHY: A short network blip must not cost an agent the task assignments and broadcasts sent meanwhile
+# HOW: Tokens, session epochs and event_seq counters live in the shared state backend; events are kept in a ring per agent
+# HELP: Contact WOLFIE for reconnect or session resumption issues
+# AGAPE: Love, patience, kindness, humility in multi-agent collaboration
+
+import secrets
+import threading
+from collections import deque
+from datetime import datetime
+
+
+class SessionRegistry:
+    """Issues resume tokens and remembers recent agent-targeted events for replay"""
+
+    def __init__(self, backend, history_size=200):
+        self.backend = backend
+        self.history_size = history_size
+        self.events = {}
+        self.disconnected = {}
+        self._lock = threading.Lock()
+
+    def issue(self, agent_id):
+        token = secrets.token_urlsafe(24)
+        self.backend.put('resume_tokens', agent_id, token)
+        # A new session gets a new epoch; clients restart their event_seq baseline when it changes
+        self.backend.put('session_epochs', agent_id, secrets.token_hex(4))
+        return token
+
+    def epoch(self, agent_id):
+        return self.backend.get('session_epochs', agent_id)
+
+    def verify(self, agent_id, token):
+        """True when token is the agent's current resume token"""
+        if not token:
+            return False
+        current = self.backend.get('resume_tokens', agent_id)
+        return current is not None and secrets.compare_digest(current, token)
+
+    def record(self, agent_id, event, data):
+        """Stamp an outgoing agent event with its session epoch and next event_seq and keep it for replay
+
+        The counter is in the backend, so seqs keep rising across restarts and workers.
+        """
+        with self._lock:
+            seq = self.backend.incr('event_seqs', agent_id)
+            data = dict(data, event_seq=seq, session=self.epoch(agent_id))
+            log = self.events.get(agent_id)
+            if log is None:
+                log = self.events[agent_id] = deque(maxlen=self.history_size)
+            log.append((seq, event, data))
+            return data
+
+    def missed(self, agent_id, after_seq):
+        """Events with event_seq > after_seq still held for the agent, oldest first"""
+        with self._lock:
+            return [(event, data) for seq, event, data in self.events.get(agent_id, ()) if seq > after_seq]
+
+    def mark_disconnected(self, agent_id):
+        self.disconnected[agent_id] = datetime.now().isoformat()
+
+    def resume(self, agent_id):
+        """Returns when the agent's previous session dropped (ISO time), or None"""
+        return self.disconnected.pop(agent_id, None)
@@ -0,0 +1,354 @@
+# ID: [WOLFIE_AGI_UI_AGENT_SWARM_20250923_001]
+# SUPERPOSITIONALLY: [dream_data_analysis, quantum_tabs, multi_agent_coordination, bridge_crew_tracking, web_node_system, load_testing, performance]
+# DATE: 2025-09-23
+# TITLE: agent_swarm.py — Agent Swarm Load Generator for the Web Node Server
+# WHO: WOLFIE (Eric) - Project Architect & Dream Architect
+# WHAT: Runs N simulated WebNodeAgentClient agents and reports latency, throughput, server load and drops
+# WHERE: C:\START\WOLFIE_AGI_UI\
+# WHEN: 2025-09-23, 11:05 AM CDT (Sioux Falls Timezone)
+# WHY: Find out how many agents one web_node_server can carry, and compare runs over time
+# HOW: Poisson-scheduled heartbeats, direct messages and fragments; acks and echoes timed; results saved as JSON
+# HELP: Contact WOLFIE for load testing or capacity planning questions
+# AGAPE: Love, patience, kindness, humility in multi-agent collaboration
+
+import os
+import sys
+import json
+import time
+import heapq
+import random
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import requests
+from agent_client import WebNodeAgentClient
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile_summary(samples):
+    """Latency summary in milliseconds (nearest-rank percentiles)"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    summary = {f'p{p}': round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000, 3)
+               for p in PERCENTILES}
+    summary['max'] = round(ordered[-1] * 1000, 3)
+    summary['mean'] = round(sum(ordered) / len(ordered) * 1000, 3)
+    return summary
+
+
+class SwarmStats:
+    """Thread-safe counters and latency samples shared by every simulated agent"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sent = {}
+        self.completed = {}
+        self.latencies = {}
+        self.pending = {}
+        self.errors = {}
+
+    def start(self, kind, probe):
+        with self._lock:
+            self.sent[kind] = self.sent.get(kind, 0) + 1
+            self.pending.setdefault(kind, {})[probe] = time.perf_counter()
+
+    def finish(self, kind, probe):
+        """Record the first completion of a probe; repeats (broadcast copies, replays) are ignored"""
+        with self._lock:
+            started = self.pending.get(kind, {}).pop(probe, None)
+            if started is None:
+                return
+            self.completed[kind] = self.completed.get(kind, 0) + 1
+            self.latencies.setdefault(kind, []).append(time.perf_counter() - started)
+
+    def error(self, kind):
+        with self._lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def outstanding(self):
+        with self._lock:
+            return sum(len(probes) for probes in self.pending.values())
+
+    def report(self, duration):
+        with self._lock:
+            report = {}
+            for kind, sent in self.sent.items():
+                report[kind] = {
+                    'sent': sent,
+                    'completed': self.completed.get(kind, 0),
+                    'dropped': len(self.pending.get(kind, {})),
+                    'errors': self.errors.get(kind, 0),
+                    'throughput_per_s': round(self.completed.get(kind, 0) / duration, 2) if duration else 0,
+                    'latency_ms': percentile_summary(self.latencies.get(kind, []))
+                }
+            return report
+
+
+class ServerSampler:
+    """Samples CPU and RSS of the server process (needs psutil and the server pid)"""
+
+    def __init__(self, pid, interval=1.0):
+        self.interval = interval
+        self.samples = []
+        self.process = psutil.Process(pid) if psutil is not None and pid else None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.process is None:
+            return
+        self.process.cpu_percent(None)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.samples.append((self.process.cpu_percent(None), self.process.memory_info().rss))
+            except psutil.Error as e:
+                logging.error(f"Error sampling server process: {str(e)}")
+                return
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def report(self):
+        if self.process is None:
+            return {'available': False,
+                    'reason': 'psutil not installed' if psutil is None else 'no --server-pid given'}
+        if not self.samples:
+            return {'available': True, 'samples': 0}
+        cpu = [sample[0] for sample in self.samples]
+        rss = [sample[1] / (1024 * 1024) for sample in self.samples]
+        return {
+            'available': True,
+            'samples': len(self.samples),
+            'cpu_percent_mean': round(sum(cpu) / len(cpu), 1),
+            'cpu_percent_max': round(max(cpu), 1),
+            'rss_mb_start': round(rss[0], 1),
+            'rss_mb_max': round(max(rss), 1),
+            'rss_mb_end': round(rss[-1], 1)
+        }
+
+
+class SwarmAgent(WebNodeAgentClient):
+    """Simulated agent: same wire protocol as a real agent, with every round trip timed"""
+
+    def __init__(self, index, stats, server_url):
+        self.stats = stats
+        super().__init__(
+            agent_id=f'SWARM_{index:05d}',
+            agent_name=f'Swarm Agent {index}',
+            capabilities=['load_test'],
+            server_url=server_url
+        )
+
+    def on_agent_registered(self, data):
+        super().on_agent_registered(data)
+        if data['status'] == 'success':
+            self.stats.finish('register', self.agent_id)
+        else:
+            self.stats.error('register')
+
+    def register_agent(self):
+        self.stats.start('register', self.agent_id)
+        super().register_agent()
+
+    def heartbeat(self, probe):
+        self.stats.start('heartbeat', probe)
+        self.ping(callback=lambda *args: self.stats.finish('heartbeat', probe))
+
+    def probe_message(self, to_agent, probe):
+        self.stats.start('message_ack', probe)
+        self.stats.start('message_delivery', probe)
+        self.send_message(to_agent, f'swarm-probe {probe}',
+                          callback=lambda *args: self.stats.finish('message_ack', probe))
+
+    def handle_message(self, data):
+        content = data.get('content', '')
+        if content.startswith('swarm-probe '):
+            self.stats.finish('message_delivery', content.split(' ', 1)[1])
+
+    def handle_dream_fragment(self, data):
+        summary = data.get('summary', '')
+        if summary.startswith('swarm-probe '):
+            self.stats.finish('fragment_delivery', summary.split(' ', 1)[1])
+
+
+class AgentSwarm:
+    """Connects the agents, drives Poisson-distributed traffic and collects the report"""
+
+    def __init__(self, server_url, agents, duration, heartbeat_interval, message_rate, fragment_rate,
+                 ramp_seconds=5.0, drain_seconds=10.0, server_pid=None, seed=None):
+        self.server_url = server_url
+        self.agent_count = agents
+        self.duration = duration
+        self.heartbeat_interval = heartbeat_interval
+        self.message_rate = message_rate
+        self.fragment_rate = fragment_rate
+        self.ramp_seconds = ramp_seconds
+        self.drain_seconds = drain_seconds
+        self.random = random.Random(seed)
+        self.stats = SwarmStats()
+        self.sampler = ServerSampler(server_pid)
+        self.agents = []
+        self.connect_failures = 0
+        self.http = requests.Session()
+        self.rest_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='swarm_rest')
+        self._probe = 0
+
+    def next_probe(self):
+        self._probe += 1
+        return str(self._probe)
+
+    def connect_agents(self):
+        delay = self.ramp_seconds / self.agent_count if self.agent_count else 0
+        for index in range(self.agent_count):
+            agent = SwarmAgent(index, self.stats, self.server_url)
+            # Same path as a real agent: codec negotiation, heartbeat and session state
+            if agent.connect_to_server():
+                self.agents.append(agent)
+            else:
+                self.connect_failures += 1
+                logging.error(f"Swarm agent {agent.agent_id} failed to connect")
+            time.sleep(delay)
+
+    def post_fragment(self, agent, probe):
+        self.stats.start('fragment_post', probe)
+        self.stats.start('fragment_delivery', probe)
+        try:
+            response = self.http.post(f'{self.server_url}/api/dream_fragments', json={
+                'agent_id': agent.agent_id,
+                'summary': f'swarm-probe {probe}',
+                'themes': 'load_test'
+            }, timeout=30)
+            response.raise_for_status()
+            self.stats.finish('fragment_post', probe)
+        except Exception as e:
+            self.stats.error('fragment_post')
+            logging.error(f"Fragment post failed: {str(e)}")
+
+    def _interval(self, rate):
+        return self.random.expovariate(rate) if rate > 0 else None
+
+    def drive(self):
+        """Single scheduler thread issuing every agent's events at their due times"""
+        start = time.perf_counter()
+        end = start + self.duration
+        schedule = []
+        for index, agent in enumerate(self.agents):
+            for kind, rate in (('heartbeat', 1.0 / self.heartbeat_interval if self.heartbeat_interval > 0 else 0),
+                               ('message', self.message_rate), ('fragment', self.fragment_rate)):
+                interval = self._interval(rate)
+                if interval is not None:
+                    heapq.heappush(schedule, (start + interval, index, kind, rate))
+
+        while schedule:
+            due, index, kind, rate = heapq.heappop(schedule)
+            if due >= end:
+                continue
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            agent = self.agents[index]
+            if agent.connected:
+                if kind == 'heartbeat':
+                    agent.heartbeat(self.next_probe())
+                elif kind == 'message' and len(self.agents) > 1:
+                    target = self.agents[(index + self.random.randrange(1, len(self.agents))) % len(self.agents)]
+                    agent.probe_message(target.agent_id, self.next_probe())
+                elif kind == 'fragment':
+                    self.rest_pool.submit(self.post_fragment, agent, self.next_probe())
+            heapq.heappush(schedule, (due + self._interval(rate), index, kind, rate))
+        return time.perf_counter() - start
+
+    def run(self):
+        started_at = datetime.now().isoformat()
+        self.sampler.start()
+        self.connect_agents()
+        elapsed = self.drive()
+
+        # Give in-flight acks and deliveries a chance before counting them as dropped
+        drain_end = time.perf_counter() + self.drain_seconds
+        while self.stats.outstanding() and time.perf_counter() < drain_end:
+            time.sleep(0.1)
+        self.rest_pool.shutdown(wait=True)
+        self.sampler.stop()
+
+        disconnected = sum(1 for agent in self.agents if not agent.connected)
+        for agent in self.agents:
+            agent.disconnect_from_server()
+
+        return {
+            'started_at': started_at,
+            'server_url': self.server_url,
+            'config': {
+                'agents': self.agent_count,
+                'duration_s': self.duration,
+                'heartbeat_interval_s': self.heartbeat_interval,
+                'message_rate_per_agent': self.message_rate,
+                'fragment_rate_per_agent': self.fragment_rate,
+                'ramp_s': self.ramp_seconds,
+                'drain_s': self.drain_seconds
+            },
+            'elapsed_s': round(elapsed, 3),
+            'connected_agents': len(self.agents),
+            'connect_failures': self.connect_failures,
+            'disconnected_during_run': disconnected,
+            'events': self.stats.report(elapsed),
+            'server': self.sampler.report()
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load-test a web_node_server with simulated agents')
+    parser.add_argument('--server', default='http://localhost:5001')
+    parser.add_argument('--agents', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=60, help='seconds of traffic after ramp-up')
+    parser.add_argument('--heartbeat-interval', type=float, default=30, help='seconds between heartbeats per agent')
+    parser.add_argument('--message-rate', type=float, default=0.1, help='direct messages per second per agent')
+    parser.add_argument('--fragment-rate', type=float, default=0.01, help='dream fragments per second per agent')
+    parser.add_argument('--ramp', type=float, default=5, help='seconds over which agents connect')
+    parser.add_argument('--drain', type=float, default=10, help='seconds to wait for in-flight events')
+    parser.add_argument('--server-pid', type=int, help='pid of web_node_server for CPU/RSS sampling (needs psutil)')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--output', help='result file (default swarm_results/swarm_<timestamp>.json)')
+    args = parser.parse_args(argv)
+
+    # The first basicConfig wins, so agents share one quiet log instead of one file each
+    logging.basicConfig(filename='agent_swarm.log', level=logging.WARNING,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    swarm = AgentSwarm(args.server, args.agents, args.duration, args.heartbeat_interval,
+                       args.message_rate, args.fragment_rate, ramp_seconds=args.ramp,
+                       drain_seconds=args.drain, server_pid=args.server_pid, seed=args.seed)
+    print(f"Starting {args.agents} swarm agents against {args.server}...")
+    results = swarm.run()
+
+    output = args.output or os.path.join('swarm_results', f"swarm_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    for kind, summary in sorted(results['events'].items()):
+        latency = summary['latency_ms']
+        print(f"{kind:18} sent={summary['sent']:<7} dropped={summary['dropped']:<5} "
+              f"{summary['throughput_per_s']}/s p50={latency.get('p50')}ms p99={latency.get('p99')}ms")
+    print(f"Results saved to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
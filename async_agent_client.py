@@ -0,0 +1,427 @@
+# ID: [WOLFIE_AGI_UI_ASYNC_AGENT_CLIENT_20250923_001]
+# SUPERPOSITIONALLY: [dream_data_analysis, quantum_tabs, multi_agent_coordination, bridge_crew_tracking, web_node_system, real_time_communication, asyncio]
+# DATE: 2025-09-23
+# TITLE: async_agent_client.py — Asyncio Agent Client and Multi-Agent Host
+# WHO: WOLFIE (Eric) - Project Architect & Dream Architect
+# WHAT: Async variant of WebNodeAgentClient plus a host running hundreds of agents on one event loop
+# WHERE: C:\START\WOLFIE_AGI_UI\
+# WHEN: 2025-09-23, 11:05 AM CDT (Sioux Falls Timezone)
+# WHY: One thread set and one presence copy per agent does not scale past a few dozen agents per process
+# HOW: socketio.AsyncClient per agent over a shared HTTP session; the host runs liveness and reconnects for all agents in one task
+# HELP: Contact WOLFIE for agent hosting or asyncio integration issues
+# AGAPE: Love, patience, kindness, humility in multi-agent collaboration
+
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+import inspect
+from datetime import datetime
+import socketio
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncWebNodeAgent:
+    """Asyncio agent with the WebNodeAgentClient API and override contract
+
+    Subclasses override handle_message / handle_dream_fragment / handle_task, either as plain
+    methods or as coroutines. Outbound calls (update_status, send_message, ...) schedule the
+    emit and return it as an awaitable, so they work from both kinds of override.
+    """
+
+    def __init__(self, agent_id, agent_name, capabilities=None):
+        self.agent_id = agent_id
+        self.agent_name = agent_name
+        self.capabilities = capabilities or []
+        self.host = None
+        self.sio = None
+        self.connected = False
+        self.current_task = ""
+        self.understanding_score = 0
+        self.alignment_score = 0
+        self.delivery_seq = 0
+        # Highest live delivery_seq skipped while a backlog replay was in progress
+        self.mailbox_seen = 0
+        self.mailbox_replaying = False
+        self.last_event_seq = 0
+        self.session = None
+        self.resume_token = None
+        self.fragment_topics = None
+        self.last_activity = 0.0
+        self.last_status_sent = None
+        self.reconnect_attempt = 0
+        self.next_reconnect = 0.0
+
+    @property
+    def presence(self):
+        """Presence is shared by every agent on the host instead of copied per agent"""
+        return self.host.presence if self.host is not None else {}
+
+    def attach(self, host, sio):
+        self.host = host
+        self.sio = sio
+        sio.on('connect', self._on_connect)
+        sio.on('disconnect', self._on_disconnect)
+        sio.on('agent_registered', self._on_agent_registered)
+        sio.on('presence_snapshot', host.apply_presence_snapshot)
+        sio.on('presence_delta', self._on_presence_delta)
+        sio.on('task_assigned', self._on_task_assigned)
+        sio.on('task_revoked', self._on_task_revoked)
+        sio.on('task_escalated', self._on_task_escalated)
+        sio.on('message_received', self._on_message_received)
+        sio.on('message_batch', self._on_message_batch)
+        sio.on('dream_fragment_added', self._on_dream_fragment_added)
+
+    # Outbound
+
+    def emit_event(self, event, data):
+        """Schedule an emit; tasks start in creation order, so emits keep their order"""
+        self.last_activity = time.monotonic()
+        return asyncio.ensure_future(self.sio.emit(event, data))
+
+    def register_agent(self):
+        self.last_status_sent = self.status_snapshot('active')
+        registration_data = {
+            'agent_id': self.agent_id,
+            'agent_name': self.agent_name,
+            'capabilities': self.capabilities,
+            'status': 'active',
+            'understanding_score': self.understanding_score,
+            'alignment_score': self.alignment_score,
+            'current_task': self.current_task,
+            'resume_token': self.resume_token,
+            'last_event_seq': self.last_event_seq
+        }
+        if self.fragment_topics is not None:
+            registration_data['fragment_topics'] = self.fragment_topics
+        # The server replays the mailbox backlog after every registration
+        self.mailbox_replaying = True
+        return self.emit_event('agent_register', registration_data)
+
+    def sync_mailbox(self):
+        """Ask the server to resend mailbox messages after our last processed seq"""
+        self.mailbox_replaying = True
+        return self.emit_event('mailbox_sync', {'agent_id': self.agent_id, 'after_seq': self.delivery_seq})
+
+    def status_snapshot(self, status):
+        return (status, self.current_task, self.understanding_score, self.alignment_score)
+
+    def update_status(self, status, current_task=None, force=False):
+        """Send agent status if it changed (or force)"""
+        if current_task:
+            self.current_task = current_task
+        snapshot = self.status_snapshot(status)
+        if snapshot == self.last_status_sent and not force:
+            return self.host.done()
+        self.last_status_sent = snapshot
+        return self.emit_event('status_update', {
+            'agent_id': self.agent_id,
+            'status': status,
+            'current_task': self.current_task,
+            'understanding_score': self.understanding_score,
+            'alignment_score': self.alignment_score,
+            'timestamp': datetime.now().isoformat()
+        })
+
+    def send_message(self, to_agent, content, message_type='text'):
+        return self.emit_event('send_message', {
+            'from_agent': self.agent_id,
+            'to_agent': to_agent,
+            'content': content,
+            'message_type': message_type
+        })
+
+    def broadcast_message(self, content, message_type='text'):
+        return self.send_message('broadcast', content, message_type)
+
+    def submit_dream_fragment(self, summary, symbols="", themes="", ai_connection="", emotional_vibe=""):
+        return self.emit_event('dream_fragment', {
+            'agent_id': self.agent_id,
+            'summary': summary,
+            'symbols': symbols,
+            'themes': themes,
+            'ai_connection': ai_connection,
+            'emotional_vibe': emotional_vibe
+        })
+
+    def complete_task(self, task_id, status='completed'):
+        future = self.emit_event('task_complete', {'agent_id': self.agent_id, 'task_id': task_id, 'status': status})
+        self.current_task = ""
+        self.update_status('active')
+        return future
+
+    def ping(self):
+        return self.emit_event('agent_ping', {'agent_id': self.agent_id})
+
+    def subscribe_fragments(self, tags=None, themes=None, emotional_vibe=None):
+        """Receive only dream fragments sharing at least one tag (symbol), theme or emotional vibe"""
+        self.fragment_topics = {'tags': tags or [], 'themes': themes or [], 'emotional_vibe': emotional_vibe or []}
+        if not self.connected:
+            # Sent with the next registration
+            return self.host.done() if self.host is not None else None
+        return self.emit_event('subscribe_fragments', self.fragment_topics)
+
+    def unsubscribe_fragments(self):
+        self.fragment_topics = None
+        if not self.connected:
+            return self.host.done() if self.host is not None else None
+        return self.emit_event('unsubscribe_fragments', {})
+
+    def join_room(self, room_name):
+        return self.emit_event('join_room', {'room': room_name})
+
+    def leave_room(self, room_name):
+        return self.emit_event('leave_room', {'room': room_name})
+
+    # Override contract (same as WebNodeAgentClient)
+
+    def handle_message(self, data):
+        """Handle incoming messages (override in subclasses; may be async)"""
+        pass
+
+    def handle_dream_fragment(self, data):
+        """Handle new dream fragments (override in subclasses; may be async)"""
+        pass
+
+    def handle_task(self, data):
+        """Handle an assigned task (override in subclasses; may be async)"""
+        pass
+
+    async def _call(self, handler, data):
+        try:
+            result = handler(data)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logging.error(f"Handler {handler.__name__} failed for {self.agent_id}: {str(e)}")
+
+    # Inbound
+
+    async def _on_connect(self):
+        self.connected = True
+        self.reconnect_attempt = 0
+        self.register_agent()
+
+    async def _on_disconnect(self):
+        self.connected = False
+        logging.info(f"{self.agent_id} disconnected")
+
+    async def _on_presence_delta(self, delta):
+        # AsyncClient only awaits coroutine functions, so this cannot be a lambda returning a coroutine
+        await self.host.apply_presence_delta(self, delta)
+
+    async def _on_agent_registered(self, data):
+        if data['status'] != 'success':
+            logging.error(f"{self.agent_id} failed to register: {data.get('error', 'Unknown error')}")
+            return
+        self._note_session(data)
+        self.resume_token = data.get('resume_token', self.resume_token)
+
+    def _note_session(self, data):
+        # A new session epoch (new token, server restart) starts event seqs over
+        session = data.get('session')
+        if session is not None and session != self.session:
+            self.session = session
+            self.last_event_seq = 0
+
+    def _note_event_seq(self, data):
+        # Events of a new session can arrive before the registration ack, so they carry the epoch too
+        self._note_session(data)
+        seq = data.get('event_seq')
+        if seq is None:
+            return True
+        if seq <= self.last_event_seq:
+            return False
+        self.last_event_seq = seq
+        return True
+
+    async def _on_task_assigned(self, data):
+        if self._note_event_seq(data):
+            self.current_task = data['description']
+            self.update_status('processing', self.current_task)
+            await self._call(self.handle_task, data)
+
+    async def _on_task_revoked(self, data):
+        if self._note_event_seq(data):
+            self.current_task = ""
+            self.update_status('active')
+
+    async def _on_task_escalated(self, data):
+        if self._note_event_seq(data):
+            logging.warning(f"{self.agent_id}: task escalated {data['task_id']}")
+
+    async def _on_message_received(self, data):
+        seq = data.get('delivery_seq')
+        if seq is not None:
+            if seq <= self.delivery_seq:
+                return
+            if seq != self.delivery_seq + 1:
+                # Missed a delivery; the server resends in order from our last seq
+                self.mailbox_seen = max(self.mailbox_seen, seq)
+                if not self.mailbox_replaying:
+                    self.sync_mailbox()
+                return
+        await self._call(self.handle_message, data)
+        if seq is not None:
+            self.delivery_seq = seq
+            self.emit_event('message_ack', {'agent_id': self.agent_id, 'seq': seq})
+
+    async def _on_message_batch(self, batch):
+        for message in batch['messages']:
+            if message['delivery_seq'] > self.delivery_seq:
+                await self._call(self.handle_message, message)
+        self.delivery_seq = max(self.delivery_seq, batch['last_seq'])
+        if batch['messages'] or batch['more']:
+            self.emit_event('message_ack', {'agent_id': self.agent_id, 'seq': self.delivery_seq})
+        if not batch['more']:
+            self.mailbox_replaying = False
+            if self.mailbox_seen > self.delivery_seq:
+                # A live message arrived after the final page was read
+                self.sync_mailbox()
+
+    async def _on_dream_fragment_added(self, data):
+        await self._call(self.handle_dream_fragment, data)
+
+
+class AgentHost:
+    """Runs many AsyncWebNodeAgent instances on one event loop
+
+    One task handles liveness pings and reconnects for every agent; presence is kept once.
+    """
+
+    def __init__(self, server_url='http://localhost:5001', ping_interval=30, connect_concurrency=50,
+                 reconnect_base=1.0, reconnect_max=60.0):
+        self.server_url = server_url
+        self.ping_interval = ping_interval
+        self.connect_concurrency = connect_concurrency
+        self.reconnect_base = reconnect_base
+        self.reconnect_max = reconnect_max
+        self.agents = []
+        self.presence = {}
+        self.presence_version = 0
+        self.http_session = None
+        self.running = False
+        self._snapshot_requested = False
+
+    def add(self, agent):
+        self.agents.append(agent)
+        return agent
+
+    def done(self):
+        """Already-completed awaitable, for outbound calls that had nothing to send"""
+        future = asyncio.get_event_loop().create_future()
+        future.set_result(None)
+        return future
+
+    def _client(self):
+        options = {'reconnection': False}
+        if self.http_session is not None:
+            # One connection pool for every agent instead of one per client
+            options['http_session'] = self.http_session
+        return socketio.AsyncClient(**options)
+
+    async def apply_presence_snapshot(self, snapshot):
+        if snapshot['version'] >= self.presence_version:
+            self.presence_version = snapshot['version']
+            self.presence = {agent['agent_id']: agent for agent in snapshot['agents']}
+        self._snapshot_requested = False
+
+    async def apply_presence_delta(self, agent, delta):
+        # Every hosted socket receives each broadcast delta; only the first copy is applied
+        if delta['version'] <= self.presence_version:
+            return
+        if delta['version'] != self.presence_version + 1:
+            if not self._snapshot_requested:
+                self._snapshot_requested = True
+                agent.emit_event('presence_snapshot_request', {})
+            return
+        self.presence_version = delta['version']
+        self.presence[delta['agent']['agent_id']] = delta['agent']
+
+    async def _connect(self, agent, semaphore):
+        async with semaphore:
+            try:
+                await agent.sio.connect(self.server_url)
+            except Exception as e:
+                agent.reconnect_attempt += 1
+                agent.next_reconnect = time.monotonic() + self._backoff(agent.reconnect_attempt)
+                logging.warning(f"{agent.agent_id} failed to connect: {str(e)}")
+
+    def _backoff(self, attempt):
+        delay = min(self.reconnect_max, self.reconnect_base * (2 ** attempt))
+        # Equal jitter, so agents dropped together do not return together
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def _supervise(self):
+        """Pings idle agents and reconnects dropped ones, once a second, for the whole host"""
+        semaphore = asyncio.Semaphore(self.connect_concurrency)
+        while self.running:
+            await asyncio.sleep(1)
+            now = time.monotonic()
+            reconnects = []
+            for agent in self.agents:
+                if agent.connected:
+                    if now - agent.last_activity >= self.ping_interval:
+                        agent.ping()
+                elif now >= agent.next_reconnect:
+                    agent.next_reconnect = now + self._backoff(agent.reconnect_attempt + 1)
+                    reconnects.append(self._connect(agent, semaphore))
+            if reconnects:
+                await asyncio.gather(*reconnects)
+
+    async def run(self):
+        """Connect every agent and keep them alive until stop()"""
+        if aiohttp is not None:
+            self.http_session = aiohttp.ClientSession()
+        self.running = True
+        for agent in self.agents:
+            agent.attach(self, self._client())
+        semaphore = asyncio.Semaphore(self.connect_concurrency)
+        await asyncio.gather(*(self._connect(agent, semaphore) for agent in self.agents))
+        logging.info(f"Agent host running {sum(1 for a in self.agents if a.connected)}/{len(self.agents)} agents")
+        try:
+            await self._supervise()
+        finally:
+            await self.close()
+
+    def stop(self):
+        self.running = False
+
+    async def close(self):
+        for agent in self.agents:
+            if agent.connected:
+                await agent.sio.disconnect()
+        if self.http_session is not None:
+            await self.http_session.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run many agents over one asyncio event loop')
+    parser.add_argument('--server', default='http://localhost:5001')
+    parser.add_argument('--agents', type=int, default=100)
+    parser.add_argument('--prefix', default='HOSTED')
+    parser.add_argument('--capabilities', default='general', help='comma-separated')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(filename='agent_host.log', level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    host = AgentHost(args.server)
+    for index in range(args.agents):
+        host.add(AsyncWebNodeAgent(f'{args.prefix}_{index:04d}', f'{args.prefix} {index}',
+                                   capabilities=args.capabilities.split(',')))
+    print(f"Hosting {args.agents} agents against {args.server}...")
+    try:
+        asyncio.run(host.run())
+    except KeyboardInterrupt:
+        logging.info("Shutting down agent host...")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
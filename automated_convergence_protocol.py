@@ -23,6 +23,13 @@ from email.mime.multipart import MIMEMultipart
 import requests
 import time
 import threading
+from db_connection import get_connection
+from schema_migrations import run_migrations
+from service_metrics import REGISTRY, start_metrics_server
+
+ASSESSMENT_CYCLE_SECONDS = REGISTRY.histogram(
+    'convergence_cycle_duration_seconds', 'Duration of each monitoring cycle step', ('step',),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0))
 
 class AutomatedConvergenceProtocol:
     """Automated Convergence Protocol for AI Agent Divergence Reduction"""
@@ -58,6 +65,7 @@ class AutomatedConvergenceProtocol:
             self.email_port = config.getint('Convergence', 'email_port', fallback=587)
             self.email_user = config.get('Convergence', 'email_user', fallback='')
             self.email_password = config.get('Convergence', 'email_password', fallback='')
+            self.metrics_port = config.getint('Monitoring', 'ConvergenceMetricsPort', fallback=5004)
             
         except Exception as e:
             logging.error(f"Error loading configuration: {str(e)}")
@@ -66,11 +74,12 @@ class AutomatedConvergenceProtocol:
             self.assessment_interval = 3600
             self.intervention_threshold = 0.5
             self.email_enabled = False
+            self.metrics_port = 5004
     
     def init_database(self):
         """Initialize convergence protocol database tables"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             
             # Create convergence assessments table
@@ -112,6 +121,7 @@ class AutomatedConvergenceProtocol:
             ''')
             
             conn.commit()
+            run_migrations(conn, 'convergence')
             conn.close()
             logging.info("Convergence protocol database initialized successfully")
         except Exception as e:
@@ -139,9 +149,12 @@ class AutomatedConvergenceProtocol:
         """Main monitoring loop"""
         while self.running:
             try:
-                self.assess_all_agents()
-                self.check_for_interventions()
-                self.update_convergence_metrics()
+                with ASSESSMENT_CYCLE_SECONDS.time(step='assess'):
+                    self.assess_all_agents()
+                with ASSESSMENT_CYCLE_SECONDS.time(step='interventions'):
+                    self.check_for_interventions()
+                with ASSESSMENT_CYCLE_SECONDS.time(step='metrics'):
+                    self.update_convergence_metrics()
                 time.sleep(self.assessment_interval)
             except Exception as e:
                 logging.error(f"Error in monitoring loop: {str(e)}")
@@ -150,7 +163,7 @@ class AutomatedConvergenceProtocol:
     def assess_all_agents(self):
         """Assess convergence for all active agents"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             
             # Get all active agents
@@ -200,7 +213,7 @@ class AutomatedConvergenceProtocol:
     def check_for_interventions(self):
         """Check if any agents need convergence interventions"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             
             # Get agents with high divergence
@@ -241,7 +254,7 @@ class AutomatedConvergenceProtocol:
                 md_file = 'MEDIUM_DIVERGENCE_PROTOCOL.md'
             
             # Create intervention record
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO convergence_interventions 
@@ -275,7 +288,7 @@ class AutomatedConvergenceProtocol:
                 self.send_email_intervention(agent_name, message)
             
             # Update intervention status
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE convergence_interventions 
@@ -388,7 +401,7 @@ Contact: WOLFIE if assistance is needed
     def update_convergence_metrics(self):
         """Update convergence metrics for monitoring"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             
             # Calculate overall convergence metrics
@@ -429,7 +442,7 @@ Contact: WOLFIE if assistance is needed
     def get_convergence_report(self):
         """Get current convergence status report"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             
             # Get recent assessments
@@ -601,6 +614,7 @@ if __name__ == '__main__':
     
     # Start monitoring
     convergence.start_monitoring()
+    start_metrics_server(convergence.metrics_port)
     
     try:
         # Keep running
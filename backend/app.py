@@ -12,15 +12,25 @@
 # AGAPE: Love, patience, kindness, humility in multi-agent collaboration
 
 from flask import Flask, request, jsonify
+import sys
 import sqlite3
 import json
 import os
-from cryptography.fernet import Fernet
+import heapq
+import secrets
 import logging
+import functools
 import configparser
 from datetime import datetime
+from key_rotation import RotatingCipher, ReencryptionJob, rotate_key
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_connection import get_connection
+from schema_migrations import run_migrations
+from service_metrics import FERNET_SECONDS, instrument_flask
 
 app = Flask(__name__)
+instrument_flask(app)
 
 # Load configuration
 config = configparser.ConfigParser()
@@ -28,19 +38,42 @@ config.read(os.path.join('C:\\START\\WOLFIE_AGI_UI\\config', 'config.ini'))
 BASE_DIR = config.get('Paths', 'BaseDir', fallback=r'C:\START\WOLFIE_AGI_UI')
 DB_PATH = os.path.join(BASE_DIR, 'dreams.db')
 logging.basicConfig(filename=os.path.join(BASE_DIR, 'backend', 'api.log'), level=logging.INFO)
+PULL_TAB_DEFAULT_LIMIT = config.getint('Settings', 'PullTabLimit', fallback=20)
+PULL_TAB_MAX_LIMIT = 500
+ADMIN_TOKEN = os.environ.get('WOLFIE_ADMIN_TOKEN', config.get('Security', 'AdminToken', fallback=''))
 
-# Encryption setup
+# Encryption setup (primary key plus retired keys, so rotation never breaks reads)
 key_file = os.path.join(BASE_DIR, 'config', 'encryption_key.bin')
-with open(key_file, 'rb') as f:
-    key = f.read()
-cipher = Fernet(key)
+cipher = RotatingCipher(key_file)
+reencryption_job = None
+
+def require_admin(view):
+    """Admin routes need the configured token in X-Admin-Token; without one they are disabled"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({'error': 'Admin API disabled: no AdminToken configured'}), 403
+        if not secrets.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+            logging.warning(f"Rejected admin request to {request.path} from {request.remote_addr}")
+            return jsonify({'error': 'Invalid admin token'}), 401
+        return view(*args, **kwargs)
+    return wrapper
 
 # Database connection
 def get_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection(DB_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 
+def init_database():
+    """Apply pending Dreams schema migrations"""
+    try:
+        conn = get_db()
+        run_migrations(conn, 'dreams')
+        conn.close()
+    except Exception as e:
+        logging.error(f"Error migrating database: {str(e)}")
+
 # API endpoints
 @app.route('/api/dreams', methods=['GET'])
 def get_dreams():
@@ -50,7 +83,8 @@ def get_dreams():
         cursor.execute('SELECT * FROM Dreams')
         dreams = [dict(row) for row in cursor.fetchall()]
         for dream in dreams:
-            dream['Summary'] = cipher.decrypt(dream['Summary'].encode()).decode()
+            with FERNET_SECONDS.time(operation='decrypt'):
+                dream['Summary'] = cipher.decrypt(dream['Summary'].encode()).decode()
         conn.close()
         return jsonify(dreams)
     except Exception as e:
@@ -61,7 +95,8 @@ def get_dreams():
 def add_dream():
     try:
         data = request.json
-        data['Summary'] = cipher.encrypt(data['Summary'].encode()).decode()
+        with FERNET_SECONDS.time(operation='encrypt'):
+            data['Summary'] = cipher.encrypt(data['Summary'].encode()).decode()
         conn = get_db()
         cursor = conn.cursor()
         cursor.execute('''
@@ -82,7 +117,8 @@ def add_dream():
         ))
         conn.commit()
         conn.close()
-        data['Summary'] = cipher.decrypt(data['Summary'].encode()).decode()
+        with FERNET_SECONDS.time(operation='decrypt'):
+            data['Summary'] = cipher.decrypt(data['Summary'].encode()).decode()
         return jsonify(data), 201
     except Exception as e:
         logging.error(f"Error adding dream: {str(e)}")
@@ -104,16 +140,40 @@ def get_bridge_crew():
 @app.route('/api/pull_tab', methods=['POST'])
 def pull_tab():
     try:
-        tab_name = request.json['tab_name']
+        data = request.json
+        tab_name = data['tab_name']
+        limit = max(1, min(int(data.get('limit', PULL_TAB_DEFAULT_LIMIT)), PULL_TAB_MAX_LIMIT))
+        min_weight = data.get('min_weight')
         conn = get_db()
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM Dreams')
-        dreams = [dict(row) for row in cursor.fetchall()]
-        for dream in dreams:
-            dream['Quantum_State'] = json.loads(dream['Quantum_State'])
-            dream['Tab_Weight'] = dream['Quantum_State'].get(tab_name, 0.0)
-            dream['Summary'] = cipher.decrypt(dream['Summary'].encode()).decode()
-        dreams.sort(key=lambda x: x['Tab_Weight'], reverse=True)
+
+        # Rank on the tab weight alone, extracted by SQLite; the wide columns are fetched only for the winners
+        query = ("SELECT COALESCE(json_extract(NULLIF(Quantum_State, ''), ?), 0.0) AS weight, rowid "
+                 "FROM Dreams")
+        params = ['$."' + tab_name.replace('"', '') + '"']
+        if min_weight is not None:
+            query += ' WHERE weight >= ?'
+            params.append(float(min_weight))
+        cursor.execute(query, params)
+        # nlargest keeps a K-sized heap, so memory stays bounded by limit rather than the archive
+        top = heapq.nlargest(limit, ((weight, rowid) for weight, rowid in cursor))
+
+        dreams = []
+        if top:
+            placeholders = ','.join('?' * len(top))
+            cursor.execute(f'SELECT rowid AS _rowid, * FROM Dreams WHERE rowid IN ({placeholders})',
+                           [rowid for _, rowid in top])
+            rows = {row['_rowid']: dict(row) for row in cursor.fetchall()}
+            for weight, rowid in top:
+                dream = rows.get(rowid)
+                if dream is None:
+                    continue
+                del dream['_rowid']
+                dream['Quantum_State'] = json.loads(dream['Quantum_State'])
+                dream['Tab_Weight'] = weight
+                with FERNET_SECONDS.time(operation='decrypt'):
+                    dream['Summary'] = cipher.decrypt(dream['Summary'].encode()).decode()
+                dreams.append(dream)
         conn.close()
         return jsonify(dreams)
     except Exception as e:
@@ -133,5 +193,36 @@ def get_music_log():
         logging.error(f"Error fetching music log: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/admin/rotate_key', methods=['POST'])
+@require_admin
+def rotate_encryption_key():
+    global reencryption_job
+    try:
+        if reencryption_job and reencryption_job.running:
+            return jsonify({'error': 'Re-encryption already in progress', 'job': reencryption_job.status()}), 409
+        data = request.json or {}
+        fingerprint = rotate_key(key_file)
+        cipher.reload()
+        reencryption_job = ReencryptionJob(
+            DB_PATH, cipher,
+            batch_size=int(data.get('batch_size', 100)),
+            pause=float(data.get('pause', 0.05))
+        )
+        reencryption_job.start()
+        return jsonify({'status': 'rotating', 'key_fingerprint': fingerprint}), 202
+    except Exception as e:
+        logging.error(f"Error rotating encryption key: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/rotation_status', methods=['GET'])
+@require_admin
+def get_rotation_status():
+    if reencryption_job is None:
+        return jsonify({'key_fingerprint': cipher.primary_fingerprint, 'key_count': cipher.key_count, 'running': False})
+    status = reencryption_job.status()
+    status['key_count'] = cipher.key_count
+    return jsonify(status)
+
 if __name__ == '__main__':
+    init_database()
     app.run(debug=True, port=5000)
@@ -15,12 +15,17 @@ from flask import Flask, request, jsonify
 import sqlite3
 import json
 import os
-from cryptography.fernet import Fernet
+import sys
 import logging
 import configparser
 from datetime import datetime
+from key_rotation import RotatingCipher
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from service_metrics import FERNET_SECONDS, instrument_flask
 
 app = Flask(__name__)
+instrument_flask(app)
 
 # Load configuration
 config = configparser.ConfigParser()
@@ -31,9 +36,7 @@ logging.basicConfig(filename=os.path.join(BASE_DIR, 'api.log'), level=logging.IN
 
 # Encryption setup
 key_file = os.path.join(BASE_DIR, 'encryption_key.bin')
-with open(key_file, 'rb') as f:
-    key = f.read()
-cipher = Fernet(key)
+cipher = RotatingCipher(key_file)
 
 # Database connection
 def get_db():
@@ -59,7 +62,8 @@ def get_dreams():
 def add_dream():
     try:
         data = request.json
-        data['Summary'] = cipher.encrypt(data['Summary'].encode()).decode()
+        with FERNET_SECONDS.time(operation='encrypt'):
+            data['Summary'] = cipher.encrypt(data['Summary'].encode()).decode()
         conn = get_db()
         cursor = conn.cursor()
         cursor.execute('''
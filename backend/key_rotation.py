@@ -0,0 +1,317 @@
+# ID: [WOLFIE_AGI_UI_KEY_ROTATION_20250923_001]
+# SUPERPOSITIONALLY: [dream_data_analysis, quantum_tabs, multi_agent_coordination, bridge_crew_tracking, encryption, key_rotation]
+# DATE: 2025-09-23
+# TITLE: key_rotation.py — Online Fernet Key Rotation for Dream Summaries
+# WHO: WOLFIE (Eric) - Project Architect & Dream Architect
+# WHAT: Multi-key cipher plus a throttled, checkpointed re-encryption job for Dreams.Summary
+# WHERE: C:\START\WOLFIE_AGI_UI\backend\
+# WHEN: 2025-09-23, 09:25 AM CDT (Sioux Falls Timezone)
+# WHY: Rotate the encryption key without downtime or a single huge rewrite of Dreams
+# HOW: MultiFernet keyring (primary + retired keys), small batches committed with a checkpoint row
+# HELP: Contact WOLFIE for key management or re-encryption issues
+# AGAPE: Love, patience, kindness, humility in protecting dream data
+
+import os
+import sqlite3
+import logging
+import threading
+import time
+import hashlib
+from datetime import datetime
+from cryptography.fernet import Fernet, MultiFernet, InvalidToken
+
+RETIRED_KEYS_DIR = 'retired_keys'
+# How often a RotatingCipher looks for a rotated key file
+RELOAD_INTERVAL = 5
+# A retired key stays until every process has reloaded past it (well beyond RELOAD_INTERVAL)
+PRUNE_GRACE_SECONDS = 300
+
+
+def key_fingerprint(key):
+    """Short, non-secret identifier for a key"""
+    return hashlib.sha256(key).hexdigest()[:12]
+
+
+class RotatingCipher:
+    """MultiFernet wrapper that reads tokens from the primary and every retired key"""
+
+    def __init__(self, key_file, reload_interval=RELOAD_INTERVAL):
+        self.key_file = key_file
+        self.retired_dir = os.path.join(os.path.dirname(key_file), RETIRED_KEYS_DIR)
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._mtime = None
+        self.reload()
+
+    def _load_keys(self):
+        """Return the primary key followed by retired keys, newest first"""
+        with open(self.key_file, 'rb') as f:
+            keys = [f.read().strip()]
+        if os.path.isdir(self.retired_dir):
+            retired = [os.path.join(self.retired_dir, name) for name in os.listdir(self.retired_dir)
+                       if name.endswith('.bin')]
+            retired.sort(key=os.path.getmtime, reverse=True)
+            for path in retired:
+                with open(path, 'rb') as f:
+                    keys.append(f.read().strip())
+        return keys
+
+    def reload(self):
+        """Rebuild the MultiFernet from the key files on disk"""
+        with self._lock:
+            keys = self._load_keys()
+            # Swap in one assignment so concurrent readers always see a complete keyring
+            self._cipher = MultiFernet([Fernet(k) for k in keys])
+            self.primary_fingerprint = key_fingerprint(keys[0])
+            self.key_count = len(keys)
+            self._mtime = os.path.getmtime(self.key_file)
+            self._checked_at = time.monotonic()
+        logging.info(f"Encryption keyring loaded: primary={self.primary_fingerprint}, keys={self.key_count}")
+
+    def _maybe_reload(self, force=False):
+        """Pick up a key rotated by another process, checking the key file at most every few seconds"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            if os.path.getmtime(self.key_file) != self._mtime:
+                self.reload()
+        except OSError as e:
+            logging.error(f"Error checking encryption key file: {str(e)}")
+
+    def encrypt(self, data):
+        self._maybe_reload()
+        return self._cipher.encrypt(data)
+
+    def decrypt(self, token):
+        self._maybe_reload()
+        try:
+            return self._cipher.decrypt(token)
+        except InvalidToken:
+            # The token may have been written under a key rotated in since our last check
+            self.reload()
+            return self._cipher.decrypt(token)
+
+    def rotate(self, token):
+        """Re-encrypt a token under the current primary key"""
+        # Never re-encrypt under a primary that another process has already retired
+        self._maybe_reload(force=True)
+        return self._cipher.rotate(token)
+
+
+def rotate_key(key_file):
+    """Generate a new primary key, keeping the old one as a retired decryption key"""
+    retired_dir = os.path.join(os.path.dirname(key_file), RETIRED_KEYS_DIR)
+    os.makedirs(retired_dir, exist_ok=True)
+
+    with open(key_file, 'rb') as f:
+        old_key = f.read().strip()
+    retired_path = os.path.join(retired_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{key_fingerprint(old_key)}.bin")
+    with open(retired_path, 'wb') as f:
+        f.write(old_key)
+
+    new_key = Fernet.generate_key()
+    tmp_path = key_file + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(new_key)
+    os.replace(tmp_path, key_file)
+
+    logging.info(f"Encryption key rotated: {key_fingerprint(old_key)} -> {key_fingerprint(new_key)}")
+    return key_fingerprint(new_key)
+
+
+def count_rows_under_key(db_path, key):
+    """Dreams rows whose Summary is still a token of key (signature check only, nothing is decrypted)"""
+    fernet = Fernet(key)
+    conn = sqlite3.connect(db_path, timeout=30)
+    count = 0
+    for (summary,) in conn.execute('SELECT Summary FROM Dreams'):
+        try:
+            fernet.extract_timestamp(summary.encode())
+            count += 1
+        except (InvalidToken, AttributeError):
+            pass
+    conn.close()
+    return count
+
+
+def prune_retired_keys(key_file, db_path, grace_seconds=PRUNE_GRACE_SECONDS):
+    """Delete retired keys that no process can still be writing with and no Summary still uses
+
+    A key is kept until it has been retired for longer than grace_seconds (a process whose keyring
+    is up to RELOAD_INTERVAL stale may still encrypt with it) and a scan finds zero rows under it.
+    """
+    if grace_seconds <= RELOAD_INTERVAL:
+        raise ValueError(f"grace_seconds must exceed the keyring reload interval ({RELOAD_INTERVAL}s)")
+    retired_dir = os.path.join(os.path.dirname(key_file), RETIRED_KEYS_DIR)
+    if not os.path.isdir(retired_dir):
+        return 0
+    removed = 0
+    now = time.time()
+    for name in os.listdir(retired_dir):
+        if not name.endswith('.bin'):
+            continue
+        path = os.path.join(retired_dir, name)
+        if now - os.path.getmtime(path) < grace_seconds:
+            logging.info(f"Keeping retired key {name}: retired less than {grace_seconds}s ago")
+            continue
+        with open(path, 'rb') as f:
+            remaining = count_rows_under_key(db_path, f.read().strip())
+        if remaining:
+            logging.warning(f"Keeping retired key {name}: {remaining} Dreams rows still encrypted under it")
+            continue
+        os.remove(path)
+        removed += 1
+    logging.info(f"Pruned {removed} retired encryption keys")
+    return removed
+
+
+class ReencryptionJob:
+    """Background job that moves Dreams.Summary onto the primary key in small, throttled batches"""
+
+    def __init__(self, db_path, cipher, batch_size=100, pause=0.05):
+        self.db_path = db_path
+        self.cipher = cipher
+        self.batch_size = batch_size
+        self.pause = pause
+        self.running = False
+        self.thread = None
+        self.processed = 0
+        self.skipped = 0
+
+    def init_checkpoint_table(self, conn):
+        """Create the checkpoint table used to resume after a restart"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS reencryption_checkpoint (
+                key_fingerprint TEXT PRIMARY KEY,
+                last_rowid INTEGER,
+                status TEXT,
+                updated_at TEXT
+            )
+        ''')
+        conn.commit()
+
+    def load_checkpoint(self, conn):
+        row = conn.execute(
+            'SELECT last_rowid, status FROM reencryption_checkpoint WHERE key_fingerprint = ?',
+            (self.cipher.primary_fingerprint,)
+        ).fetchone()
+        return (row[0], row[1]) if row else (0, 'pending')
+
+    def save_checkpoint(self, conn, last_rowid, status):
+        conn.execute('''
+            INSERT OR REPLACE INTO reencryption_checkpoint (key_fingerprint, last_rowid, status, updated_at)
+            VALUES (?, ?, ?, ?)
+        ''', (self.cipher.primary_fingerprint, last_rowid, status, datetime.now().isoformat()))
+
+    def start(self):
+        """Start re-encryption in a daemon thread"""
+        if self.running:
+            logging.warning("Re-encryption job is already running")
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        logging.info(f"Re-encryption job started for key {self.cipher.primary_fingerprint}")
+
+    def stop(self):
+        """Stop after the current batch; progress is kept in the checkpoint"""
+        self.running = False
+        if self.thread:
+            self.thread.join()
+
+    def _run(self):
+        try:
+            self.run_batches()
+        except Exception as e:
+            logging.error(f"Error in re-encryption job: {str(e)}")
+        finally:
+            self.running = False
+
+    def run_batches(self):
+        """Re-encrypt every row after the checkpoint, one short transaction per batch"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        # WAL lets API readers proceed while a batch is being written
+        conn.execute('PRAGMA journal_mode=WAL')
+        self.init_checkpoint_table(conn)
+        last_rowid, status = self.load_checkpoint(conn)
+        if status == 'complete':
+            conn.close()
+            return 'complete'
+
+        while self.running:
+            rows = conn.execute(
+                'SELECT rowid, Summary FROM Dreams WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                (last_rowid, self.batch_size)
+            ).fetchall()
+            if not rows:
+                self.save_checkpoint(conn, last_rowid, 'complete')
+                conn.commit()
+                logging.info(f"Re-encryption complete: {self.processed} rows rotated, {self.skipped} skipped")
+                conn.close()
+                return 'complete'
+
+            updates = []
+            for rowid, summary in rows:
+                try:
+                    rotated = self.cipher.rotate(summary.encode()).decode()
+                    updates.append((rotated, rowid, summary))
+                except (InvalidToken, AttributeError):
+                    self.skipped += 1
+                    logging.warning(f"Skipping Dreams rowid {rowid}: Summary not readable with current keyring")
+
+            # Only overwrite rows nobody changed since we read them
+            conn.executemany('UPDATE Dreams SET Summary = ? WHERE rowid = ? AND Summary = ?', updates)
+            last_rowid = rows[-1][0]
+            self.save_checkpoint(conn, last_rowid, 'running')
+            conn.commit()
+            self.processed += len(updates)
+
+            time.sleep(self.pause)
+
+        conn.close()
+        return 'paused'
+
+    def status(self):
+        return {
+            'key_fingerprint': self.cipher.primary_fingerprint,
+            'running': self.running,
+            'processed': self.processed,
+            'skipped': self.skipped
+        }
+
+
+# Main execution
+if __name__ == '__main__':
+    import sys
+    import configparser
+
+    config = configparser.ConfigParser()
+    config.read(os.path.join('C:\\START\\WOLFIE_AGI_UI\\config', 'config.ini'))
+    base_dir = config.get('Paths', 'BaseDir', fallback=r'C:\START\WOLFIE_AGI_UI')
+    key_file = os.path.join(base_dir, 'config', 'encryption_key.bin')
+    db_path = os.path.join(base_dir, 'dreams.db')
+
+    command = sys.argv[1] if len(sys.argv) > 1 else 'status'
+    if command == 'rotate':
+        print(f"New primary key: {rotate_key(key_file)}")
+    elif command == 'reencrypt':
+        job = ReencryptionJob(db_path, RotatingCipher(key_file))
+        job.running = True
+        print(f"Re-encryption {job.run_batches()}: {job.status()}")
+    elif command == 'prune':
+        job = ReencryptionJob(db_path, RotatingCipher(key_file))
+        conn = sqlite3.connect(db_path)
+        job.init_checkpoint_table(conn)
+        _, status = job.load_checkpoint(conn)
+        conn.close()
+        if status != 'complete':
+            print("Re-encryption under the current primary key has not completed; keeping retired keys")
+        else:
+            print(f"Removed {prune_retired_keys(key_file, db_path)} retired keys")
+    else:
+        cipher = RotatingCipher(key_file)
+        print(f"Primary key {cipher.primary_fingerprint}, {cipher.key_count} keys in ring")
+        print("Usage: python key_rotation.py [rotate|reencrypt|prune|status]")
@@ -0,0 +1,282 @@
+# ID: [WOLFIE_AGI_UI_CLUSTER_20250923_001]
+# SUPERPOSITIONALLY: [dream_data_analysis, quantum_tabs, multi_agent_coordination, bridge_crew_tracking, web_node_system, horizontal_scaling]
+# DATE: 2025-09-23
+# TITLE: cluster.py — Shared State and Event Relay for Multi-Worker Web Node Servers
+# WHO: WOLFIE (Eric) - Project Architect & Dream Architect
+# WHAT: Pluggable shared-state backends plus a SQLite pub/sub relay for Socket.IO emits
+# WHERE: C:\START\WOLFIE_AGI_UI\
+# WHEN: 2025-09-23, 11:00 AM CDT (Sioux Falls Timezone)
+# WHY: Let several web_node_server processes share presence and task state so capacity grows with cores
+# HOW: LocalStateBackend (single process) / SQLiteStateBackend (shared file); SQLitePubSubManager relays rooms and broadcasts
+# HELP: Contact WOLFIE for multi-worker deployment questions
+# AGAPE: Love, patience, kindness, humility in multi-agent collaboration
+
+import json
+import time
+import pickle
+import logging
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime
+import socketio
+
+
+class LocalStateBackend:
+    """In-process state for a single worker (the default)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+        self._queues = {}
+        self._version = 0
+
+    def next_version(self):
+        with self._lock:
+            self._version += 1
+            return self._version
+
+    def current_version(self):
+        return self._version
+
+    def incr(self, namespace, key, floor=0):
+        """Atomically bump a counter, never returning a value at or below floor"""
+        with self._lock:
+            counters = self._data.setdefault(namespace, {})
+            counters[key] = max(counters.get(key, 0), floor) + 1
+            return counters[key]
+
+    def put(self, namespace, key, value):
+        with self._lock:
+            self._data.setdefault(namespace, {})[key] = value
+
+    def get(self, namespace, key):
+        return self._data.get(namespace, {}).get(key)
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._data.get(namespace, {}).pop(key, None)
+
+    def values(self, namespace):
+        with self._lock:
+            return list(self._data.get(namespace, {}).values())
+
+    def count(self, namespace):
+        return len(self._data.get(namespace, {}))
+
+    def push(self, namespace, value):
+        """Append to a FIFO queue (e.g. commands for the task owner)"""
+        with self._lock:
+            self._queues.setdefault(namespace, deque()).append(value)
+
+    def drain(self, namespace, limit=500):
+        """Remove and return up to limit queued values, oldest first"""
+        with self._lock:
+            pending = self._queues.get(namespace)
+            items = []
+            while pending and len(items) < limit:
+                items.append(pending.popleft())
+            return items
+
+    def acquire_lease(self, name, owner, ttl):
+        """Take or renew a named lease; True while owner holds it"""
+        now = time.time()
+        with self._lock:
+            leases = self._data.setdefault('leases', {})
+            lease = leases.get(name)
+            if lease is not None and lease['owner'] != owner and lease['expires'] > now:
+                return False
+            leases[name] = {'owner': owner, 'expires': now + ttl}
+            return True
+
+
+class SQLiteStateBackend:
+    """State shared by every worker on one host through a SQLite file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cluster_state (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT,
+                updated_at TEXT,
+                PRIMARY KEY (namespace, key)
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cluster_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                namespace TEXT NOT NULL,
+                value TEXT
+            )
+        ''')
+        conn.execute('CREATE TABLE IF NOT EXISTS cluster_version (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER)')
+        conn.execute('INSERT OR IGNORE INTO cluster_version (id, version) VALUES (1, 0)')
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10)
+        return conn
+
+    def next_version(self):
+        conn = self._conn()
+        with conn:
+            conn.execute('UPDATE cluster_version SET version = version + 1 WHERE id = 1')
+            return conn.execute('SELECT version FROM cluster_version WHERE id = 1').fetchone()[0]
+
+    def current_version(self):
+        return self._conn().execute('SELECT version FROM cluster_version WHERE id = 1').fetchone()[0]
+
+    def incr(self, namespace, key, floor=0):
+        """Atomically bump a counter shared by all workers, never returning a value at or below floor"""
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT value FROM cluster_state WHERE namespace = ? AND key = ?',
+                               (namespace, key)).fetchone()
+            value = max(json.loads(row[0]) if row else 0, floor) + 1
+            conn.execute('INSERT OR REPLACE INTO cluster_state (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)',
+                         (namespace, key, json.dumps(value), datetime.now().isoformat()))
+            return value
+
+    def put(self, namespace, key, value):
+        conn = self._conn()
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO cluster_state (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)',
+                         (namespace, key, json.dumps(value), datetime.now().isoformat()))
+
+    def get(self, namespace, key):
+        row = self._conn().execute('SELECT value FROM cluster_state WHERE namespace = ? AND key = ?',
+                                   (namespace, key)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, namespace, key):
+        conn = self._conn()
+        with conn:
+            conn.execute('DELETE FROM cluster_state WHERE namespace = ? AND key = ?', (namespace, key))
+
+    def values(self, namespace):
+        rows = self._conn().execute('SELECT value FROM cluster_state WHERE namespace = ?', (namespace,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(self, namespace):
+        return self._conn().execute('SELECT COUNT(*) FROM cluster_state WHERE namespace = ?',
+                                    (namespace,)).fetchone()[0]
+
+    def push(self, namespace, value):
+        """Append to a FIFO queue shared by all workers"""
+        conn = self._conn()
+        with conn:
+            conn.execute('INSERT INTO cluster_queue (namespace, value) VALUES (?, ?)', (namespace, json.dumps(value)))
+
+    def drain(self, namespace, limit=500):
+        """Remove and return up to limit queued values, oldest first"""
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            rows = conn.execute('SELECT id, value FROM cluster_queue WHERE namespace = ? ORDER BY id LIMIT ?',
+                                (namespace, limit)).fetchall()
+            if rows:
+                conn.execute('DELETE FROM cluster_queue WHERE namespace = ? AND id <= ?', (namespace, rows[-1][0]))
+            return [json.loads(row[1]) for row in rows]
+
+    def acquire_lease(self, name, owner, ttl):
+        """Take or renew a named lease; True while owner holds it (it lapses ttl seconds after the last renewal)"""
+        conn = self._conn()
+        now = time.time()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute("SELECT value FROM cluster_state WHERE namespace = 'leases' AND key = ?",
+                               (name,)).fetchone()
+            lease = json.loads(row[0]) if row else None
+            if lease is not None and lease['owner'] != owner and lease['expires'] > now:
+                return False
+            conn.execute("INSERT OR REPLACE INTO cluster_state (namespace, key, value, updated_at) VALUES ('leases', ?, ?, ?)",
+                         (name, json.dumps({'owner': owner, 'expires': now + ttl}), datetime.now().isoformat()))
+            return True
+
+
+def create_state_backend(url):
+    """'local' (default) or 'sqlite:///path/to/cluster.db'"""
+    if not url or url == 'local':
+        return LocalStateBackend()
+    if url.startswith('sqlite:///'):
+        return SQLiteStateBackend(url[len('sqlite:///'):])
+    raise ValueError(f"Unsupported state backend: {url}")
+
+
+class SQLitePubSubManager(socketio.PubSubManager):
+    """Socket.IO client manager relaying emits between workers through a SQLite table"""
+
+    name = 'sqlite'
+
+    def __init__(self, url, channel='socketio', write_only=False, logger=None,
+                 poll_interval=0.01, retention=60):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.path = url[len('sqlite:///'):] if url.startswith('sqlite:///') else url
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._local = threading.local()
+        self._last_prune = 0.0
+        conn = self._conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS socketio_relay (
+                relay_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel TEXT,
+                payload BLOB,
+                created_at REAL
+            )
+        ''')
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10)
+        return conn
+
+    def _publish(self, data):
+        conn = self._conn()
+        now = time.time()
+        with conn:
+            conn.execute('INSERT INTO socketio_relay (channel, payload, created_at) VALUES (?, ?, ?)',
+                         (self.channel, pickle.dumps(data), now))
+            if now - self._last_prune > self.retention:
+                self._last_prune = now
+                conn.execute('DELETE FROM socketio_relay WHERE created_at < ?', (now - self.retention,))
+
+    def _listen(self):
+        conn = self._conn()
+        row = conn.execute('SELECT MAX(relay_id) FROM socketio_relay').fetchone()
+        last_id = row[0] or 0
+        while True:
+            try:
+                rows = conn.execute(
+                    'SELECT relay_id, payload FROM socketio_relay WHERE relay_id > ? AND channel = ? ORDER BY relay_id',
+                    (last_id, self.channel)
+                ).fetchall()
+            except sqlite3.Error as e:
+                logging.error(f"Error reading socketio relay: {str(e)}")
+                rows = []
+            for relay_id, payload in rows:
+                last_id = relay_id
+                yield payload
+            if not rows:
+                time.sleep(self.poll_interval)
+
+
+def socketio_queue_options(message_queue):
+    """SocketIO() keyword arguments for the configured relay ('' means single worker)"""
+    if not message_queue:
+        return {}
+    if message_queue.startswith('sqlite:///'):
+        return {'client_manager': SQLitePubSubManager(message_queue)}
+    # redis://, amqp:// and other kombu URLs are handled by Flask-SocketIO itself
+    return {'message_queue': message_queue}
@@ -0,0 +1,141 @@
+# ID: [WOLFIE_AGI_UI_DB_CONNECTION_20250923_001]
+# SUPERPOSITIONALLY: [dream_data_analysis, quantum_tabs, multi_agent_coordination, bridge_crew_tracking, database, sqlite, monitoring]
+# DATE: 2025-09-23
+# TITLE: db_connection.py — Shared SQLite Connection Path
+# WHO: WOLFIE (Eric) - Project Architect & Dream Architect
+# WHAT: Single place where the Python services open SQLite connections, with timing and slow-query tracing
+# WHERE: C:\START\WOLFIE_AGI_UI\
+# WHEN: 2025-09-23, 12:00 PM CDT (Sioux Falls Timezone)
+# WHY: Measure query time consistently across services without touching every call site
+# HOW: sqlite3.Connection/Cursor subclasses feeding the metrics registry; opt-in trace callback + EXPLAIN QUERY PLAN
+# HELP: Contact WOLFIE for database connectivity issues
+# AGAPE: Love, patience, kindness, humility in data stewardship
+
+import os
+import sqlite3
+import time
+import logging
+import threading
+import configparser
+from service_metrics import REGISTRY, SQLITE_QUERY_SECONDS
+
+# Tracing is opt-in: [Database] SqlTrace / SlowQueryMs in config.ini, overridable by environment
+config = configparser.ConfigParser()
+config.read('config.ini')
+SQL_TRACE_ENABLED = os.environ.get(
+    'WOLFIE_SQL_TRACE', config.get('Database', 'SqlTrace', fallback='false')).lower() in ('1', 'true', 'yes')
+SLOW_QUERY_MS = float(os.environ.get(
+    'WOLFIE_SLOW_QUERY_MS', config.get('Database', 'SlowQueryMs', fallback='50')))
+MAX_CACHED_PLANS = 256
+
+SLOW_QUERIES = REGISTRY.counter(
+    'sqlite_slow_queries_total', 'Statements slower than the slow-query threshold', ('operation', 'full_scan'))
+
+_plan_cache = {}
+_plan_lock = threading.Lock()
+_trace_local = threading.local()
+
+
+def _operation(sql):
+    """Leading SQL keyword (SELECT, INSERT, ...) used as a low-cardinality label"""
+    parts = sql.lstrip().split(None, 1)
+    return parts[0].upper() if parts else 'UNKNOWN'
+
+
+def _parameter_shape(parameters):
+    """Describe bound parameters by type only, so values never reach the log"""
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f'{k}: {type(v).__name__}' for k, v in parameters.items()) + '}'
+    return '(' + ', '.join(type(v).__name__ for v in parameters) + ')'
+
+
+def _trace_statement(statement):
+    """sqlite3 trace callback: counts statements (including implicit BEGIN/COMMIT) per thread"""
+    _trace_local.count = getattr(_trace_local, 'count', 0) + 1
+    logging.debug(f"SQL trace: {statement[:200]}")
+
+
+def explain_query_plan(conn, sql, parameters=()):
+    """Return EXPLAIN QUERY PLAN detail lines for a statement, cached per SQL text"""
+    with _plan_lock:
+        plan = _plan_cache.get(sql)
+    if plan is not None:
+        return plan
+    try:
+        # A plain cursor keeps the EXPLAIN itself out of timing and tracing
+        rows = sqlite3.Cursor(conn).execute('EXPLAIN QUERY PLAN ' + sql, parameters).fetchall()
+        plan = [row[-1] for row in rows]
+    except sqlite3.Error as e:
+        plan = [f'<unavailable: {e}>']
+    with _plan_lock:
+        if len(_plan_cache) >= MAX_CACHED_PLANS:
+            _plan_cache.pop(next(iter(_plan_cache)))
+        _plan_cache[sql] = plan
+    return plan
+
+
+def _is_full_scan(plan):
+    return any(line.startswith('SCAN') and 'USING' not in line for line in plan)
+
+
+def _record(conn, sql, parameters, elapsed, batch_size=None):
+    operation = _operation(sql)
+    SQLITE_QUERY_SECONDS.observe(elapsed, operation=operation)
+    if not SQL_TRACE_ENABLED or elapsed * 1000 < SLOW_QUERY_MS:
+        return
+    plan = explain_query_plan(conn, sql, parameters) if operation in ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH') else []
+    full_scan = _is_full_scan(plan)
+    SLOW_QUERIES.inc(operation=operation, full_scan=str(full_scan).lower())
+    shape = _parameter_shape(parameters)
+    if batch_size is not None:
+        shape = f'{batch_size} x {shape}'
+    logging.warning(
+        f"Slow query ({elapsed * 1000:.1f} ms{', FULL SCAN' if full_scan else ''}): "
+        f"{' '.join(sql.split())} | params {shape} | plan: {'; '.join(plan) or 'n/a'}"
+    )
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that records execution time of every statement"""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _record(self.connection, sql, parameters, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        seq_of_parameters = list(seq_of_parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            first = seq_of_parameters[0] if seq_of_parameters else ()
+            _record(self.connection, sql, first, time.perf_counter() - start, batch_size=len(seq_of_parameters))
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors (including the execute shortcuts) are TimedCursors"""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def get_connection(db_path, timeout=5.0):
+    """Open a SQLite connection through the shared, instrumented path"""
+    conn = sqlite3.connect(db_path, timeout=timeout, factory=TimedConnection)
+    if SQL_TRACE_ENABLED:
+        conn.set_trace_callback(_trace_statement)
+    return conn
+
+
+def traced_statement_count():
+    """Statements seen by the trace callback on this thread (0 when tracing is off)"""
+    return getattr(_trace_local, 'count', 0)
@@ -0,0 +1,150 @@
+# ID: [WOLFIE_AGI_UI_EVENT_ENVELOPE_20250923_001]
+# SUPERPOSITIONALLY: [dream_data_analysis, quantum_tabs, multi_agent_coordination, bridge_crew_tracking, web_node_system, real_time_communication, performance]
+# DATE: 2025-09-23
+# TITLE: event_envelope.py — Batched, Compact Event Framing for Agents and the Web Node Server
+# WHO: WOLFIE (Eric) - Project Architect & Dream Architect
+# WHAT: Packs several agent events into one frame (MessagePack when installed) with positional fields
+# WHERE: C:\START\WOLFIE_AGI_UI\
+# WHEN: 2025-09-23, 11:05 AM CDT (Sioux Falls Timezone)
+# WHY: Busy agents send many small, repetitive JSON events; one compact frame per burst cuts frames and bytes
+# HOW: Codec negotiated at connect; events become [code, [values], extras] with epoch timestamps; EventBatcher flushes on size or delay
+# HELP: Contact WOLFIE for agent protocol or framing questions
+# AGAPE: Love, patience, kindness, humility in multi-agent collaboration
+
+import json
+import logging
+import threading
+from datetime import datetime
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+ENVELOPE_VERSION = 1
+
+# Field order is the wire format; append new fields at the end and bump ENVELOPE_VERSION for anything else
+EVENT_FIELDS = {
+    'status_update': ('agent_id', 'status', 'current_task', 'understanding_score', 'alignment_score', 'timestamp'),
+    'send_message': ('from_agent', 'to_agent', 'content', 'message_type'),
+    'dream_fragment': ('agent_id', 'summary', 'symbols', 'themes', 'ai_connection', 'emotional_vibe'),
+    'message_ack': ('agent_id', 'seq'),
+}
+EVENT_CODES = {'status_update': 1, 'send_message': 2, 'dream_fragment': 3, 'message_ack': 4}
+EVENT_NAMES = {code: name for name, code in EVENT_CODES.items()}
+TIMESTAMP_FIELDS = ('timestamp',)
+_MISSING = object()
+
+
+def available_codecs():
+    """Codecs this process can speak, most compact first"""
+    return ['msgpack', 'json'] if msgpack is not None else ['json']
+
+
+def choose_codec(offered):
+    """First codec offered by the peer that we also support, or None"""
+    for codec in offered or ():
+        if codec in available_codecs():
+            return codec
+    return None
+
+
+def _compact_value(field, value):
+    if field in TIMESTAMP_FIELDS and isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return value
+    return value
+
+
+def _expand_value(field, value):
+    if field in TIMESTAMP_FIELDS and isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value).isoformat()
+    return value
+
+
+def encode_event(event, data):
+    fields = EVENT_FIELDS[event]
+    values = [_compact_value(field, data.get(field)) for field in fields]
+    # Trailing Nones carry no information
+    while values and values[-1] is None:
+        values.pop()
+    extras = {key: value for key, value in data.items() if key not in fields}
+    return [EVENT_CODES[event], values, extras] if extras else [EVENT_CODES[event], values]
+
+
+def decode_event(item):
+    event = EVENT_NAMES.get(item[0])
+    if event is None:
+        return None, None
+    fields = EVENT_FIELDS[event]
+    data = {field: _expand_value(field, value) for field, value in zip(fields, item[1])}
+    if len(item) > 2:
+        data.update(item[2])
+    return event, data
+
+
+def encode_batch(events, codec):
+    """Frame a list of (event, data) pairs as bytes"""
+    frame = [ENVELOPE_VERSION, [encode_event(event, data) for event, data in events]]
+    if codec == 'msgpack':
+        return msgpack.packb(frame, use_bin_type=True)
+    return json.dumps(frame, separators=(',', ':')).encode()
+
+
+def decode_batch(payload, codec):
+    """Inverse of encode_batch; unknown event codes are skipped"""
+    if codec == 'msgpack':
+        frame = msgpack.unpackb(payload, raw=False)
+    else:
+        frame = json.loads(payload)
+    version, items = frame[0], frame[1]
+    if version != ENVELOPE_VERSION:
+        raise ValueError(f"Unsupported envelope version {version}")
+    events = []
+    for item in items:
+        event, data = decode_event(item)
+        if event is None:
+            logging.warning(f"Skipping unknown event code {item[0]} in batch")
+            continue
+        events.append((event, data))
+    return events
+
+
+class EventBatcher:
+    """Collects events and hands them to send(events) when max_events is reached or max_delay passes"""
+
+    def __init__(self, send, max_events=64, max_delay=0.02):
+        self.send = send
+        self.max_events = max_events
+        self.max_delay = max_delay
+        self._events = []
+        self._timer = None
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._events)
+
+    def add(self, event, data):
+        with self._lock:
+            self._events.append((event, data))
+            full = len(self._events) >= self.max_events
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Send everything buffered now; the send lock keeps frames in order"""
+        with self._send_lock:
+            with self._lock:
+                events, self._events = self._events, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if events:
+                self.send(events)
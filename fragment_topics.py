@@ -0,0 +1,114 @@
+# ID: [WOLFIE_AGI_UI_FRAGMENT_TOPICS_20250923_001]
+# SUPERPOSITIONALLY: [dream_data_analysis, quantum_tabs, multi_agent_coordination, bridge_crew_tracking, web_node_system, real_time_communication, subscriptions]
+# DATE: 2025-09-23
+# TITLE: fragment_topics.py — Topic Subscriptions for Dream Fragment Fan-out
+# WHO: WOLFIE (Eric) - Project Architect & Dream Architect
+# WHAT: Index from fragment topics (tags/symbols, themes, emotional vibe) to subscribed sockets
+# WHERE: C:\START\WOLFIE_AGI_UI\
+# WHEN: 2025-09-23, 11:00 AM CDT (Sioux Falls Timezone)
+# WHY: Broadcasting every fragment to every agent costs fan-out and client work for fragments nobody asked for
+# HOW: Each filter value is a Socket.IO room; a fragment goes out once to its topics' rooms plus the unfiltered room
+# HELP: Contact WOLFIE for dream fragment delivery questions
+# AGAPE: Love, patience, kindness, humility in multi-agent collaboration
+
+import threading
+
+# Room for sockets without filters; they keep receiving every fragment
+ALL_FRAGMENTS_ROOM = 'fragments:all'
+
+# Subscription filter -> fragment field it matches ('tags' is what agents call symbols)
+TOPIC_FIELDS = {
+    'tags': 'symbols',
+    'symbols': 'symbols',
+    'themes': 'themes',
+    'emotional_vibe': 'emotional_vibe',
+}
+
+
+def split_values(value):
+    """Normalize a comma-separated string or a list into a set of lowercase values"""
+    if not value:
+        return set()
+    if isinstance(value, str):
+        value = value.split(',')
+    return {str(item).strip().lower() for item in value if str(item).strip()}
+
+
+def normalize_filters(filters):
+    """{'tags': 'moon, water', 'themes': [...]} -> {('symbols', 'moon'), ('symbols', 'water'), ...}"""
+    topics = set()
+    for name, values in (filters or {}).items():
+        field = TOPIC_FIELDS.get(name)
+        if field is None:
+            raise ValueError(f"Unknown fragment filter {name}; expected one of {sorted(TOPIC_FIELDS)}")
+        topics.update((field, value) for value in split_values(values))
+    return topics
+
+
+def fragment_topics(fragment):
+    topics = set()
+    for field in set(TOPIC_FIELDS.values()):
+        topics.update((field, value) for value in split_values(fragment.get(field)))
+    return topics
+
+
+def topic_room(topic):
+    """('symbols', 'moon') -> 'fragments:topic:symbols:moon'"""
+    return f'fragments:topic:{topic[0]}:{topic[1]}'
+
+
+def fragment_rooms(fragment):
+    """Rooms a fragment is emitted to; the message queue delivers it once per socket across workers"""
+    return [ALL_FRAGMENTS_ROOM] + sorted(topic_room(topic) for topic in fragment_topics(fragment))
+
+
+class TopicIndex:
+    """This worker's sockets' topics (and topic -> sids), so room changes and disconnect are cheap
+
+    A fragment matches a subscription when it shares at least one topic with it. Delivery itself
+    goes through the topic rooms, which span workers; the index only tracks local sockets.
+    """
+
+    def __init__(self):
+        self.subscribers = {}
+        self.subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, sid, filters):
+        """Replace sid's filters; returns the normalized topics (empty means 'everything')"""
+        topics = normalize_filters(filters)
+        with self._lock:
+            self._remove(sid)
+            if topics:
+                self.subscriptions[sid] = topics
+                for topic in topics:
+                    self.subscribers.setdefault(topic, set()).add(sid)
+        return topics
+
+    def unsubscribe(self, sid):
+        with self._lock:
+            self._remove(sid)
+
+    def _remove(self, sid):
+        for topic in self.subscriptions.pop(sid, ()):
+            sids = self.subscribers.get(topic)
+            if sids is not None:
+                sids.discard(sid)
+                if not sids:
+                    del self.subscribers[topic]
+
+    def topics_of(self, sid):
+        with self._lock:
+            return set(self.subscriptions.get(sid, ()))
+
+    def is_filtered(self, sid):
+        return sid in self.subscriptions
+
+    def matches(self, sid, fragment):
+        """Whether sid should receive fragment (unfiltered sockets receive everything)"""
+        topics = self.subscriptions.get(sid)
+        return topics is None or not topics.isdisjoint(fragment_topics(fragment))
+
+    def stats(self):
+        with self._lock:
+            return {'filtered_sockets': len(self.subscriptions), 'topics': len(self.subscribers)}
@@ -0,0 +1,178 @@
+# ID: [WOLFIE_AGI_UI_IO_OFFLOAD_20250923_001]
+# SUPERPOSITIONALLY: [dream_data_analysis, quantum_tabs, multi_agent_coordination, bridge_crew_tracking, web_node_system, performance, non_blocking_io]
+# DATE: 2025-09-23
+# TITLE: io_offload.py — Bounded Executor and Non-blocking Logging for Socket.IO Handlers
+# WHO: WOLFIE (Eric) - Project Architect & Dream Architect
+# WHAT: Thread pool with a bounded backlog for blocking persistence, plus queue-based file logging
+# WHERE: C:\START\WOLFIE_AGI_UI\
+# WHEN: 2025-09-23, 11:00 AM CDT (Sioux Falls Timezone)
+# WHY: A slow disk must not stall the event loop that serves every connected agent
+# HOW: Handlers submit blocking work and return; completions emit acknowledgements; log records go through a QueueHandler
+# HELP: Contact WOLFIE for server responsiveness issues
+# AGAPE: Love, patience, kindness, humility in multi-agent collaboration
+
+import time
+import queue
+import logging
+import logging.handlers
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from service_metrics import REGISTRY
+
+OFFLOAD_SECONDS = REGISTRY.histogram(
+    'offload_job_duration_seconds', 'Blocking work run on the I/O pool, by job', ('job',))
+OFFLOAD_WAIT_SECONDS = REGISTRY.histogram(
+    'offload_queue_wait_seconds', 'Time a job waited for a free I/O worker', ('job',))
+OFFLOAD_ERRORS = REGISTRY.counter(
+    'offload_job_errors_total', 'Offloaded jobs that raised', ('job',))
+HANDLER_SECONDS = REGISTRY.histogram(
+    'agent_handler_duration_seconds', 'Agent handler run time, by executor and job', ('executor', 'job'))
+HANDLER_WAIT_SECONDS = REGISTRY.histogram(
+    'agent_handler_queue_wait_seconds', 'Time an event waited for its handler to start', ('executor', 'job'))
+HANDLER_PENDING = REGISTRY.gauge(
+    'agent_handler_pending', 'Events queued or running per handler executor', ('executor',))
+HANDLER_DROPPED = REGISTRY.counter(
+    'agent_handler_dropped_total', 'Events discarded by the drop_oldest overflow policy', ('executor', 'job'))
+HANDLER_ERRORS = REGISTRY.counter(
+    'agent_handler_errors_total', 'Agent handlers that raised', ('executor', 'job'))
+
+OVERFLOW_POLICIES = ('drop_oldest', 'block')
+
+
+class BoundedExecutor:
+    """ThreadPoolExecutor whose backlog is capped; submit() blocks when it is full"""
+
+    def __init__(self, max_workers=4, max_pending=1000, name='io'):
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+        self._lock = threading.Lock()
+        REGISTRY.gauge('offload_pending_jobs', 'Jobs queued or running on the I/O pool', ('pool',),
+                       callback=lambda: self._pending, labels={'pool': name})
+
+    def submit(self, job, func, *args, on_done=None, **kwargs):
+        """Run func(*args, **kwargs) on the pool; on_done(result) runs afterwards on the same worker"""
+        # Backpressure: a full backlog makes the submitting handler wait instead of growing memory
+        self._slots.acquire()
+        with self._lock:
+            self._pending += 1
+        queued_at = time.perf_counter()
+
+        def run():
+            started = time.perf_counter()
+            OFFLOAD_WAIT_SECONDS.observe(started - queued_at, job=job)
+            try:
+                result = func(*args, **kwargs)
+                if on_done is not None:
+                    on_done(result)
+                return result
+            except Exception as e:
+                OFFLOAD_ERRORS.inc(job=job)
+                logging.error(f"Error in offloaded job {job}: {str(e)}")
+                raise
+            finally:
+                OFFLOAD_SECONDS.observe(time.perf_counter() - started, job=job)
+                with self._lock:
+                    self._pending -= 1
+                self._slots.release()
+
+        return self._executor.submit(run)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+class OrderedExecutor:
+    """Worker pool that runs jobs with the same key one at a time, in submission order
+
+    Each key has its own queue of at most max_pending jobs. When a key's queue is full,
+    'drop_oldest' discards its oldest waiting job and 'block' makes submit() wait.
+    on_drop(job, args, kwargs) is called for every discarded job, outside the lock.
+    """
+
+    def __init__(self, max_workers=4, max_pending=256, overflow='drop_oldest', name='handlers', on_drop=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow}; expected one of {OVERFLOW_POLICIES}")
+        self.name = name
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.dropped = 0
+        self.on_drop = on_drop
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._queues = {}
+        self._running = set()
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+
+    def submit(self, key, job, func, *args, **kwargs):
+        """Queue func(*args, **kwargs) behind earlier jobs for key; never runs on the caller's thread"""
+        dropped = []
+        with self._lock:
+            pending = self._queues.setdefault(key, deque())
+            while len(pending) >= self.max_pending:
+                if self.overflow == 'drop_oldest':
+                    dropped_job, _, dropped_args, dropped_kwargs, _ = pending.popleft()
+                    dropped.append((dropped_job, dropped_args, dropped_kwargs))
+                    self.dropped += 1
+                    HANDLER_DROPPED.inc(executor=self.name, job=dropped_job)
+                    HANDLER_PENDING.dec(executor=self.name)
+                    logging.warning(f"{self.name}: dropped oldest {dropped_job} job for {key} (queue full)")
+                else:
+                    self._not_full.wait()
+                    pending = self._queues.setdefault(key, deque())
+            pending.append((job, func, args, kwargs, time.perf_counter()))
+            HANDLER_PENDING.inc(executor=self.name)
+            # The worker already draining this key will pick it up, keeping order
+            start = key not in self._running
+            self._running.add(key)
+        if self.on_drop is not None:
+            for dropped_job, dropped_args, dropped_kwargs in dropped:
+                self.on_drop(dropped_job, dropped_args, dropped_kwargs)
+        if start:
+            self._executor.submit(self._drain, key)
+
+    def _drain(self, key):
+        """Run the key's jobs until its queue is empty; at most one drain per key at a time"""
+        while True:
+            with self._lock:
+                pending = self._queues.get(key)
+                if not pending:
+                    self._queues.pop(key, None)
+                    self._running.discard(key)
+                    return
+                job, func, args, kwargs, queued_at = pending.popleft()
+                self._not_full.notify_all()
+            started = time.perf_counter()
+            HANDLER_WAIT_SECONDS.observe(started - queued_at, executor=self.name, job=job)
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                HANDLER_ERRORS.inc(executor=self.name, job=job)
+                logging.error(f"Error in {job} handler for {key}: {str(e)}")
+            finally:
+                HANDLER_SECONDS.observe(time.perf_counter() - started, executor=self.name, job=job)
+                HANDLER_PENDING.dec(executor=self.name)
+
+    def pending(self):
+        """Jobs waiting per key (not counting ones already running)"""
+        with self._lock:
+            return {key: len(queue) for key, queue in self._queues.items() if queue}
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+def configure_nonblocking_logging(filename, level=logging.INFO,
+                                  fmt='%(asctime)s - %(levelname)s - %(message)s'):
+    """Route root logging through a queue so callers never wait on the log file"""
+    log_queue = queue.SimpleQueue()
+    file_handler = logging.FileHandler(filename)
+    file_handler.setFormatter(logging.Formatter(fmt))
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener.start()
+    return listener
@@ -21,6 +21,25 @@ import configparser
 from cryptography.fernet import Fernet
 import hashlib
 import uuid
+from db_connection import get_connection
+from schema_migrations import run_migrations
+from service_metrics import instrument_flask
+
+# Response field -> Dreams column, in the order the API has always returned them
+DREAM_FIELDS = (
+    ('entry_id', 'EntryID'), ('date', 'Date'), ('summary', 'Summary'), ('who', 'Who'), ('what', 'What'),
+    ('where', '"Where"'), ('when', '"When"'), ('why', 'Why'), ('how', 'How'), ('symbols', 'Symbols'),
+    ('themes', 'Themes'), ('ai_connection', 'AI_Connection'), ('emotional_vibe', 'Emotional_Vibe'), ('tags', 'Tags')
+)
+DREAM_SELECT = ', '.join(column for _, column in DREAM_FIELDS)
+SYNC_PAGE_SIZE = 100
+MAX_SYNC_PAGE_SIZE = 500
+MAX_BATCH_FRAGMENTS = 500
+FRAGMENT_INSERT_SQL = '''
+    INSERT OR IGNORE INTO mobile_dream_fragments 
+    (fragment_id, device_id, summary, symbols, themes, emotional_vibe, ai_connection, tags, created_at, client_key)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
 
 class MobileSyncSystem:
     """Mobile Sync System for WOLFIE AGI UI (DEEPSEEK Replacement)"""
@@ -31,6 +50,7 @@ class MobileSyncSystem:
         self.app = Flask(__name__)
         self.setup_logging()
         self.setup_routes()
+        instrument_flask(self.app)
         self.init_database()
     
     def setup_logging(self):
@@ -44,7 +64,7 @@ class MobileSyncSystem:
     def init_database(self):
         """Initialize mobile sync database tables"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             
             # Create mobile devices table
@@ -92,6 +112,8 @@ class MobileSyncSystem:
             ''')
             
             conn.commit()
+            run_migrations(conn, 'mobile_sync')
+            run_migrations(conn, 'dreams')
             conn.close()
             logging.info("Mobile sync database initialized successfully")
         except Exception as e:
@@ -113,7 +135,7 @@ class MobileSyncSystem:
                 device_id = str(uuid.uuid4())
                 sync_token = self.generate_sync_token()
                 
-                conn = sqlite3.connect(self.db_path)
+                conn = get_connection(self.db_path)
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT INTO mobile_devices 
@@ -154,7 +176,7 @@ class MobileSyncSystem:
                 
                 fragment_id = str(uuid.uuid4())
                 
-                conn = sqlite3.connect(self.db_path)
+                conn = get_connection(self.db_path)
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT INTO mobile_dream_fragments 
@@ -185,6 +207,37 @@ class MobileSyncSystem:
                 logging.error(f"Error submitting dream fragment: {str(e)}")
                 return jsonify({'error': str(e)}), 500
         
+        @self.app.route('/mobile/api/submit_dreams', methods=['POST'])
+        def submit_dream_fragments():
+            """Submit a batch of fragments captured offline; each needs a device-chosen client_key
+
+            All new fragments are stored in one transaction. Items already uploaded under the same
+            client_key come back as 'duplicate' with their original fragment_id, so retries are safe.
+            """
+            try:
+                data = request.json or {}
+                device_id = data.get('device_id')
+                fragments = data.get('fragments') or []
+                if not isinstance(fragments, list):
+                    return jsonify({'error': 'fragments must be a list'}), 400
+                if len(fragments) > MAX_BATCH_FRAGMENTS:
+                    return jsonify({'error': f'At most {MAX_BATCH_FRAGMENTS} fragments per batch'}), 413
+                
+                conn = get_connection(self.db_path)
+                try:
+                    if not self.verify_device(device_id, data.get('sync_token'), conn):
+                        return jsonify({'error': 'Invalid device or token'}), 401
+                    results = self.store_fragment_batch(conn, device_id, fragments)
+                finally:
+                    conn.close()
+                
+                counts = {status: sum(1 for r in results if r['status'] == status)
+                          for status in ('created', 'duplicate', 'rejected')}
+                return jsonify({'status': 'success', 'counts': counts, 'results': results})
+            except Exception as e:
+                logging.error(f"Error submitting dream fragment batch: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+        
         @self.app.route('/mobile/api/sync_status', methods=['GET'])
         def get_sync_status():
             """Get sync status for a device"""
@@ -195,7 +248,7 @@ class MobileSyncSystem:
                 if not self.verify_device(device_id, sync_token):
                     return jsonify({'error': 'Invalid device or token'}), 401
                 
-                conn = sqlite3.connect(self.db_path)
+                conn = get_connection(self.db_path)
                 cursor = conn.cursor()
                 
                 # Get device info
@@ -240,7 +293,7 @@ class MobileSyncSystem:
         
         @self.app.route('/mobile/api/get_dreams', methods=['GET'])
         def get_dreams():
-            """Get dreams for mobile device"""
+            """Get dreams for mobile device; with since=<cursor> only what changed after that cursor"""
             try:
                 device_id = request.args.get('device_id')
                 sync_token = request.args.get('sync_token')
@@ -248,33 +301,22 @@ class MobileSyncSystem:
                 if not self.verify_device(device_id, sync_token):
                     return jsonify({'error': 'Invalid device or token'}), 401
                 
-                conn = sqlite3.connect(self.db_path)
+                if request.args.get('since') is not None:
+                    try:
+                        since = int(request.args['since'] or 0)
+                    except ValueError:
+                        return jsonify({'error': 'Invalid cursor'}), 400
+                    limit = max(1, min(request.args.get('limit', SYNC_PAGE_SIZE, type=int), MAX_SYNC_PAGE_SIZE))
+                    return jsonify(self.dream_changes(device_id, since, limit))
+                
+                conn = get_connection(self.db_path)
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT * FROM Dreams 
+                cursor.execute(f'''
+                    SELECT {DREAM_SELECT} FROM Dreams 
                     ORDER BY Date DESC 
                     LIMIT 50
                 ''')
-                
-                dreams = []
-                for row in cursor.fetchall():
-                    dreams.append({
-                        'entry_id': row[0],
-                        'date': row[1],
-                        'summary': row[2],
-                        'who': row[3],
-                        'what': row[4],
-                        'where': row[5],
-                        'when': row[6],
-                        'why': row[7],
-                        'how': row[8],
-                        'symbols': row[9],
-                        'themes': row[10],
-                        'ai_connection': row[11],
-                        'emotional_vibe': row[12],
-                        'tags': row[13]
-                    })
-                
+                dreams = [dict(zip((field for field, _ in DREAM_FIELDS), row)) for row in cursor.fetchall()]
                 conn.close()
                 
                 return jsonify(dreams)
@@ -293,7 +335,7 @@ class MobileSyncSystem:
                 if not self.verify_device(device_id, sync_token):
                     return jsonify({'error': 'Invalid device or token'}), 401
                 
-                conn = sqlite3.connect(self.db_path)
+                conn = get_connection(self.db_path)
                 cursor = conn.cursor()
                 
                 # Get pending fragments
@@ -339,45 +381,141 @@ class MobileSyncSystem:
                 'service': 'mobile_sync_system'
             })
     
-    def verify_device(self, device_id, sync_token):
-        """Verify device and sync token"""
+    def verify_device(self, device_id, sync_token, conn=None):
+        """Verify device and sync token (on conn when given, otherwise on a connection of its own)"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            own_conn = conn is None
+            if own_conn:
+                conn = get_connection(self.db_path)
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT device_id FROM mobile_devices 
                 WHERE device_id = ? AND sync_token = ? AND is_active = 1
             ''', (device_id, sync_token))
             result = cursor.fetchone()
-            conn.close()
+            if own_conn:
+                conn.close()
             return result is not None
         except Exception as e:
             logging.error(f"Error verifying device: {str(e)}")
             return False
     
+    def dream_changes(self, device_id, since, limit):
+        """One page of the Dreams change log after cursor since: current rows for upserts, ids for deletes
+
+        The device stores 'cursor' and passes it as since next time (0 for a first sync);
+        'more' means another page is waiting. Until the Dreams table (and with it the change log)
+        exists there is nothing to sync: an empty page with cursor 0.
+        """
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        if not self.has_change_log(cursor):
+            # Dreams may have been created since startup; its pending migrations add the change log
+            run_migrations(conn, 'dreams')
+            if not self.has_change_log(cursor):
+                conn.close()
+                return {'dreams': [], 'deleted': [], 'cursor': '0', 'more': False}
+        cursor.execute(f'''
+            SELECT c.change_seq, c.entry_id, c.op, {', '.join('d.' + column for _, column in DREAM_FIELDS)}
+            FROM dreams_changes c LEFT JOIN Dreams d ON d.EntryID = c.entry_id
+            WHERE c.change_seq > ? ORDER BY c.change_seq LIMIT ?
+        ''', (since, limit + 1))
+        rows = cursor.fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        
+        dreams, deleted = [], []
+        for change_seq, entry_id, op, *values in rows:
+            if op == 'delete' or values[0] is None:
+                deleted.append(entry_id)
+            else:
+                dreams.append(dict(zip((field for field, _ in DREAM_FIELDS), values)))
+        next_cursor = rows[-1][0] if rows else since
+        
+        cursor.execute('UPDATE mobile_devices SET last_sync = ? WHERE device_id = ?',
+                       (datetime.now().isoformat(), device_id))
+        conn.commit()
+        conn.close()
+        return {'dreams': dreams, 'deleted': deleted, 'cursor': str(next_cursor), 'more': more}
+    
+    def has_change_log(self, cursor):
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'dreams_changes'")
+        return cursor.fetchone() is not None
+    
     def generate_sync_token(self):
         """Generate a secure sync token"""
         return hashlib.sha256(f"{uuid.uuid4()}{datetime.now().isoformat()}".encode()).hexdigest()
     
-    def log_sync_event(self, device_id, sync_type, status, message):
-        """Log sync event"""
+    def store_fragment_batch(self, conn, device_id, fragments):
+        """Insert a batch of fragments and its sync-log row in one transaction; returns per-item results"""
+        now = datetime.now().isoformat()
+        cursor = conn.cursor()
+        results = []
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor.execute('BEGIN')
+            for index, item in enumerate(fragments):
+                client_key = item.get('client_key') if isinstance(item, dict) else None
+                if not client_key or not item.get('summary'):
+                    results.append({'index': index, 'client_key': client_key, 'status': 'rejected',
+                                    'error': 'client_key and summary are required'})
+                    continue
+                fragment_id = str(uuid.uuid4())
+                cursor.execute(FRAGMENT_INSERT_SQL, (
+                    fragment_id,
+                    device_id,
+                    item['summary'],
+                    item.get('symbols', ''),
+                    item.get('themes', ''),
+                    item.get('emotional_vibe', 'neutral'),
+                    item.get('ai_connection', ''),
+                    item.get('tags', ''),
+                    item.get('created_at') or now,
+                    client_key
+                ))
+                if cursor.rowcount:
+                    results.append({'index': index, 'client_key': client_key, 'fragment_id': fragment_id,
+                                    'status': 'created'})
+                    continue
+                cursor.execute('SELECT fragment_id FROM mobile_dream_fragments WHERE device_id = ? AND client_key = ?',
+                               (device_id, client_key))
+                results.append({'index': index, 'client_key': client_key, 'fragment_id': cursor.fetchone()[0],
+                                'status': 'duplicate'})
+            created = sum(1 for r in results if r['status'] == 'created')
+            self.log_sync_event(device_id, 'dream_batch_submission', 'success',
+                                f'{len(fragments)} fragments: {created} created, '
+                                f'{sum(1 for r in results if r["status"] == "duplicate")} duplicate, '
+                                f'{sum(1 for r in results if r["status"] == "rejected")} rejected',
+                                cursor=cursor)
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        return results
+    
+    def log_sync_event(self, device_id, sync_type, status, message, cursor=None):
+        """Log sync event (inside the caller's transaction when a cursor is given)"""
+        try:
+            own_conn = cursor is None
+            if own_conn:
+                conn = get_connection(self.db_path)
+                cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO mobile_sync_log 
                 (device_id, sync_type, status, message, timestamp)
                 VALUES (?, ?, ?, ?, ?)
             ''', (device_id, sync_type, status, message, datetime.now().isoformat()))
-            conn.commit()
-            conn.close()
+            if own_conn:
+                conn.commit()
+                conn.close()
         except Exception as e:
+            if not own_conn:
+                raise
             logging.error(f"Error logging sync event: {str(e)}")
     
     def process_dream_fragment(self, fragment):
         """Process dream fragment and add to main Dreams table"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             
             # Generate entry ID
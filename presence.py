@@ -0,0 +1,170 @@
+# ID: [WOLFIE_AGI_UI_PRESENCE_20250923_001]
+# SUPERPOSITIONALLY: [dream_data_analysis, quantum_tabs, multi_agent_coordination, bridge_crew_tracking, web_node_system, presence, real_time_communication]
+# DATE: 2025-09-23
+# TITLE: presence.py — Agent Presence Registry for the Web Node Server
+# WHO: WOLFIE (Eric) - Project Architect & Dream Architect
+# WHAT: Socket index, heartbeat TTL expiry and versioned presence deltas
+# WHERE: C:\START\WOLFIE_AGI_UI\
+# WHEN: 2025-09-23, 11:00 AM CDT (Sioux Falls Timezone)
+# WHY: Disconnects must not scan every agent, silent agents must go offline, and fan-out must track changes only
+# HOW: sid->agent and agent->sids maps, TimerWheel for heartbeat TTLs, versioned deltas (optionally cluster-wide)
+# HELP: Contact WOLFIE for presence or agent status issues
+# AGAPE: Love, patience, kindness, humility in multi-agent collaboration
+
+import time
+import threading
+from datetime import datetime
+from timer_wheel import TimerWheel
+
+PRIVATE_FIELDS = ('socket_id',)
+
+
+def agent_room(agent_id):
+    """Socket.IO room joined by every socket of an agent"""
+    return f'agent:{agent_id}'
+
+
+def public_view(agent_data):
+    return {k: v for k, v in agent_data.items() if k not in PRIVATE_FIELDS}
+
+
+class Presence:
+    """Tracks which agents are online, through which sockets, and publishes changes as deltas"""
+
+    def __init__(self, agents=None, ttl=90, clock=time.time, backend=None):
+        self.agents = agents if agents is not None else {}
+        # With a shared backend (see cluster.py) versions and the agent directory span all workers
+        self.backend = backend
+        self.ttl = ttl
+        self.clock = clock
+        self.sid_index = {}
+        self.agent_sockets = {}
+        self.capability_index = {}
+        self.version = 0
+        self.wheel = TimerWheel(slots=max(8, int(ttl) + 2), tick_seconds=1.0, start=clock())
+        self._lock = threading.RLock()
+
+    def _delta(self, op, agent_data):
+        view = public_view(agent_data)
+        if self.backend is not None:
+            self.version = self.backend.next_version()
+            self.backend.put('agents', view['agent_id'], view)
+        else:
+            self.version += 1
+        return {'version': self.version, 'op': op, 'agent': view}
+
+    def attach(self, agent_data, sid):
+        """Register or refresh an agent on a socket; returns the delta to broadcast"""
+        agent_id = agent_data['agent_id']
+        with self._lock:
+            existing = self.agents.get(agent_id)
+            if existing is not None:
+                for capability in set(existing.get('capabilities') or ()) - set(agent_data.get('capabilities') or ()):
+                    self.capability_index.get(capability, set()).discard(agent_id)
+                existing.update(agent_data)
+                agent_data = existing
+            for capability in agent_data.get('capabilities') or ():
+                self.capability_index.setdefault(capability, set()).add(agent_id)
+            self.agents[agent_id] = agent_data
+            agent_data['socket_id'] = sid
+            self.sid_index[sid] = agent_id
+            self.agent_sockets.setdefault(agent_id, set()).add(sid)
+            self.wheel.schedule(agent_id, self.clock() + self.ttl)
+            return self._delta('upsert', agent_data)
+
+    def restore(self, agent_data):
+        """Load a persisted agent as offline without a delta (used at startup, before any socket)"""
+        agent_id = agent_data['agent_id']
+        with self._lock:
+            if agent_id in self.agents:
+                return
+            agent_data['status'] = 'offline'
+            self.agents[agent_id] = agent_data
+            for capability in agent_data.get('capabilities') or ():
+                self.capability_index.setdefault(capability, set()).add(agent_id)
+            if self.backend is not None and self.backend.get('agents', agent_id) is None:
+                # Another worker may already have the agent online; only fill in unknown agents
+                self.backend.put('agents', agent_id, public_view(agent_data))
+
+    def touch(self, agent_id, changes=None):
+        """Record a heartbeat; returns a delta only when visible fields changed"""
+        with self._lock:
+            agent_data = self.agents.get(agent_id)
+            if agent_data is None:
+                return None
+            self.wheel.schedule(agent_id, self.clock() + self.ttl)
+            changed = False
+            if agent_data.get('status') == 'offline':
+                agent_data['status'] = 'active'
+                changed = True
+            for key, value in (changes or {}).items():
+                if key in PRIVATE_FIELDS or key == 'timestamp':
+                    continue
+                if agent_data.get(key) != value:
+                    agent_data[key] = value
+                    changed = True
+            agent_data['last_seen'] = datetime.now().isoformat()
+            return self._delta('upsert', agent_data) if changed else None
+
+    def detach(self, sid):
+        """Drop a socket; the agent goes offline when its last socket closes. O(1)."""
+        with self._lock:
+            agent_id = self.sid_index.pop(sid, None)
+            if agent_id is None:
+                return None
+            sockets = self.agent_sockets.get(agent_id, set())
+            sockets.discard(sid)
+            agent_data = self.agents.get(agent_id)
+            if sockets:
+                if agent_data is not None and agent_data.get('socket_id') == sid:
+                    agent_data['socket_id'] = next(iter(sockets))
+                return None
+            self.agent_sockets.pop(agent_id, None)
+            self.wheel.cancel(agent_id)
+            if agent_data is None:
+                return None
+            agent_data.pop('socket_id', None)
+            agent_data['last_seen'] = datetime.now().isoformat()
+            if agent_data.get('status') == 'offline':
+                return None
+            agent_data['status'] = 'offline'
+            return self._delta('upsert', agent_data)
+
+    def expire(self):
+        """Mark agents whose heartbeat TTL lapsed as offline; returns their deltas"""
+        with self._lock:
+            deltas = []
+            for agent_id in self.wheel.advance(self.clock()):
+                agent_data = self.agents.get(agent_id)
+                if agent_data is None or agent_data.get('status') == 'offline':
+                    continue
+                # Sockets stay indexed: a late heartbeat on the same socket brings the agent back
+                agent_data['status'] = 'offline'
+                deltas.append(self._delta('upsert', agent_data))
+            return deltas
+
+    def agents_with(self, capability):
+        """Ids of every known agent (online or not) that declared a capability"""
+        return set(self.capability_index.get(capability, ()))
+
+    def sockets_for(self, agent_id):
+        return set(self.agent_sockets.get(agent_id, ()))
+
+    def agent_for_sid(self, sid):
+        return self.sid_index.get(sid)
+
+    def is_online(self, agent_id):
+        """True when the agent has a socket on this worker or is online on another one"""
+        if self.agent_sockets.get(agent_id):
+            return True
+        if self.backend is not None:
+            record = self.backend.get('agents', agent_id)
+            return record is not None and record.get('status') != 'offline'
+        return False
+
+    def snapshot(self):
+        """Full presence state, for clients that missed a delta"""
+        if self.backend is not None:
+            return {'version': self.backend.current_version(), 'agents': self.backend.values('agents')}
+        with self._lock:
+            return {'version': self.version, 'agents': [public_view(a) for a in self.agents.values()]}
@@ -0,0 +1,171 @@
+# ID: [WOLFIE_AGI_UI_SCHEMA_MIGRATIONS_20250923_001]
+# SUPERPOSITIONALLY: [dream_data_analysis, quantum_tabs, multi_agent_coordination, bridge_crew_tracking, database, sqlite, schema_migrations]
+# DATE: 2025-09-23
+# TITLE: schema_migrations.py — Versioned SQLite Schema Migrations
+# WHO: WOLFIE (Eric) - Project Architect & Dream Architect
+# WHAT: Ordered, recorded migrations shared by the Python services (hot-path indexes first)
+# WHERE: C:\START\WOLFIE_AGI_UI\
+# WHEN: 2025-09-23, 12:00 PM CDT (Sioux Falls Timezone)
+# WHY: Every filtered/ordered query needs a supporting index, and schema changes need a recorded version
+# HOW: Per-schema migration lists applied once each inside a transaction, tracked in schema_migrations
+# HELP: Contact WOLFIE for schema upgrade or migration issues
+# AGAPE: Love, patience, kindness, humility in evolving our data model
+
+import sqlite3
+import logging
+from datetime import datetime
+
+# Each schema is owned by the service that creates its tables; versions are independent per schema.
+# Entries are (version, name, table the migration depends on, statements).
+MIGRATIONS = {
+    'dreams': [
+        (1, 'index_dreams_date', 'Dreams', [
+            'CREATE INDEX IF NOT EXISTS idx_dreams_date ON Dreams (Date)',
+        ]),
+        # One row per entry holding its latest change; change_seq only grows, so it is the sync cursor
+        (2, 'dreams_change_log', 'Dreams', [
+            '''CREATE TABLE IF NOT EXISTS dreams_changes (
+                change_seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                entry_id TEXT NOT NULL,
+                op TEXT NOT NULL,
+                changed_at TEXT
+            )''',
+            'CREATE UNIQUE INDEX IF NOT EXISTS idx_dreams_changes_entry ON dreams_changes (entry_id)',
+            '''CREATE TRIGGER IF NOT EXISTS dreams_change_insert AFTER INSERT ON Dreams BEGIN
+                DELETE FROM dreams_changes WHERE entry_id = NEW.EntryID;
+                INSERT INTO dreams_changes (entry_id, op, changed_at) VALUES (NEW.EntryID, 'upsert', datetime('now'));
+            END''',
+            '''CREATE TRIGGER IF NOT EXISTS dreams_change_update AFTER UPDATE ON Dreams BEGIN
+                DELETE FROM dreams_changes WHERE entry_id IN (OLD.EntryID, NEW.EntryID);
+                INSERT INTO dreams_changes (entry_id, op, changed_at)
+                    SELECT OLD.EntryID, 'delete', datetime('now') WHERE OLD.EntryID != NEW.EntryID;
+                INSERT INTO dreams_changes (entry_id, op, changed_at) VALUES (NEW.EntryID, 'upsert', datetime('now'));
+            END''',
+            '''CREATE TRIGGER IF NOT EXISTS dreams_change_delete AFTER DELETE ON Dreams BEGIN
+                DELETE FROM dreams_changes WHERE entry_id = OLD.EntryID;
+                INSERT INTO dreams_changes (entry_id, op, changed_at) VALUES (OLD.EntryID, 'delete', datetime('now'));
+            END''',
+            # Existing entries become the first changes, so a device's initial sync (since=0) uses the same path
+            '''INSERT OR IGNORE INTO dreams_changes (entry_id, op, changed_at)
+                SELECT EntryID, 'upsert', datetime('now') FROM Dreams ORDER BY Date''',
+        ]),
+    ],
+    'mobile_sync': [
+        (1, 'index_fragments_device_status', 'mobile_dream_fragments', [
+            'CREATE INDEX IF NOT EXISTS idx_mobile_fragments_device_status '
+            'ON mobile_dream_fragments (device_id, sync_status)',
+        ]),
+        (2, 'index_sync_log_device_time', 'mobile_sync_log', [
+            'CREATE INDEX IF NOT EXISTS idx_mobile_sync_log_device_time ON mobile_sync_log (device_id, timestamp)',
+        ]),
+        (3, 'fragments_client_key', 'mobile_dream_fragments', [
+            # Idempotency key chosen by the device, so a retried offline upload is not stored twice
+            'ALTER TABLE mobile_dream_fragments ADD COLUMN client_key TEXT',
+            'CREATE UNIQUE INDEX IF NOT EXISTS idx_mobile_fragments_client_key '
+            'ON mobile_dream_fragments (device_id, client_key)',
+        ]),
+    ],
+    'convergence': [
+        (1, 'index_assessments_time_divergence', 'convergence_assessments', [
+            'CREATE INDEX IF NOT EXISTS idx_assessments_time_divergence '
+            'ON convergence_assessments (assessment_timestamp, divergence_level)',
+        ]),
+        (2, 'index_interventions_agent_status', 'convergence_interventions', [
+            'CREATE INDEX IF NOT EXISTS idx_interventions_agent_status ON convergence_interventions (agent_id, status)',
+            'CREATE INDEX IF NOT EXISTS idx_interventions_status_time '
+            'ON convergence_interventions (status, intervention_timestamp)',
+        ]),
+        (3, 'index_metrics_time', 'convergence_metrics', [
+            'CREATE INDEX IF NOT EXISTS idx_convergence_metrics_time ON convergence_metrics (metric_timestamp)',
+        ]),
+    ],
+    'web_nodes': [
+        (1, 'index_messages_to_agent_time', 'messages', [
+            'CREATE INDEX IF NOT EXISTS idx_messages_to_agent_time ON messages (to_agent, timestamp)',
+        ]),
+        (2, 'index_messages_history_filters', 'messages', [
+            'CREATE INDEX IF NOT EXISTS idx_messages_from_agent_time ON messages (from_agent, timestamp)',
+            'CREATE INDEX IF NOT EXISTS idx_messages_type_time ON messages (message_type, timestamp)',
+            'CREATE INDEX IF NOT EXISTS idx_messages_time ON messages (timestamp)',
+        ]),
+        (3, 'tasks_dispatch_columns', 'tasks', [
+            'ALTER TABLE tasks ADD COLUMN required_capability TEXT',
+            'ALTER TABLE tasks ADD COLUMN assigned_at TEXT',
+            'ALTER TABLE tasks ADD COLUMN completed_at TEXT',
+            'CREATE INDEX IF NOT EXISTS idx_tasks_status_priority ON tasks (status, priority)',
+        ]),
+        (4, 'tasks_escalations', 'tasks', [
+            'ALTER TABLE tasks ADD COLUMN escalations INTEGER DEFAULT 0',
+        ]),
+        (5, 'agent_capability_index', 'agent_capabilities', [
+            'CREATE INDEX IF NOT EXISTS idx_agent_capabilities_agent ON agent_capabilities (agent_id)',
+            'CREATE INDEX IF NOT EXISTS idx_agents_status ON agents (status, agent_id)',
+            # Backfill from the JSON blob registrations were stored in until now
+            'INSERT OR IGNORE INTO agent_capabilities (capability, agent_id) '
+            'SELECT json_each.value, agents.agent_id FROM agents, json_each(agents.capabilities) '
+            'WHERE json_valid(agents.capabilities)',
+        ]),
+    ],
+}
+
+
+def init_migrations_table(conn):
+    """Create the table recording which migrations each schema has applied"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            schema_name TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            name TEXT,
+            applied_at TEXT,
+            PRIMARY KEY (schema_name, version)
+        )
+    ''')
+    conn.commit()
+
+
+def table_exists(conn, table):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone() is not None
+
+
+def schema_version(conn, schema):
+    """Highest applied migration version for a schema (0 when none)"""
+    row = conn.execute(
+        'SELECT MAX(version) FROM schema_migrations WHERE schema_name = ?', (schema,)
+    ).fetchone()
+    return row[0] or 0
+
+
+def run_migrations(conn, schema):
+    """Apply pending migrations for a schema in version order and return the resulting version"""
+    init_migrations_table(conn)
+    applied = {row[0] for row in conn.execute(
+        'SELECT version FROM schema_migrations WHERE schema_name = ?', (schema,))}
+
+    for version, name, table, statements in MIGRATIONS[schema]:
+        if version in applied:
+            continue
+        if not table_exists(conn, table):
+            # Left pending with every later version, so versions are always applied in order;
+            # they run on the first startup after the owning table appears
+            logging.info(f"Migration {schema}/{version} ({name}) waiting for table {table}")
+            break
+        try:
+            conn.execute('BEGIN')
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute('''
+                INSERT INTO schema_migrations (schema_name, version, name, applied_at)
+                VALUES (?, ?, ?, ?)
+            ''', (schema, version, name, datetime.now().isoformat()))
+            conn.execute('COMMIT')
+            logging.info(f"Applied migration {schema}/{version}: {name}")
+        except sqlite3.Error as e:
+            conn.execute('ROLLBACK')
+            logging.error(f"Error applying migration {schema}/{version} ({name}): {str(e)}")
+            break
+
+    version = schema_version(conn, schema)
+    logging.info(f"Schema {schema} at version {version}")
+    return version
@@ -0,0 +1,308 @@
+# ID: [WOLFIE_AGI_UI_SERVICE_METRICS_20250923_001]
+# SUPERPOSITIONALLY: [dream_data_analysis, quantum_tabs, multi_agent_coordination, bridge_crew_tracking, monitoring, metrics, performance]
+# DATE: 2025-09-23
+# TITLE: service_metrics.py — Shared Prometheus-style Instrumentation
+# WHO: WOLFIE (Eric) - Project Architect & Dream Architect
+# WHAT: Counters, gauges and latency histograms shared by every Python service, served at /metrics
+# WHERE: C:\START\WOLFIE_AGI_UI\
+# WHEN: 2025-09-23, 12:00 PM CDT (Sioux Falls Timezone)
+# WHY: Find hot paths and plan capacity from real latency and throughput data instead of log lines
+# HOW: Thread-safe in-process registry rendered in the Prometheus text exposition format
+# HELP: Contact WOLFIE for monitoring setup or dashboard integration issues
+# AGAPE: Love, patience, kindness, humility in observing our systems
+
+import time
+import math
+import inspect
+import logging
+import threading
+import functools
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        escaped.append(f'{name}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class holding one value set per label combination"""
+
+    metric_type = 'untyped'
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.metric_type}']
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f'{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}']
+
+
+class Counter(_Metric):
+    metric_type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    metric_type = 'gauge'
+
+    def __init__(self, name, documentation, label_names=(), callback=None):
+        super().__init__(name, documentation, label_names)
+        self._callbacks = {}
+        if callback is not None:
+            self.add_callback(callback)
+
+    def add_callback(self, callback, **labels):
+        """Sample callback() at scrape time for one label set (e.g. one queue of several)"""
+        with self._lock:
+            self._callbacks[self._key(labels)] = callback
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self):
+        with self._lock:
+            callbacks = list(self._callbacks.items())
+        for key, callback in callbacks:
+            # Sizes of live structures are read at scrape time, never tracked on the hot path
+            try:
+                value = callback()
+            except Exception as e:
+                logging.error(f"Error reading gauge {self.name}: {str(e)}")
+                continue
+            with self._lock:
+                self._values[key] = value
+        return super().render()
+
+
+class Histogram(_Metric):
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_sample(self, key, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.label_names, key, ('le', _format_value(bound)))
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.label_names, key)
+        lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+        lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of named metrics for one process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name, documentation, label_names=()):
+        return self._get_or_create(Counter, name, documentation, label_names)
+
+    def gauge(self, name, documentation, label_names=(), callback=None, labels=None):
+        """Get or create a gauge; callback (with labels, for per-instance gauges) is sampled at scrape time"""
+        gauge = self._get_or_create(Gauge, name, documentation, label_names)
+        if callback is not None:
+            gauge.add_callback(callback, **(labels or {}))
+        return gauge
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, label_names, buckets)
+
+    def render(self):
+        """Render every metric in the text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route', ('method', 'route', 'status'))
+SOCKETIO_EVENT_SECONDS = REGISTRY.histogram(
+    'socketio_event_duration_seconds', 'Socket.IO handler latency by event', ('event',))
+SOCKETIO_EVENT_ERRORS = REGISTRY.counter(
+    'socketio_event_errors_total', 'Socket.IO handlers that raised', ('event',))
+SQLITE_QUERY_SECONDS = REGISTRY.histogram(
+    'sqlite_query_duration_seconds', 'SQLite statement execution time', ('operation',))
+FERNET_SECONDS = REGISTRY.histogram(
+    'fernet_duration_seconds', 'Fernet encrypt/decrypt time', ('operation',))
+
+
+def track_size(name, documentation, func):
+    """Expose len()/depth of an in-memory structure, sampled at scrape time"""
+    return REGISTRY.gauge(name, documentation, callback=func)
+
+
+def instrument_flask(app, registry=REGISTRY):
+    """Record per-route latency and serve the registry at /metrics"""
+    from flask import Response, request, g
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_latency(response):
+        start = getattr(g, '_metrics_start', None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=request.method, route=route, status=response.status_code
+            )
+        return response
+
+    def metrics_view():
+        return Response(registry.render(), mimetype=CONTENT_TYPE)
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    return app
+
+
+EVENT_TAPS = []
+
+
+def add_event_tap(tap):
+    """Call tap(event, args, elapsed, error) after every timed_event handler (e.g. traffic recording)"""
+    EVENT_TAPS.append(tap)
+
+
+def timed_event(event):
+    """Decorator timing a Socket.IO handler; place it below @socketio.on"""
+    def decorator(handler):
+        signature = inspect.signature(handler)
+
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            # Flask-SocketIO probes handler arity (handler(auth), then handler() on TypeError);
+            # a call the handler cannot accept is neither an error nor an observation
+            signature.bind(*args, **kwargs)
+            start = time.perf_counter()
+            error = None
+            try:
+                return handler(*args, **kwargs)
+            except Exception as e:
+                SOCKETIO_EVENT_ERRORS.inc(event=event)
+                error = e
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                SOCKETIO_EVENT_SECONDS.observe(elapsed, event=event)
+                for tap in EVENT_TAPS:
+                    try:
+                        tap(event, args, elapsed, error)
+                    except Exception as e:
+                        logging.error(f"Error in event tap for {event}: {str(e)}")
+        return wrapper
+    return decorator
+
+
+def start_metrics_server(port, host='0.0.0.0', registry=REGISTRY):
+    """Serve /metrics from a daemon thread for services without a web framework"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logging.info(f"Metrics server listening on {host}:{port}/metrics")
+    return server
@@ -22,6 +22,9 @@ from datetime import datetime, timedelta
 import numpy as np
 from flask import Flask, render_template, jsonify, request
 import logging
+from db_connection import get_connection
+from schema_migrations import run_migrations
+from service_metrics import instrument_flask
 
 class StorytellingDashboard:
     """Storytelling Dashboard for Dream Data Visualization"""
@@ -32,6 +35,8 @@ class StorytellingDashboard:
         self.app = Flask(__name__)
         self.setup_routes()
         self.setup_logging()
+        instrument_flask(self.app)
+        self.init_database()
     
     def setup_logging(self):
         """Setup logging for the storytelling dashboard"""
@@ -41,6 +46,15 @@ class StorytellingDashboard:
             format='%(asctime)s - %(levelname)s - %(message)s'
         )
     
+    def init_database(self):
+        """Apply pending Dreams schema migrations (timeline queries order by Date)"""
+        try:
+            conn = get_connection(self.db_path)
+            run_migrations(conn, 'dreams')
+            conn.close()
+        except Exception as e:
+            logging.error(f"Error migrating storytelling database: {str(e)}")
+    
     def setup_routes(self):
         """Setup Flask routes for the storytelling dashboard"""
         
@@ -53,7 +67,7 @@ class StorytellingDashboard:
         def get_timeline_data():
             """Get timeline data for dream entries"""
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = get_connection(self.db_path)
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT EntryID, Date, Summary, Emotional_Vibe, Tags, AI_Connection
@@ -82,7 +96,7 @@ class StorytellingDashboard:
         def get_emotional_arcs():
             """Get emotional arc data"""
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = get_connection(self.db_path)
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT EntryID, Date, Emotional_Vibe, Summary
@@ -109,7 +123,7 @@ class StorytellingDashboard:
         def get_theme_analysis():
             """Get theme analysis data"""
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = get_connection(self.db_path)
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT Tags, Themes, AI_Connection, COUNT(*) as frequency
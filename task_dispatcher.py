@@ -0,0 +1,288 @@
+# ID: [WOLFIE_AGI_UI_TASK_DISPATCHER_20250923_001]
+# SUPERPOSITIONALLY: [dream_data_analysis, quantum_tabs, multi_agent_coordination, bridge_crew_tracking, web_node_system, task_dispatch, scheduling]
+# DATE: 2025-09-23
+# TITLE: task_dispatcher.py — Capability-Aware Priority Task Dispatcher
+# WHO: WOLFIE (Eric) - Project Architect & Dream Architect
+# WHAT: Per-priority queues, capability->agents index and least-loaded assignment
+# WHERE: C:\START\WOLFIE_AGI_UI\
+# WHEN: 2025-09-23, 11:00 AM CDT (Sioux Falls Timezone)
+# WHY: Tasks go to one capable agent instead of being broadcast for every agent to inspect
+# HOW: A load heap per capability (lazy invalidation) picks the least-loaded agent in O(log n); unplaced tasks wait by priority
+# HELP: Contact WOLFIE for task assignment or queueing issues
+# AGAPE: Love, patience, kindness, humility in multi-agent collaboration
+
+import heapq
+import itertools
+import threading
+from collections import deque
+from datetime import datetime
+
+PRIORITIES = ('critical', 'high', 'medium', 'low')
+DEFAULT_PRIORITY = 'medium'
+ANY_CAPABILITY = None
+
+
+def normalize_priority(priority):
+    return priority if priority in PRIORITIES else DEFAULT_PRIORITY
+
+
+class TaskDispatcher:
+    """Assigns tasks to the least-loaded online agent that has the required capability
+
+    Every public method returns the task dicts whose status or assignee changed, so the
+    caller can persist them and notify the assignees.
+    """
+
+    def __init__(self, max_load=3, clock=datetime.now):
+        self.max_load = max_load
+        self.clock = clock
+        self.agents = {}
+        self.capability_index = {}
+        self.heaps = {}
+        self.queues = {priority: {} for priority in PRIORITIES}
+        self.pinned = {}
+        self.active = {}
+        self._seq = itertools.count()
+        self._lock = threading.RLock()
+
+    # Agent index
+
+    def add_agent(self, agent_id, capabilities):
+        """Index an online agent (or refresh its capabilities) and hand it queued work"""
+        with self._lock:
+            capabilities = set(capabilities or ())
+            record = self.agents.get(agent_id)
+            if record is None:
+                record = self.agents[agent_id] = {'capabilities': set(), 'load': 0}
+            for capability in record['capabilities'] - capabilities:
+                self.capability_index.get(capability, set()).discard(agent_id)
+            for capability in capabilities:
+                self.capability_index.setdefault(capability, set()).add(agent_id)
+            record['capabilities'] = capabilities
+            record['suspended'] = False
+            self._push(agent_id)
+            return self._fill(agent_id)
+
+    def suspend(self, agent_id):
+        """Stop giving an agent new work but let it keep its tasks (e.g. while it may reconnect)"""
+        with self._lock:
+            record = self.agents.get(agent_id)
+            if record is not None:
+                record['suspended'] = True
+
+    def is_suspended(self, agent_id):
+        record = self.agents.get(agent_id)
+        return record is not None and record.get('suspended', False)
+
+    def remove_agent(self, agent_id):
+        """Drop an agent that went offline; its unfinished tasks are requeued and re-placed"""
+        with self._lock:
+            record = self.agents.pop(agent_id, None)
+            if record is None:
+                return []
+            for capability in record['capabilities']:
+                self.capability_index.get(capability, set()).discard(agent_id)
+            changed = []
+            orphaned = [task for task in self.active.values() if task.get('assigned_to') == agent_id]
+            for task in orphaned:
+                del self.active[task['task_id']]
+                if task.get('pinned_to') == agent_id:
+                    # Explicitly assigned work waits for that agent to come back
+                    self._enqueue(task)
+                    changed.append(task)
+                else:
+                    changed.append(self._place(task))
+            return changed
+
+    def restore(self, task, capabilities=()):
+        """Re-hold an assignment loaded from storage after a restart
+
+        The assignee is indexed but suspended until it reconnects (add_agent), so it keeps
+        the task without being handed new work in the meantime.
+        """
+        with self._lock:
+            agent_id = task['assigned_to']
+            record = self.agents.get(agent_id)
+            if record is None:
+                record = self.agents[agent_id] = {'capabilities': set(capabilities or ()), 'load': 0, 'suspended': True}
+                for capability in record['capabilities']:
+                    self.capability_index.setdefault(capability, set()).add(agent_id)
+            task['priority'] = normalize_priority(task.get('priority'))
+            record['load'] += 1
+            self._push(agent_id)
+            self.active[task['task_id']] = task
+
+    def load(self, agent_id):
+        record = self.agents.get(agent_id)
+        return record['load'] if record else None
+
+    def agents_with(self, capability):
+        return set(self.capability_index.get(capability, ()))
+
+    def _push(self, agent_id):
+        record = self.agents[agent_id]
+        entry_load = record['load']
+        for capability in record['capabilities'] | {ANY_CAPABILITY}:
+            heap = self.heaps.setdefault(capability, [])
+            heapq.heappush(heap, (entry_load, next(self._seq), agent_id))
+            if len(heap) > 4 * len(self.agents) + 64:
+                self._compact(capability)
+
+    def _compact(self, capability):
+        members = self.agents if capability is ANY_CAPABILITY else self.capability_index.get(capability, ())
+        heap = [(self.agents[agent_id]['load'], next(self._seq), agent_id) for agent_id in members]
+        heapq.heapify(heap)
+        self.heaps[capability] = heap
+
+    def _least_loaded(self, capability):
+        """Least-loaded agent with spare capacity for a capability, or None"""
+        heap = self.heaps.get(capability)
+        while heap:
+            entry_load, _, agent_id = heap[0]
+            record = self.agents.get(agent_id)
+            if (record is None or record['load'] != entry_load or record.get('suspended') or
+                    (capability is not ANY_CAPABILITY and capability not in record['capabilities'])):
+                # Stale entry: the agent left or is suspended, lost the capability or its load moved on
+                heapq.heappop(heap)
+                continue
+            return agent_id if entry_load < self.max_load else None
+        return None
+
+    # Task flow
+
+    def submit(self, task):
+        """Place a new task: pinned tasks go to their agent, others to the least-loaded capable agent"""
+        with self._lock:
+            task['priority'] = normalize_priority(task.get('priority'))
+            return [self._place(task)]
+
+    def complete(self, task_id, agent_id=None, status='completed'):
+        """Finish an assigned task and give the freed capacity to queued work"""
+        with self._lock:
+            task = self.active.get(task_id)
+            if task is None:
+                raise KeyError(task_id)
+            if agent_id and task['assigned_to'] != agent_id:
+                raise ValueError(f"Task {task_id} is assigned to {task['assigned_to']}, not {agent_id}")
+            del self.active[task_id]
+            task['status'] = status
+            task['completed_at'] = self.clock().isoformat()
+            changed = [task]
+            assignee = task['assigned_to']
+            if assignee in self.agents:
+                self.agents[assignee]['load'] -= 1
+                self._push(assignee)
+                changed.extend(self._fill(assignee))
+            return changed
+
+    def reassign(self, task_id):
+        """Take a task back from its assignee and give it to another capable agent (or queue it)"""
+        with self._lock:
+            task = self.active.pop(task_id, None)
+            if task is None:
+                raise KeyError(task_id)
+            previous = task['assigned_to']
+            if previous in self.agents:
+                self.agents[previous]['load'] -= 1
+                self._push(previous)
+            agent_id = self._least_loaded(task.get('required_capability') or ANY_CAPABILITY)
+            if agent_id == previous:
+                agent_id = self._least_loaded_other(task, previous)
+            if agent_id is not None:
+                changed = [self._assign(task, agent_id)]
+            else:
+                self._enqueue(task)
+                changed = [task]
+            if previous in self.agents:
+                changed.extend(self._fill(previous))
+            return changed
+
+    def _least_loaded_other(self, task, excluded):
+        """Linear fallback for reassignment when the least-loaded agent is the one giving the task up"""
+        capability = task.get('required_capability') or ANY_CAPABILITY
+        members = self.agents if capability is ANY_CAPABILITY else self.capability_index.get(capability, ())
+        candidates = [(self.agents[agent_id]['load'], agent_id) for agent_id in members
+                      if agent_id != excluded and not self.agents[agent_id].get('suspended')]
+        if not candidates:
+            return None
+        load, agent_id = min(candidates)
+        return agent_id if load < self.max_load else None
+
+    def _assign(self, task, agent_id):
+        record = self.agents[agent_id]
+        record['load'] += 1
+        self._push(agent_id)
+        task['assigned_to'] = agent_id
+        task['status'] = 'assigned'
+        task['assigned_at'] = self.clock().isoformat()
+        self.active[task['task_id']] = task
+        return task
+
+    def _place(self, task):
+        pinned_to = task.get('pinned_to')
+        if pinned_to:
+            if pinned_to in self.agents and not self.agents[pinned_to].get('suspended'):
+                return self._assign(task, pinned_to)
+        else:
+            agent_id = self._least_loaded(task.get('required_capability') or ANY_CAPABILITY)
+            if agent_id is not None:
+                return self._assign(task, agent_id)
+        self._enqueue(task)
+        return task
+
+    def _enqueue(self, task):
+        task['assigned_to'] = ''
+        task['status'] = 'pending'
+        pinned_to = task.get('pinned_to')
+        if pinned_to:
+            self.pinned.setdefault(pinned_to, deque()).append(task)
+            return
+        capability = task.get('required_capability') or ANY_CAPABILITY
+        self.queues[task['priority']].setdefault(capability, deque()).append((next(self._seq), task))
+
+    def _fill(self, agent_id):
+        """Assign queued tasks to agent_id while it has capacity, highest priority and oldest first"""
+        changed = []
+        record = self.agents[agent_id]
+        if record.get('suspended'):
+            return changed
+        pinned = self.pinned.pop(agent_id, None)
+        while pinned:
+            changed.append(self._assign(pinned.popleft(), agent_id))
+        while record['load'] < self.max_load:
+            task = self._next_queued(record['capabilities'])
+            if task is None:
+                break
+            changed.append(self._assign(task, agent_id))
+        return changed
+
+    def _next_queued(self, capabilities):
+        for priority in PRIORITIES:
+            best = None
+            for capability in capabilities | {ANY_CAPABILITY}:
+                queue = self.queues[priority].get(capability)
+                if queue and (best is None or queue[0][0] < best[0][0]):
+                    best = queue
+            if best is not None:
+                return best.popleft()[1]
+        return None
+
+    # Introspection
+
+    def depth(self):
+        """Queued (unassigned) tasks per priority, plus pinned tasks waiting for their agent"""
+        with self._lock:
+            depth = {priority: sum(len(queue) for queue in self.queues[priority].values())
+                     for priority in PRIORITIES}
+            depth['pinned'] = sum(len(queue) for queue in self.pinned.values())
+            return depth
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queue_depth': self.depth(),
+                'assigned': len(self.active),
+                'max_load': self.max_load,
+                'agent_load': {agent_id: record['load'] for agent_id, record in self.agents.items()},
+                'capabilities': {capability: len(members) for capability, members in self.capability_index.items()}
+            }
@@ -0,0 +1,17 @@
+"""In-memory stand-in for cluster.LocalStateBackend (cluster imports python-socketio)"""
+
+
+class MemoryBackend:
+    def __init__(self):
+        self.data = {}
+
+    def incr(self, namespace, key, floor=0):
+        counters = self.data.setdefault(namespace, {})
+        counters[key] = max(counters.get(key, 0), floor) + 1
+        return counters[key]
+
+    def put(self, namespace, key, value):
+        self.data.setdefault(namespace, {})[key] = value
+
+    def get(self, namespace, key):
+        return self.data.get(namespace, {}).get(key)
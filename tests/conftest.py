@@ -0,0 +1,5 @@
+# Python unit tests for the web node modules; run from the repository root with: python -m pytest tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,74 @@
+import sqlite3
+
+import pytest
+
+from agent_mailbox import Mailbox
+from backends import MemoryBackend
+from write_behind import WriteBehindQueue
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'mailbox.db')
+    conn = sqlite3.connect(path)
+    Mailbox(path, None, None).init_tables(conn)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def make_mailbox(db_path, backend=None, page_size=2):
+    # An unstarted write-behind queue writes inline, so every store is committed on return
+    mailbox = Mailbox(db_path, WriteBehindQueue(db_path, name='test_mailbox'), backend or MemoryBackend(),
+                      page_size=page_size)
+    conn = sqlite3.connect(db_path)
+    mailbox.load_floors(conn)
+    conn.close()
+    return mailbox
+
+
+def test_store_assigns_increasing_delivery_seqs_per_agent(db_path):
+    mailbox = make_mailbox(db_path)
+    assert mailbox.store('A', {'content': 'one'})['delivery_seq'] == 1
+    assert mailbox.store('A', {'content': 'two'})['delivery_seq'] == 2
+    assert mailbox.store('B', {'content': 'other'})['delivery_seq'] == 1
+
+
+def test_seqs_continue_past_persisted_rows_after_a_restart(db_path):
+    first = make_mailbox(db_path)
+    first.store('A', {'content': 'one'})
+    first.store('A', {'content': 'two'})
+    first.ack('A', 2)
+    # A fresh backend (restarted process) must not reuse seqs that were already delivered
+    second = make_mailbox(db_path)
+    assert second.store('A', {'content': 'three'})['delivery_seq'] == 3
+
+
+def test_pages_follow_acks_and_ack_prunes_delivered_rows(db_path):
+    mailbox = make_mailbox(db_path)
+    for n in range(3):
+        mailbox.store('A', {'content': n})
+
+    messages, last_seq, more = mailbox.next_page('A')
+    assert [m['delivery_seq'] for m in messages] == [1, 2]
+    assert (last_seq, more) == (2, True)
+    assert 'A' in mailbox.replaying
+
+    mailbox.ack('A', last_seq)
+    messages, last_seq, more = mailbox.next_page('A')
+    assert [m['content'] for m in messages] == [2]
+    assert (last_seq, more) == (3, False)
+    assert 'A' not in mailbox.replaying
+
+    conn = sqlite3.connect(db_path)
+    remaining = [row[0] for row in conn.execute("SELECT seq FROM mailbox WHERE agent_id = 'A'")]
+    conn.close()
+    assert remaining == [3]
+
+
+def test_ack_never_moves_backwards(db_path):
+    mailbox = make_mailbox(db_path)
+    mailbox.store('A', {'content': 'one'})
+    mailbox.ack('A', 1)
+    mailbox.ack('A', 0)
+    assert mailbox.next_page('A') == ([], 1, False)
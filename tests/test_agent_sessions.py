@@ -0,0 +1,22 @@
+from agent_sessions import SessionRegistry
+from backends import MemoryBackend
+
+
+def test_event_seqs_survive_a_new_registry_on_the_same_backend():
+    backend = MemoryBackend()
+    first = SessionRegistry(backend)
+    first.issue('A')
+    assert first.record('A', 'task_assigned', {})['event_seq'] == 1
+    # A restarted worker (or another one) keeps counting instead of starting at 1 again
+    second = SessionRegistry(backend)
+    assert second.record('A', 'task_assigned', {})['event_seq'] == 2
+
+
+def test_new_session_changes_epoch_stamped_on_events():
+    sessions = SessionRegistry(MemoryBackend())
+    sessions.issue('A')
+    old = sessions.record('A', 'task_assigned', {'task_id': 't1'})
+    sessions.issue('A')
+    new = sessions.record('A', 'task_assigned', {'task_id': 't2'})
+    assert old['session'] != new['session']
+    assert [data['task_id'] for _, data in sessions.missed('A', old['event_seq'])] == ['t2']
@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip('socketio')
+
+from cluster import LocalStateBackend, SQLiteStateBackend
+
+
+@pytest.fixture(params=['local', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'local':
+        return LocalStateBackend()
+    return SQLiteStateBackend(str(tmp_path / 'cluster.db'))
+
+
+def test_queue_drains_in_order_and_only_once(backend):
+    for i in range(5):
+        backend.push('task_commands', ['submit', i])
+    backend.push('other', ['x'])
+    assert backend.drain('task_commands', limit=3) == [['submit', 0], ['submit', 1], ['submit', 2]]
+    assert backend.drain('task_commands') == [['submit', 3], ['submit', 4]]
+    assert backend.drain('task_commands') == []
+    assert backend.drain('other') == [['x']]
+
+
+def test_lease_has_one_owner_until_it_lapses(backend):
+    assert backend.acquire_lease('task_owner', 'a', 60)
+    assert not backend.acquire_lease('task_owner', 'b', 60)
+    assert backend.acquire_lease('task_owner', 'a', 60)
+    assert backend.acquire_lease('task_owner', 'a', -1)
+    assert backend.acquire_lease('task_owner', 'b', 60)
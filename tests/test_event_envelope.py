@@ -0,0 +1,59 @@
+import json
+import threading
+
+import pytest
+
+from event_envelope import (ENVELOPE_VERSION, EventBatcher, available_codecs, choose_codec,
+                            decode_batch, encode_batch)
+
+EVENTS = [
+    ('status_update', {'agent_id': 'A', 'status': 'active', 'current_task': 't1',
+                       'understanding_score': 0.9, 'alignment_score': 0.8,
+                       'timestamp': '2025-09-23T10:00:00.500000'}),
+    ('send_message', {'from_agent': 'A', 'to_agent': 'B', 'content': 'hi', 'message_type': 'text'}),
+    ('message_ack', {'agent_id': 'B', 'seq': 7}),
+]
+
+
+@pytest.mark.parametrize('codec', available_codecs())
+def test_batch_round_trip(codec):
+    assert decode_batch(encode_batch(EVENTS, codec), codec) == EVENTS
+
+
+def test_trailing_missing_fields_and_extras_survive():
+    events = [('dream_fragment', {'agent_id': 'A', 'summary': 's', 'fragment_id': 'F1'})]
+    payload = encode_batch(events, 'json')
+    # symbols..emotional_vibe are omitted on the wire rather than sent as nulls
+    assert json.loads(payload)[1][0][1] == ['A', 's']
+    assert decode_batch(payload, 'json') == events
+
+
+def test_unknown_event_codes_are_skipped_and_versions_checked():
+    payload = json.dumps([ENVELOPE_VERSION, [[99, ['x']], [4, ['A', 3]]]]).encode()
+    assert decode_batch(payload, 'json') == [('message_ack', {'agent_id': 'A', 'seq': 3})]
+    with pytest.raises(ValueError):
+        decode_batch(json.dumps([ENVELOPE_VERSION + 1, []]).encode(), 'json')
+
+
+def test_choose_codec_prefers_the_peer_order():
+    assert choose_codec(['json']) == 'json'
+    assert choose_codec(['cbor']) is None
+    assert choose_codec(None) is None
+
+
+def test_batcher_flushes_in_order_when_full():
+    frames = []
+    batcher = EventBatcher(frames.append, max_events=2, max_delay=60)
+    for seq in range(5):
+        batcher.add('message_ack', {'agent_id': 'A', 'seq': seq})
+    assert [[data['seq'] for _, data in frame] for frame in frames] == [[0, 1], [2, 3]]
+    batcher.flush()
+    assert [data['seq'] for _, data in frames[-1]] == [4]
+    assert len(batcher) == 0
+
+
+def test_batcher_flushes_after_max_delay():
+    sent = threading.Event()
+    batcher = EventBatcher(lambda events: sent.set(), max_events=10, max_delay=0.01)
+    batcher.add('message_ack', {'agent_id': 'A', 'seq': 1})
+    assert sent.wait(1)
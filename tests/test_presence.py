@@ -0,0 +1,69 @@
+from backends import MemoryBackend
+from presence import Presence
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def agent(agent_id, **fields):
+    return dict({'agent_id': agent_id, 'status': 'active', 'capabilities': ['code']}, **fields)
+
+
+def test_attach_publishes_versioned_delta_without_private_fields():
+    presence = Presence(clock=FakeClock())
+    delta = presence.attach(agent('A'), 'sid-1')
+    assert delta['version'] == 1
+    assert delta['op'] == 'upsert'
+    assert 'socket_id' not in delta['agent']
+    assert presence.agent_for_sid('sid-1') == 'A'
+    assert presence.agents_with('code') == {'A'}
+
+
+def test_agent_goes_offline_only_when_its_last_socket_closes():
+    presence = Presence(clock=FakeClock())
+    presence.attach(agent('A'), 'sid-1')
+    presence.attach(agent('A'), 'sid-2')
+    assert presence.detach('sid-1') is None
+    assert presence.is_online('A')
+    delta = presence.detach('sid-2')
+    assert delta['agent']['status'] == 'offline'
+    assert not presence.is_online('A')
+    assert presence.detach('sid-2') is None
+
+
+def test_heartbeat_ttl_expiry_and_recovery():
+    clock = FakeClock()
+    presence = Presence(ttl=30, clock=clock)
+    presence.attach(agent('A'), 'sid-1')
+    clock.now += 20
+    assert presence.touch('A') is None  # nothing visible changed
+    clock.now += 20
+    assert presence.expire() == []  # the heartbeat pushed the deadline out
+    clock.now += 15
+    [delta] = presence.expire()
+    assert delta['agent']['status'] == 'offline'
+    assert presence.touch('A')['agent']['status'] == 'active'
+
+
+def test_touch_reports_only_visible_changes():
+    presence = Presence(clock=FakeClock())
+    presence.attach(agent('A', current_task=''), 'sid-1')
+    assert presence.touch('A', {'timestamp': 'now', 'socket_id': 'other'}) is None
+    delta = presence.touch('A', {'current_task': 't1'})
+    assert delta['agent']['current_task'] == 't1'
+    assert delta['version'] == 2
+
+
+def test_is_online_consults_the_shared_backend_for_other_workers():
+    backend = MemoryBackend()
+    presence = Presence(clock=FakeClock(), backend=backend)
+    backend.put('agents', 'B', {'agent_id': 'B', 'status': 'active'})
+    backend.put('agents', 'C', {'agent_id': 'C', 'status': 'offline'})
+    assert presence.is_online('B')
+    assert not presence.is_online('C')
+    assert not presence.is_online('D')
@@ -0,0 +1,95 @@
+from datetime import datetime
+
+import pytest
+
+from task_dispatcher import TaskDispatcher
+
+
+def make_dispatcher(max_load=2):
+    return TaskDispatcher(max_load=max_load, clock=lambda: datetime(2025, 9, 23, 10, 0))
+
+
+def task(task_id, capability=None, priority='medium', pinned_to=None):
+    return {'task_id': task_id, 'required_capability': capability, 'priority': priority, 'pinned_to': pinned_to}
+
+
+def test_submit_goes_to_least_loaded_capable_agent():
+    dispatcher = make_dispatcher()
+    dispatcher.add_agent('A', ['code'])
+    dispatcher.add_agent('B', ['code'])
+    dispatcher.add_agent('C', ['music'])
+    first = dispatcher.submit(task('t1', 'code'))[0]
+    second = dispatcher.submit(task('t2', 'code'))[0]
+    assert {first['assigned_to'], second['assigned_to']} == {'A', 'B'}
+    assert dispatcher.load('C') == 0
+
+
+def test_full_agents_queue_work_by_priority_until_capacity_frees():
+    dispatcher = make_dispatcher(max_load=1)
+    dispatcher.add_agent('A', [])
+    dispatcher.submit(task('t1'))
+    low = dispatcher.submit(task('t2', priority='low'))[0]
+    high = dispatcher.submit(task('t3', priority='high'))[0]
+    assert low['status'] == high['status'] == 'pending'
+    assert dispatcher.depth()['high'] == 1
+
+    changed = dispatcher.complete('t1', 'A')
+    assert [t['task_id'] for t in changed] == ['t1', 't3']
+    assert changed[1]['assigned_to'] == 'A'
+
+
+def test_complete_rejects_the_wrong_agent():
+    dispatcher = make_dispatcher()
+    dispatcher.add_agent('A', [])
+    dispatcher.submit(task('t1'))
+    with pytest.raises(ValueError):
+        dispatcher.complete('t1', 'B')
+    assert dispatcher.load('A') == 1
+
+
+def test_reassign_moves_task_to_another_agent():
+    dispatcher = make_dispatcher()
+    dispatcher.add_agent('A', ['code'])
+    dispatcher.submit(task('t1', 'code'))
+    dispatcher.add_agent('B', ['code'])
+    changed = dispatcher.reassign('t1')
+    assert changed[0]['assigned_to'] == 'B'
+    assert dispatcher.load('A') == 0
+    assert dispatcher.load('B') == 1
+
+
+def test_reassign_from_suspended_agent_without_other_agent_queues_task():
+    dispatcher = make_dispatcher()
+    dispatcher.add_agent('A', ['code'])
+    dispatcher.submit(task('t1', 'code'))
+    dispatcher.suspend('A')
+    changed = dispatcher.reassign('t1')
+    assert [(t['task_id'], t['status']) for t in changed] == [('t1', 'pending')]
+    assert dispatcher.load('A') == 0
+    assert dispatcher.depth()['medium'] == 1
+
+
+def test_offline_agent_work_is_replaced_and_pinned_work_waits():
+    dispatcher = make_dispatcher()
+    dispatcher.add_agent('A', [])
+    dispatcher.submit(task('free'))
+    dispatcher.submit(task('pinned', pinned_to='A'))
+    dispatcher.add_agent('B', [])
+
+    changed = {t['task_id']: t for t in dispatcher.remove_agent('A')}
+    assert changed['free']['assigned_to'] == 'B'
+    assert changed['pinned']['status'] == 'pending'
+    assert dispatcher.depth()['pinned'] == 1
+
+    back = dispatcher.add_agent('A', [])
+    assert [t['task_id'] for t in back] == ['pinned']
+
+
+def test_restored_assignee_is_suspended_until_it_reconnects():
+    dispatcher = make_dispatcher()
+    dispatcher.restore({'task_id': 't1', 'assigned_to': 'A', 'priority': 'high'})
+    assert dispatcher.is_suspended('A')
+    assert dispatcher.submit(task('t2'))[0]['status'] == 'pending'
+    changed = dispatcher.add_agent('A', [])
+    assert [t['task_id'] for t in changed] == ['t2']
+    assert dispatcher.load('A') == 2
@@ -0,0 +1,52 @@
+import pytest
+
+from timer_wheel import HierarchicalTimerWheel, TimerWheel
+
+
+@pytest.mark.parametrize('make_wheel', [
+    lambda: TimerWheel(slots=8),
+    lambda: HierarchicalTimerWheel(level_slots=(8, 4, 4)),
+])
+def test_keys_expire_at_their_deadline(make_wheel):
+    wheel = make_wheel()
+    wheel.schedule('soon', 3)
+    wheel.schedule('later', 5)
+    assert wheel.advance(2) == []
+    assert wheel.advance(3) == ['soon']
+    assert 'later' in wheel
+    assert wheel.advance(10) == ['later']
+    assert len(wheel) == 0
+
+
+@pytest.mark.parametrize('make_wheel', [
+    lambda: TimerWheel(slots=8),
+    lambda: HierarchicalTimerWheel(level_slots=(8, 4, 4)),
+])
+def test_reschedule_and_cancel(make_wheel):
+    wheel = make_wheel()
+    wheel.schedule('moved', 2)
+    wheel.schedule('moved', 6)
+    wheel.schedule('cancelled', 2)
+    wheel.cancel('cancelled')
+    assert wheel.advance(5) == []
+    assert wheel.advance(6) == ['moved']
+
+
+def test_single_level_wheel_keeps_deadlines_beyond_one_revolution():
+    wheel = TimerWheel(slots=8)
+    wheel.schedule('far', 19)
+    assert wheel.advance(18) == []
+    assert wheel.advance(19) == ['far']
+
+
+def test_hierarchical_wheel_cascades_and_overflows():
+    # Levels cover 8, 32 and 128 ticks; 500 lands in the overflow set
+    wheel = HierarchicalTimerWheel(level_slots=(8, 4, 4))
+    deadlines = {'level1': 20, 'level2': 100, 'overflow': 500}
+    for key, when in deadlines.items():
+        wheel.schedule(key, when)
+    expired = {}
+    for now in range(1, 600):
+        for key in wheel.advance(now):
+            expired[key] = now
+    assert expired == deadlines
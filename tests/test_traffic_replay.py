@@ -0,0 +1,40 @@
+import types
+import pytest
+
+pytest.importorskip('socketio')
+
+from traffic_replay import TrafficRecorder, read_log
+
+
+class FakeManager:
+    def __init__(self, sids):
+        self.sids = {'/': dict.fromkeys(sids)}
+
+    def is_connected(self, sid, namespace):
+        # Same dict lookup python-socketio does: unhashable targets raise TypeError
+        return sid in self.sids[namespace]
+
+
+class FakeServer:
+    def __init__(self, sids):
+        self.manager = FakeManager(sids)
+        self.emitted = []
+
+    def emit(self, event, *args, **kwargs):
+        self.emitted.append((event, kwargs.get('to') or kwargs.get('room')))
+
+
+def test_emit_to_room_list_passes_through_unattributed(tmp_path):
+    server = FakeServer(['sid1'])
+    recorder = TrafficRecorder(str(tmp_path / 'traffic.gz'))
+    recorder.attach(types.SimpleNamespace(server=server), types.SimpleNamespace(sid='sid1'))
+
+    rooms = ['fragments:all', 'fragments:topic:symbols:moon']
+    server.emit('dream_fragment_added', {'summary': 'x'}, room=rooms)
+    server.emit('agent_registered', {'status': 'success'}, room='sid1')
+    server.emit('task_updated', {}, room=('dashboard',))
+    recorder.stop()
+
+    assert [target for _, target in server.emitted] == [rooms, 'sid1', ('dashboard',)]
+    _, records = read_log(recorder.path)
+    assert [record[3] for record in records] == ['agent_registered']
@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+
+from write_behind import WriteBehindQueue
+
+INSERT = 'INSERT INTO events (agent_id, value) VALUES (?, ?)'
+UPSERT = '''
+    INSERT INTO status (agent_id, value) VALUES (?, ?)
+    ON CONFLICT(agent_id) DO UPDATE SET value = excluded.value
+'''
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'write_behind.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, agent_id TEXT, value TEXT NOT NULL)')
+    conn.execute('CREATE TABLE status (agent_id TEXT PRIMARY KEY, value TEXT)')
+    conn.commit()
+    conn.close()
+    return path
+
+
+def rows(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    result = conn.execute(sql).fetchall()
+    conn.close()
+    return result
+
+
+def test_flush_commits_writes_in_enqueue_order(db_path):
+    writer = WriteBehindQueue(db_path, name='test_order')
+    writer._running = True  # queue without the background thread, so the test controls flushes
+    for n in range(5):
+        writer.enqueue(INSERT, ('A', str(n)))
+        writer.enqueue(UPSERT, ('A', str(n)))
+    assert writer.depth() == 10
+    writer.flush()
+    assert rows(db_path, 'SELECT value FROM events ORDER BY id') == [(str(n),) for n in range(5)]
+    assert rows(db_path, 'SELECT value FROM status') == [('4',)]
+    assert writer.depth() == 0
+
+
+def test_coalesced_writes_keep_the_latest_and_land_after_queued_ones(db_path):
+    writer = WriteBehindQueue(db_path, name='test_coalesced')
+    writer._running = True
+    writer.enqueue_coalesced(('status', 'A'), UPSERT, ('A', 'coalesced-1'))
+    writer.enqueue(UPSERT, ('A', 'queued'))
+    writer.enqueue_coalesced(('status', 'A'), UPSERT, ('A', 'coalesced-2'))
+    assert writer.depth() == 2
+    writer.flush()
+    assert rows(db_path, 'SELECT value FROM status') == [('coalesced-2',)]
+
+
+def test_failing_statement_does_not_drop_the_rest_of_the_batch(db_path):
+    writer = WriteBehindQueue(db_path, name='test_retry')
+    writer._running = True
+    writer.enqueue(INSERT, ('A', 'before'))
+    writer.enqueue(INSERT, ('A', None))  # violates NOT NULL
+    writer.enqueue(INSERT, ('A', 'after'))
+    writer.flush()
+    assert rows(db_path, 'SELECT value FROM events ORDER BY id') == [('before',), ('after',)]
+
+
+def test_stop_flushes_pending_writes(db_path):
+    writer = WriteBehindQueue(db_path, name='test_stop', flush_interval=0.01)
+    writer.start()
+    for n in range(100):
+        writer.enqueue(INSERT, ('A', str(n)))
+    writer.stop()
+    assert writer.depth() == 0
+    assert rows(db_path, 'SELECT value FROM events ORDER BY id') == [(str(n),) for n in range(100)]
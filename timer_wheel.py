@@ -0,0 +1,142 @@
+# ID: [WOLFIE_AGI_UI_TIMER_WHEEL_20250923_001]
+# SUPERPOSITIONALLY: [dream_data_analysis, quantum_tabs, multi_agent_coordination, bridge_crew_tracking, web_node_system, timers, performance]
+# DATE: 2025-09-23
+# TITLE: timer_wheel.py — Timer Wheels for Expiring Keys
+# WHO: WOLFIE (Eric) - Project Architect & Dream Architect
+# WHAT: Hashed and hierarchical timer wheels with O(1) schedule/cancel and per-tick expiry
+# WHERE: C:\START\WOLFIE_AGI_UI\
+# WHEN: 2025-09-23, 11:00 AM CDT (Sioux Falls Timezone)
+# WHY: Expire heartbeats and deadlines without scanning every tracked item
+# HOW: Rings of slots (cascading levels for long horizons); each key remembers its deadline so stale entries are skipped
+# HELP: Contact WOLFIE for timer or expiry behaviour questions
+# AGAPE: Love, patience, kindness, humility in multi-agent collaboration
+
+import math
+
+
+class TimerWheel:
+    """Single-level timer wheel; a key lives in at most one live slot at a time"""
+
+    def __init__(self, slots=64, tick_seconds=1.0, start=0.0):
+        self.slots = [set() for _ in range(slots)]
+        self.tick_seconds = tick_seconds
+        self.current_tick = int(start // tick_seconds)
+        self.deadlines = {}
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def __contains__(self, key):
+        return key in self.deadlines
+
+    def _tick_for(self, when):
+        return max(self.current_tick + 1, math.ceil(when / self.tick_seconds))
+
+    def schedule(self, key, when):
+        """(Re)schedule key to expire at time `when`; O(1)"""
+        tick = self._tick_for(when)
+        self.deadlines[key] = tick
+        # Deadlines beyond one revolution are re-slotted when their slot comes round early
+        self.slots[tick % len(self.slots)].add(key)
+
+    def cancel(self, key):
+        """Forget key; its slot entry is dropped lazily"""
+        self.deadlines.pop(key, None)
+
+    def advance(self, now):
+        """Move the wheel to `now` and return keys whose deadline has passed"""
+        target = int(now // self.tick_seconds)
+        expired = []
+        while self.current_tick < target:
+            self.current_tick += 1
+            slot = self.slots[self.current_tick % len(self.slots)]
+            if not slot:
+                continue
+            keys, slot_keys = list(slot), slot
+            slot_keys.clear()
+            for key in keys:
+                tick = self.deadlines.get(key)
+                if tick is None:
+                    continue
+                if tick <= self.current_tick:
+                    del self.deadlines[key]
+                    expired.append(key)
+                elif tick % len(self.slots) == self.current_tick % len(self.slots):
+                    # Same slot, a later revolution
+                    slot_keys.add(key)
+        return expired
+
+
+class HierarchicalTimerWheel:
+    """Multi-level timer wheel for long, sparse deadlines (hours to months at one-second ticks)
+
+    Level 0 holds the next revolution tick by tick; each higher level holds whole revolutions
+    of the level below and is cascaded down when its slot comes due. Deadlines beyond the top
+    level wait in an overflow set that is re-checked once per top-level revolution.
+    """
+
+    def __init__(self, level_slots=(256, 64, 64, 64), tick_seconds=1.0, start=0.0):
+        self.level_slots = tuple(level_slots)
+        self.levels = [[set() for _ in range(slots)] for slots in self.level_slots]
+        # spans[i] is the number of ticks one slot of level i covers
+        self.spans = [1]
+        for slots in self.level_slots:
+            self.spans.append(self.spans[-1] * slots)
+        self.overflow = set()
+        self.tick_seconds = tick_seconds
+        self.current_tick = int(start // tick_seconds)
+        self.deadlines = {}
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def __contains__(self, key):
+        return key in self.deadlines
+
+    def _insert(self, key, tick):
+        delta = tick - self.current_tick
+        for level, slots in enumerate(self.levels):
+            if delta < self.spans[level + 1]:
+                slots[(tick // self.spans[level]) % len(slots)].add((key, tick))
+                return
+        self.overflow.add((key, tick))
+
+    def schedule(self, key, when):
+        """(Re)schedule key to expire at time `when`; O(1)"""
+        tick = max(self.current_tick + 1, math.ceil(when / self.tick_seconds))
+        self.deadlines[key] = tick
+        self._insert(key, tick)
+
+    def cancel(self, key):
+        """Forget key; its slot entry is dropped lazily"""
+        self.deadlines.pop(key, None)
+
+    def _cascade(self, entries):
+        for key, tick in entries:
+            if self.deadlines.get(key) == tick:
+                self._insert(key, tick)
+
+    def advance(self, now):
+        """Move the wheel to `now` and return keys whose deadline has passed"""
+        target = int(now // self.tick_seconds)
+        expired = []
+        while self.current_tick < target:
+            self.current_tick += 1
+            if self.current_tick % self.spans[-1] == 0 and self.overflow:
+                entries, self.overflow = self.overflow, set()
+                self._cascade(entries)
+            # Highest due level first, so its entries can land in a lower slot cascaded this same tick
+            for level in range(len(self.levels) - 1, 0, -1):
+                if self.current_tick % self.spans[level] == 0:
+                    slots = self.levels[level]
+                    index = (self.current_tick // self.spans[level]) % len(slots)
+                    entries, slots[index] = slots[index], set()
+                    self._cascade(entries)
+            slots = self.levels[0]
+            index = self.current_tick % len(slots)
+            entries, slots[index] = slots[index], set()
+            for key, tick in entries:
+                if self.deadlines.get(key) == tick:
+                    del self.deadlines[key]
+                    expired.append(key)
+        return expired
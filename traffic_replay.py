@@ -0,0 +1,333 @@
+# ID: [WOLFIE_AGI_UI_TRAFFIC_REPLAY_20250923_001]
+# SUPERPOSITIONALLY: [dream_data_analysis, quantum_tabs, multi_agent_coordination, bridge_crew_tracking, web_node_system, load_testing, performance]
+# DATE: 2025-09-23
+# TITLE: traffic_replay.py — Socket.IO Traffic Recorder and Time-Scaled Replayer for the Web Node Server
+# WHO: WOLFIE (Eric) - Project Architect & Dream Architect
+# WHAT: Records inbound events (and direct replies) on a live server; replays them against a local server at 1x-Nx
+# WHERE: C:\START\WOLFIE_AGI_UI\
+# WHEN: 2025-09-23, 11:05 AM CDT (Sioux Falls Timezone)
+# WHY: Synthetic swarms do not look like production; server changes should be checked against real traffic offline
+# HOW: timed_event tap + server emit hook write gzip JSON lines; one simulated client per recorded socket, acks timed
+# HELP: Contact WOLFIE for load testing or traffic capture questions
+# AGAPE: Love, patience, kindness, humility in multi-agent collaboration
+
+import os
+import sys
+import gzip
+import json
+import time
+import queue
+import logging
+import argparse
+import threading
+from collections import Counter
+from datetime import datetime
+import socketio
+from service_metrics import add_event_tap
+
+LOG_VERSION = 1
+INBOUND = 'i'
+OUTBOUND = 'o'
+# Frames are recorded as the events they carry (each goes through its own timed handler)
+UNRECORDED_EVENTS = ('event_batch',)
+
+
+class TrafficRecorder:
+    """Writes every inbound Socket.IO event, and each reply emitted straight to its socket, to a gzip log
+
+    Line format (JSON arrays, one per line, after a header object):
+      [t, 'i', client, event, data, handler_seconds, error]   inbound event, t = arrival offset in seconds
+      [t, 'o', client, event, status]                        event emitted to that client's socket
+    Socket ids are replaced by small client numbers.
+    """
+
+    def __init__(self, path, clock=time.monotonic):
+        self.path = path
+        self.clock = clock
+        self.started = clock()
+        self.records = 0
+        self._clients = {}
+        self._next_client = 0
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def client_id(self, sid):
+        with self._lock:
+            client = self._clients.get(sid)
+            if client is None:
+                self._next_client += 1
+                client = self._clients[sid] = self._next_client
+            return client
+
+    def record_inbound(self, sid, event, args, elapsed, error):
+        if event in UNRECORDED_EVENTS:
+            return
+        arrived = self.clock() - elapsed - self.started
+        data = args[0] if args else None
+        self._queue.put([round(arrived, 4), INBOUND, self.client_id(sid), event, data,
+                         round(elapsed, 6), type(error).__name__ if error else None])
+        if event == 'disconnect':
+            with self._lock:
+                self._clients.pop(sid, None)
+
+    def record_outbound(self, sid, event, data):
+        status = data.get('status') if isinstance(data, dict) else None
+        self._queue.put([round(self.clock() - self.started, 4), OUTBOUND, self.client_id(sid), event, status])
+
+    def attach(self, socketio_app, request):
+        """Start recording a Flask-SocketIO server: inbound via timed_event, replies via server.emit"""
+        add_event_tap(lambda event, args, elapsed, error: self.record_inbound(request.sid, event, args, elapsed, error))
+        server = socketio_app.server
+        original_emit = server.emit
+
+        def emit(event, *args, **kwargs):
+            target = kwargs.get('to') or kwargs.get('room')
+            # Only emits addressed to one socket are replies; rooms, room lists and broadcasts are not attributed
+            if isinstance(target, str) and server.manager.is_connected(target, kwargs.get('namespace') or '/'):
+                self.record_outbound(target, event, args[0] if args else None)
+            return original_emit(event, *args, **kwargs)
+
+        server.emit = emit
+        logging.info(f"Recording Socket.IO traffic to {self.path}")
+
+    def _write_loop(self):
+        with gzip.open(self.path, 'wt', encoding='utf-8') as f:
+            f.write(json.dumps({'version': LOG_VERSION, 'recorded_at': datetime.now().isoformat()}) + '\n')
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    break
+                f.write(json.dumps(record, separators=(',', ':'), default=str) + '\n')
+                self.records += 1
+                if self._queue.empty():
+                    f.flush()
+
+    def stop(self):
+        self._queue.put(None)
+        self._writer.join(timeout=10)
+        logging.info(f"Traffic recording stopped: {self.records} records in {self.path}")
+
+
+def read_log(path):
+    """Header dict and the records of a traffic log, in arrival order"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header.get('version') != LOG_VERSION:
+            raise ValueError(f"Unsupported traffic log version {header.get('version')}")
+        records = [json.loads(line) for line in f if line.strip()]
+    # Inbound events are written when their handler finishes, so handlers on other threads can interleave
+    records.sort(key=lambda record: record[0])
+    return header, records
+
+
+class ReplayClient:
+    """Stands in for one recorded socket; times acks and counts what the server sends back"""
+
+    def __init__(self, client, server_url, stats):
+        self.client = client
+        self.server_url = server_url
+        self.stats = stats
+        self.received = Counter()
+        self.error_replies = Counter()
+        self.sio = socketio.Client(reconnection=False)
+        self.sio.on('*', self._on_event)
+
+    def _on_event(self, event, data=None):
+        self.received[event] += 1
+        if isinstance(data, dict) and data.get('status') == 'error':
+            self.error_replies[event] += 1
+
+    def connect(self, auth=None):
+        started = time.perf_counter()
+        self.stats.sent('connect')
+        try:
+            self.sio.connect(self.server_url, auth=auth)
+            self.stats.ack('connect', time.perf_counter() - started)
+        except Exception as e:
+            self.stats.fail('connect')
+            logging.warning(f"Replay client {self.client} failed to connect: {str(e)}")
+
+    def send(self, event, data):
+        if not self.sio.connected:
+            self.stats.fail(event)
+            return
+        started = time.perf_counter()
+        self.stats.sent(event)
+        self.sio.emit(event, data, callback=lambda *reply: self.stats.ack(event, time.perf_counter() - started))
+
+    def disconnect(self):
+        if self.sio.connected:
+            self.sio.disconnect()
+
+
+class ReplayStats:
+    """Per-event sent/acked/failed counts and ack latencies, shared by all replay clients"""
+
+    def __init__(self):
+        self.sent_counts = Counter()
+        self.failed = Counter()
+        self.latencies = {}
+        self.schedule_lag = []
+        self._lock = threading.Lock()
+
+    def sent(self, event):
+        with self._lock:
+            self.sent_counts[event] += 1
+
+    def ack(self, event, seconds):
+        with self._lock:
+            self.latencies.setdefault(event, []).append(seconds)
+
+    def fail(self, event):
+        with self._lock:
+            self.failed[event] += 1
+
+
+class TrafficReplayer:
+    """Replays a recorded log against a server, speed times faster than it was recorded"""
+
+    def __init__(self, server_url, records, speed=1.0, drain_seconds=5):
+        self.server_url = server_url
+        self.records = records
+        self.speed = speed
+        self.drain_seconds = drain_seconds
+        self.stats = ReplayStats()
+        self.clients = {}
+
+    def _client(self, client, auth=None):
+        replay_client = self.clients.get(client)
+        if replay_client is None:
+            replay_client = self.clients[client] = ReplayClient(client, self.server_url, self.stats)
+        if not replay_client.sio.connected:
+            # Sockets already open when recording started are connected on their first event
+            replay_client.connect(auth)
+        return replay_client
+
+    def run(self):
+        started = time.monotonic()
+        for record in self.records:
+            if record[1] != INBOUND:
+                continue
+            t, _, client, event, data = record[:5]
+            delay = started + t / self.speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self.stats.schedule_lag.append(-delay)
+            if event == 'connect':
+                self._client(client, data)
+            elif event == 'disconnect':
+                if client in self.clients:
+                    self.clients[client].disconnect()
+            else:
+                self._client(client).send(event, data)
+        elapsed = time.monotonic() - started
+        time.sleep(self.drain_seconds)
+        for replay_client in self.clients.values():
+            replay_client.disconnect()
+        return self.report(elapsed)
+
+    def report(self, elapsed):
+        # Imported here so the server side (TrafficRecorder) does not pull in the swarm client stack
+        from agent_swarm import percentile_summary
+        inbound = [record for record in self.records if record[1] == INBOUND]
+        recorded_seconds = {}
+        recorded_errors = Counter()
+        for record in inbound:
+            recorded_seconds.setdefault(record[3], []).append(record[5])
+            if record[6]:
+                recorded_errors[record[3]] += 1
+        events = {}
+        for event in sorted(set(recorded_seconds) | set(self.stats.sent_counts)):
+            acked = self.stats.latencies.get(event, [])
+            events[event] = {
+                'recorded': len(recorded_seconds.get(event, ())),
+                'sent': self.stats.sent_counts[event],
+                'acked': len(acked),
+                'failed': self.stats.failed[event],
+                'recorded_handler_ms': percentile_summary(recorded_seconds.get(event, [])),
+                'recorded_handler_errors': recorded_errors[event],
+                'replay_ack_ms': percentile_summary(acked)
+            }
+        return {
+            'server': self.server_url,
+            'speed': self.speed,
+            'clients': len(self.clients),
+            'replay_seconds': round(elapsed, 3),
+            'schedule_lag_ms': percentile_summary(self.stats.schedule_lag),
+            'events': events,
+            'divergence': self.divergence()
+        }
+
+    def divergence(self):
+        """Replies each client got during replay vs. what its recorded socket was sent directly
+
+        Only event names the server addressed to single sockets while recording are compared;
+        events that also arrive through rooms or broadcasts can show up as extra replies.
+        """
+        expected = {}
+        expected_errors = {}
+        for record in self.records:
+            if record[1] == OUTBOUND:
+                expected.setdefault(record[2], Counter())[record[3]] += 1
+                if record[4] == 'error':
+                    expected_errors.setdefault(record[2], Counter())[record[3]] += 1
+        totals = Counter()
+        diverged = {}
+        for client, replies in expected.items():
+            replay_client = self.clients.get(client)
+            received = replay_client.received if replay_client else Counter()
+            errors = replay_client.error_replies if replay_client else Counter()
+            differences = {}
+            for event, count in replies.items():
+                totals['expected'] += count
+                totals['missing'] += max(0, count - received[event])
+                totals['extra'] += max(0, received[event] - count)
+                if received[event] != count or errors[event] != expected_errors.get(client, Counter())[event]:
+                    differences[event] = {'recorded': count, 'replayed': received[event],
+                                          'recorded_errors': expected_errors.get(client, Counter())[event],
+                                          'replayed_errors': errors[event]}
+            if differences:
+                diverged[str(client)] = differences
+        return {'replies_expected': totals['expected'], 'replies_missing': totals['missing'],
+                'replies_extra': totals['extra'], 'clients_diverged': len(diverged), 'clients': diverged}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay recorded web_node_server traffic against a server')
+    parser.add_argument('log', help='traffic log written by TrafficRecorder (WebNode TrafficLog setting)')
+    parser.add_argument('--server', default='http://localhost:5001')
+    parser.add_argument('--speed', type=float, default=1.0, help='time scale: 2 replays twice as fast')
+    parser.add_argument('--drain', type=float, default=5, help='seconds to wait for late acks and replies')
+    parser.add_argument('--output', help='result file (default replay_results/replay_<timestamp>.json)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(filename='traffic_replay.log', level=logging.WARNING,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    header, records = read_log(args.log)
+    print(f"Replaying {len(records)} records recorded {header.get('recorded_at')} at {args.speed}x against {args.server}...")
+    results = TrafficReplayer(args.server, records, speed=args.speed, drain_seconds=args.drain).run()
+    results['log'] = args.log
+
+    output = args.output or os.path.join('replay_results', f"replay_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    for event, summary in results['events'].items():
+        latency = summary['replay_ack_ms']
+        print(f"{event:26} sent={summary['sent']:<7} acked={summary['acked']:<7} failed={summary['failed']:<5} "
+              f"p50={latency.get('p50')}ms p99={latency.get('p99')}ms")
+    divergence = results['divergence']
+    print(f"Replies: {divergence['replies_expected']} expected, {divergence['replies_missing']} missing, "
+          f"{divergence['replies_extra']} extra; {divergence['clients_diverged']} clients diverged")
+    print(f"Results saved to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -16,39 +16,166 @@ from flask_socketio import SocketIO, emit, join_room, leave_room
 import json
 import sqlite3
 import os
-from datetime import datetime
+import time
+import atexit
+import threading
+import uuid
+import base64
+import socket
+from collections import deque
+from datetime import datetime, timedelta
 import logging
 from cryptography.fernet import Fernet
 import configparser
-
-# Initialize Flask app and SocketIO
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'wolfie_agi_secret_key_2025'
-socketio = SocketIO(app, cors_allowed_origins="*")
+from db_connection import get_connection
+from schema_migrations import run_migrations
+from service_metrics import REGISTRY, instrument_flask, timed_event, track_size
+from write_behind import WriteBehindQueue
+from presence import Presence, agent_room
+from cluster import create_state_backend, socketio_queue_options
+from agent_mailbox import Mailbox
+from io_offload import BoundedExecutor, configure_nonblocking_logging
+from task_dispatcher import TaskDispatcher, normalize_priority
+from event_envelope import choose_codec, decode_batch
+from agent_sessions import SessionRegistry
+from timer_wheel import TimerWheel, HierarchicalTimerWheel
+from fragment_topics import TopicIndex, ALL_FRAGMENTS_ROOM, fragment_rooms, topic_room
+from traffic_replay import TrafficRecorder
 
 # Load configuration
 config = configparser.ConfigParser()
 config.read('config.ini')
 BASE_DIR = config.get('Paths', 'BaseDir', fallback=r'C:\START\WOLFIE_AGI_UI')
+
+# Multi-worker mode: every worker points at the same state backend and message queue
+# (e.g. sqlite:///C:/START/WOLFIE_AGI_UI/data/cluster.db); empty/local means a single worker
+STATE_BACKEND_URL = os.environ.get('WEB_NODE_STATE_BACKEND', config.get('WebNode', 'StateBackend', fallback='local'))
+MESSAGE_QUEUE_URL = os.environ.get('WEB_NODE_MESSAGE_QUEUE', config.get('WebNode', 'MessageQueue', fallback=''))
+# One worker, the holder of the task-owner lease, runs the dispatcher, deadlines and release timers;
+# the others queue task commands for it in the state backend (see task_command)
+WORKER_ID = f'{socket.gethostname()}:{os.getpid()}'
+TASK_OWNER_LEASE_SECONDS = config.getint('WebNode', 'TaskOwnerLeaseSeconds', fallback=15)
+TASK_COMMAND_POLL_SECONDS = 0.05
+TASK_COMMAND_QUEUE = 'task_commands'
+SERVER_PORT = int(os.environ.get('WEB_NODE_PORT', config.get('API', 'WebNodePort', fallback='5001')))
+
+# Initialize Flask app and SocketIO
+app = Flask(__name__)
+app.config['SECRET_KEY'] = 'wolfie_agi_secret_key_2025'
+socketio = SocketIO(app, cors_allowed_origins="*", **socketio_queue_options(MESSAGE_QUEUE_URL))
+instrument_flask(app)
 DB_PATH = os.path.join(BASE_DIR, 'web_nodes.db')
+HISTORY_SIZE = config.getint('WebNode', 'HistorySize', fallback=500)
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+WRITE_FLUSH_MS = config.getfloat('WebNode', 'WriteFlushMs', fallback=5)
+WRITE_QUEUE_SIZE = config.getint('WebNode', 'WriteQueueSize', fallback=10000)
+HEARTBEAT_INTERVAL = config.getint('WebNode', 'HeartbeatInterval', fallback=30)
+PRESENCE_TTL = config.getint('WebNode', 'PresenceTTL', fallback=HEARTBEAT_INTERVAL * 3)
+MAILBOX_PAGE_SIZE = config.getint('WebNode', 'MailboxPageSize', fallback=100)
+IO_WORKERS = config.getint('WebNode', 'IOWorkers', fallback=4)
+IO_QUEUE_SIZE = config.getint('WebNode', 'IOQueueSize', fallback=1000)
+TASK_MAX_LOAD = config.getint('WebNode', 'TaskMaxLoad', fallback=3)
+RESUME_GRACE_SECONDS = config.getint('WebNode', 'ResumeGraceSeconds', fallback=120)
+SESSION_EVENT_HISTORY = config.getint('WebNode', 'SessionEventHistory', fallback=200)
+EVENT_BATCHING = config.getboolean('WebNode', 'EventBatching', fallback=True)
+BATCH_MAX_EVENTS = config.getint('WebNode', 'BatchMaxEvents', fallback=64)
+BATCH_MAX_DELAY_MS = config.getint('WebNode', 'BatchMaxDelayMs', fallback=20)
+DEADLINE_ACTION = config.get('WebNode', 'DeadlineAction', fallback='reassign')
+DEADLINE_GRACE_SECONDS = config.getint('WebNode', 'DeadlineGraceSeconds', fallback=300)
+MAX_DEADLINE_REASSIGNMENTS = config.getint('WebNode', 'MaxDeadlineReassignments', fallback=2)
+# Path of a gzip traffic log for traffic_replay.py; empty disables recording
+TRAFFIC_LOG = config.get('WebNode', 'TrafficLog', fallback='')
 
-# Setup logging
-logging.basicConfig(
-    filename=os.path.join(BASE_DIR, 'web_node_server.log'),
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Setup logging (records are queued; a listener thread writes the file)
+log_listener = configure_nonblocking_logging(os.path.join(BASE_DIR, 'web_node_server.log'))
 
-# Global data structures
+# Global data structures (histories are ring buffers of recent items; SQLite holds the rest)
 agents = {}
 tasks = {}
-dream_fragments = []
-message_history = []
+dream_fragments = deque(maxlen=HISTORY_SIZE)
+message_history = deque(maxlen=HISTORY_SIZE)
+# Set once the history rings are loaded; until then history reads go to SQLite and /ready says 503
+history_ready = threading.Event()
+
+# Heartbeat status and message writes are group-committed off the event path
+persistence = WriteBehindQueue(DB_PATH, 'web_nodes', max_queue=WRITE_QUEUE_SIZE,
+                               flush_interval=WRITE_FLUSH_MS / 1000.0)
+
+# Presence owns the agents dict: socket index, heartbeat TTLs and versioned deltas
+state_backend = create_state_backend(STATE_BACKEND_URL)
+# Several workers share one backend (see fragment_page)
+SHARED_STATE = STATE_BACKEND_URL not in ('', 'local')
+presence = Presence(agents, ttl=PRESENCE_TTL, backend=state_backend)
+
+# Direct messages get a per-agent delivery seq and wait in the mailbox until acked
+mailbox = Mailbox(DB_PATH, persistence, state_backend, page_size=MAILBOX_PAGE_SIZE)
+
+# Resume tokens and replayable agent-targeted events; a dropped agent keeps its tasks for the grace period
+sessions = SessionRegistry(state_backend, history_size=SESSION_EVENT_HISTORY)
+release_wheel = TimerWheel(slots=max(8, RESUME_GRACE_SECONDS + 2), tick_seconds=1.0, start=time.time())
+
+# Open tasks are assigned to the least-loaded capable agent and pushed only to it
+dispatcher = TaskDispatcher(max_load=TASK_MAX_LOAD)
+# Whether this worker holds the task-owner lease (see claim_task_ownership)
+task_owner = False
+DASHBOARD_ROOM = 'dashboard'
+OPEN_TASK_STATUSES = ('pending', 'assigned')
+
+# Deadlines of open tasks; each tick only touches the timers that are due
+deadline_wheel = HierarchicalTimerWheel(tick_seconds=1.0, start=time.time())
+
+# Codec each socket negotiated for event_batch frames (absent means plain per-event JSON)
+envelope_codecs = {}
+ENVELOPE_FRAMES = REGISTRY.counter('web_node_envelope_frames_total', 'event_batch frames received', ('codec',))
+ENVELOPE_EVENTS = REGISTRY.counter('web_node_envelope_events_total', 'Events carried in event_batch frames', ('codec',))
+ENVELOPE_BYTES = REGISTRY.counter('web_node_envelope_bytes_total', 'Bytes of event_batch frames', ('codec',))
+
+# Dream fragments go to sockets whose topic filters match; sockets without filters get them all
+fragment_topics = TopicIndex()
+FRAGMENT_DELIVERIES = REGISTRY.counter(
+    'web_node_fragment_deliveries_total', 'dream_fragment_added emits, by route', ('route',))
+
+# Blocking reads/writes from socket handlers run here; completions emit the acknowledgement
+io_pool = BoundedExecutor(max_workers=IO_WORKERS, max_pending=IO_QUEUE_SIZE, name='web_node_io')
+
+STATUS_UPDATE_SQL = '''
+    UPDATE agents 
+    SET status = ?, last_seen = ?, current_task = ?
+    WHERE agent_id = ?
+'''
+
+AGENT_COLUMNS = ('agent_id', 'agent_name', 'capabilities', 'status', 'last_seen',
+                 'understanding_score', 'alignment_score', 'current_task')
+
+TASK_STATE_SQL = '''
+    UPDATE tasks
+    SET assigned_to = ?, status = ?, assigned_at = ?, completed_at = ?, deadline = ?, escalations = ?
+    WHERE task_id = ?
+'''
+
+TASK_COLUMNS = ('task_id', 'task_type', 'description', 'assigned_to', 'priority', 'status',
+                'created_at', 'deadline', 'required_capability', 'assigned_at', 'completed_at', 'escalations')
+
+AGENT_UPSERT_SQL = '''
+    INSERT OR REPLACE INTO agents 
+    (agent_id, agent_name, capabilities, status, last_seen, understanding_score, alignment_score, current_task)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+track_size('web_node_agents', 'Agents held in memory', lambda: len(agents))
+track_size('web_node_tasks', 'Tasks held in memory', lambda: len(tasks))
+track_size('web_node_dream_fragments', 'Dream fragments held in memory', lambda: len(dream_fragments))
+track_size('web_node_task_queue_depth', 'Tasks waiting for a capable agent', lambda: sum(dispatcher.depth().values()))
+track_size('web_node_task_deadlines', 'Open task deadlines being enforced', lambda: len(deadline_wheel))
+track_size('web_node_fragment_filtered_sockets', 'Sockets with dream fragment topic filters',
+           lambda: len(fragment_topics.subscriptions))
+track_size('web_node_message_history', 'Messages held in memory', lambda: len(message_history))
 
 # Database initialization
 def init_database():
     """Initialize the web nodes database"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection(DB_PATH)
     cursor = conn.cursor()
     
     # Create agents table
@@ -94,32 +221,460 @@ def init_database():
         )
     ''')
     
+    # Create dream fragments table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS dream_fragments (
+            fragment_seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            fragment_id TEXT,
+            agent_id TEXT,
+            summary TEXT,
+            symbols TEXT,
+            themes TEXT,
+            ai_connection TEXT,
+            emotional_vibe TEXT,
+            timestamp TEXT
+        )
+    ''')
+    
+    # Normalized capabilities: one row per (capability, agent), so lookups are index seeks
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS agent_capabilities (
+            capability TEXT NOT NULL,
+            agent_id TEXT NOT NULL,
+            PRIMARY KEY (capability, agent_id)
+        ) WITHOUT ROWID
+    ''')
+    
+    mailbox.init_tables(conn)
+    mailbox.load_floors(conn)
+    
     conn.commit()
+    run_migrations(conn, 'web_nodes')
     conn.close()
     logging.info("Database initialized successfully")
 
+FRAGMENT_COLUMNS = ('fragment_seq', 'fragment_id', 'agent_id', 'summary', 'symbols',
+                    'themes', 'ai_connection', 'emotional_vibe', 'timestamp')
+
+def prepend_history(ring, older, key):
+    """Put persisted items (oldest first) in front of whatever arrived while they were loading"""
+    if ring:
+        oldest = ring[0][key]
+        older = [item for item in older if item[key] < oldest]
+    room = ring.maxlen - len(ring)
+    if room > 0:
+        ring.extendleft(reversed(older[-room:]))
+
+def load_recent_history():
+    """Fill the in-memory ring buffers with the newest persisted items (runs in the background at startup)"""
+    try:
+        conn = get_connection(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT {', '.join(FRAGMENT_COLUMNS)} FROM dream_fragments
+            ORDER BY fragment_seq DESC LIMIT ?
+        ''', (HISTORY_SIZE,))
+        prepend_history(dream_fragments, [dict(zip(FRAGMENT_COLUMNS, row)) for row in reversed(cursor.fetchall())],
+                        'fragment_seq')
+        
+        cursor.execute('''
+            SELECT message_id, from_agent, to_agent, message_type, content, timestamp FROM messages
+            ORDER BY message_id DESC LIMIT ?
+        ''', (HISTORY_SIZE,))
+        prepend_history(message_history, [{
+            'message_id': row[0],
+            'from_agent': row[1],
+            'to_agent': row[2],
+            'message_type': row[3],
+            'content': row[4],
+            'timestamp': row[5]
+        } for row in reversed(cursor.fetchall())], 'timestamp')
+        conn.close()
+        history_ready.set()
+        logging.info(f"Loaded {len(dream_fragments)} fragments and {len(message_history)} messages into history")
+    except Exception as e:
+        logging.error(f"Error loading history: {str(e)}")
+
+def hydrate_registry():
+    """Warm start: load known agents (offline until they reconnect); open tasks go to the task owner"""
+    conn = get_connection(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {', '.join(AGENT_COLUMNS)} FROM agents")
+    for row in cursor.fetchall():
+        agent = dict(zip(AGENT_COLUMNS, row))
+        agent['capabilities'] = json.loads(agent['capabilities'] or '[]')
+        presence.restore(agent)
+    conn.close()
+    claim_task_ownership(first=True)
+
+def live_workers():
+    """Workers whose lease is current (this one included)"""
+    now = time.time()
+    return {lease['owner'] for lease in state_backend.values('leases') if lease['expires'] > now}
+
+def claim_task_ownership(first=False):
+    """Renew this worker's lease and try for the task-owner lease; a new owner loads the open tasks"""
+    global task_owner
+    state_backend.acquire_lease(f'worker:{WORKER_ID}', WORKER_ID, TASK_OWNER_LEASE_SECONDS)
+    owner = state_backend.acquire_lease('task_owner', WORKER_ID, TASK_OWNER_LEASE_SECONDS)
+    if owner and not task_owner:
+        logging.info(f"Worker {WORKER_ID} is now the task owner")
+        task_owner = True
+        adopt_open_tasks(reset_agents=first and live_workers() == {WORKER_ID})
+    elif task_owner and not owner:
+        # Lost the lease (e.g. stalled past its ttl); the new owner rebuilds everything from SQLite
+        logging.warning(f"Worker {WORKER_ID} lost the task-owner lease; dropping its dispatch state")
+        task_owner = False
+        reset_task_state()
+
+def reset_task_state():
+    global dispatcher, release_wheel, deadline_wheel
+    tasks.clear()
+    dispatcher = TaskDispatcher(max_load=TASK_MAX_LOAD)
+    release_wheel = TimerWheel(slots=max(8, RESUME_GRACE_SECONDS + 2), tick_seconds=1.0, start=time.time())
+    deadline_wheel = HierarchicalTimerWheel(tick_seconds=1.0, start=time.time())
+
+def adopt_open_tasks(reset_agents=False):
+    """Load every open task from SQLite into this (task owner) worker, plus the agents online anywhere"""
+    conn = get_connection(DB_PATH)
+    cursor = conn.cursor()
+    if reset_agents:
+        # No other worker is up, so nobody is connected, whatever the previous run last wrote
+        cursor.execute("UPDATE agents SET status = 'offline' WHERE status != 'offline'")
+        conn.commit()
+    cursor.execute(f'''
+        SELECT {', '.join(TASK_COLUMNS)} FROM tasks
+        WHERE status IN ('pending', 'assigned') ORDER BY created_at
+    ''')
+    open_tasks = [dict(zip(TASK_COLUMNS, row)) for row in cursor.fetchall()]
+    conn.close()
+    
+    adopted = 0
+    release_at = time.time() + RESUME_GRACE_SECONDS
+    for task in open_tasks:
+        if task['task_id'] in tasks:
+            continue
+        task['escalations'] = task['escalations'] or 0
+        if task['status'] == 'assigned' and task['assigned_to']:
+            # The assignee keeps the task if it re-registers within the resume grace period
+            task['pinned_to'] = ''
+            dispatcher.restore(task, agents.get(task['assigned_to'], {}).get('capabilities'))
+            release_wheel.schedule(task['assigned_to'], release_at)
+            tasks[task['task_id']] = task
+            state_backend.put('tasks', task['task_id'], task)
+        else:
+            # Pending rows store the pinned agent in assigned_to (see persist_task)
+            task['pinned_to'] = task['assigned_to'] or ''
+            apply_task_changes(dispatcher.submit(task))
+        track_deadline(task)
+        adopted += 1
+    # Agents connected to other workers are only known through the shared presence records
+    for agent in state_backend.values('agents'):
+        if agent.get('status') != 'offline':
+            agent_online(agent['agent_id'], agent.get('capabilities'))
+    logging.info(f"Adopted {adopted} of {len(open_tasks)} open tasks "
+                 f"({len(dispatcher.active)} held for their assignees), {len(deadline_wheel)} deadlines")
+
+def task_owner_loop():
+    """Keep this worker's leases fresh; takes over the tasks if the task owner dies"""
+    while True:
+        socketio.sleep(max(1, TASK_OWNER_LEASE_SECONDS // 3))
+        try:
+            claim_task_ownership()
+            if task_owner:
+                state_backend.put('task_stats', 'dispatcher', dispatcher.stats())
+        except Exception as e:
+            logging.error(f"Error renewing task ownership: {str(e)}")
+
+def task_command(op, *args):
+    """Run a dispatcher command on the task owner: here if this worker owns the tasks, else queued for it"""
+    if task_owner:
+        return TASK_COMMANDS[op](*args)
+    state_backend.push(TASK_COMMAND_QUEUE, [op, *args])
+    return None
+
+def task_command_loop():
+    """On the task owner, run the commands other workers queued (task creation, completion, membership)"""
+    while True:
+        socketio.sleep(TASK_COMMAND_POLL_SECONDS)
+        if not task_owner:
+            continue
+        try:
+            commands = state_backend.drain(TASK_COMMAND_QUEUE)
+        except Exception as e:
+            logging.error(f"Error reading task commands: {str(e)}")
+            continue
+        for op, *args in commands:
+            try:
+                TASK_COMMANDS[op](*args)
+            except Exception as e:
+                logging.error(f"Error running forwarded task command {op}: {str(e)}")
+
+def submit_task(task):
+    changed = dispatcher.submit(task)
+    apply_task_changes(changed)
+    track_deadline(task)
+    return changed
+
+def complete_assigned_task(task_id, agent_id, status):
+    changed = dispatcher.complete(task_id, agent_id, status)
+    apply_task_changes(changed)
+    return changed
+
+def request_completion(task_id, agent_id, status):
+    """Complete an assigned task; other workers check the owner's shared task record and queue it"""
+    if task_owner:
+        return complete_assigned_task(task_id, agent_id, status)[0]
+    task = state_backend.get('tasks', task_id)
+    if task is None or task['status'] != 'assigned':
+        raise KeyError(task_id)
+    if agent_id and task['assigned_to'] != agent_id:
+        raise ValueError(f"Task {task_id} is assigned to {task['assigned_to']}, not {agent_id}")
+    task_command('complete', task_id, agent_id, status)
+    return dict(task, status=status)
+
+def agent_online(agent_id, capabilities, refresh=True):
+    """An agent (on any worker) is online: it keeps its tasks and takes queued work"""
+    release_wheel.cancel(agent_id)
+    if refresh or dispatcher.load(agent_id) is None or dispatcher.is_suspended(agent_id):
+        apply_task_changes(dispatcher.add_agent(agent_id, capabilities))
+
+def agent_offline(agent_id):
+    """An agent went offline: no new work, and its tasks go back after the resume grace period"""
+    dispatcher.suspend(agent_id)
+    release_wheel.schedule(agent_id, time.time() + RESUME_GRACE_SECONDS)
+
+TASK_COMMANDS = {
+    'submit': submit_task,
+    'complete': complete_assigned_task,
+    'agent_online': agent_online,
+    'agent_offline': agent_offline,
+}
+
+def persist_agent_status(agent):
+    """Queue the agent's latest status row; repeated heartbeats coalesce into one write"""
+    persistence.enqueue_coalesced(('agent_status', agent['agent_id']), STATUS_UPDATE_SQL, (
+        agent.get('status'), agent.get('last_seen'), agent.get('current_task', ''), agent['agent_id']
+    ))
+
+def publish_presence(delta):
+    """Broadcast one presence change and persist the agent's status"""
+    persist_agent_status(delta['agent'])
+    # A server-level emit without a room already goes to every client
+    socketio.emit('presence_delta', delta)
+    update_dispatch_membership(delta['agent'])
+
+def update_dispatch_membership(agent):
+    """Offline agents stop taking work and hand their tasks back after the resume grace period"""
+    agent_id = agent['agent_id']
+    if agent.get('status') == 'offline':
+        sessions.mark_disconnected(agent_id)
+        task_command('agent_offline', agent_id)
+    elif agent_id in agents:
+        task_command('agent_online', agent_id, agents[agent_id].get('capabilities'), False)
+
+def release_agent_tasks(agent_id):
+    """Grace period over and the agent is still away (on every worker): requeue its tasks"""
+    if not presence.is_online(agent_id):
+        logging.info(f"Agent {agent_id} did not resume; releasing its tasks")
+        apply_task_changes(dispatcher.remove_agent(agent_id))
+
+def emit_to_agent(agent_id, event, data):
+    """Push an event to every socket of an agent, keeping it for replay if the agent resumes"""
+    socketio.emit(event, sessions.record(agent_id, event, data), room=agent_room(agent_id))
+
+def replay_missed_events(agent_id, sid, last_event_seq, disconnected_at):
+    """Resend what a resuming agent missed: its own events plus broadcasts since it dropped"""
+    replayed = 0
+    for event, data in sessions.missed(agent_id, last_event_seq):
+        socketio.emit(event, data, room=sid)
+        replayed += 1
+    if disconnected_at:
+        for message in list(message_history):
+            if message['to_agent'] == 'broadcast' and message['timestamp'] > disconnected_at:
+                socketio.emit('message_received', message, room=sid)
+                replayed += 1
+        for fragment in list(dream_fragments):
+            if fragment['timestamp'] > disconnected_at and fragment_topics.matches(sid, fragment):
+                socketio.emit('dream_fragment_added', fragment, room=sid)
+                replayed += 1
+    if replayed:
+        logging.info(f"Replayed {replayed} missed events to resuming agent {agent_id}")
+
+def refresh_liveness():
+    """Any traffic from an agent counts as a heartbeat, so busy agents never need to ping"""
+    agent_id = presence.agent_for_sid(request.sid)
+    if agent_id is not None:
+        delta = presence.touch(agent_id)
+        if delta:
+            publish_presence(delta)
+
+def persist_task(task):
+    persistence.enqueue(TASK_STATE_SQL, (
+        task['assigned_to'] or task.get('pinned_to', ''), task['status'], task.get('assigned_at'),
+        task.get('completed_at'), task.get('deadline', ''), task.get('escalations', 0), task['task_id']
+    ))
+
+def apply_task_changes(changed):
+    """Persist dispatcher decisions and push each new assignment to its agent only"""
+    for task in changed:
+        persist_task(task)
+        if task['status'] not in OPEN_TASK_STATUSES:
+            deadline_wheel.cancel(task['task_id'])
+            tasks.pop(task['task_id'], None)
+            state_backend.delete('tasks', task['task_id'])
+        else:
+            tasks[task['task_id']] = task
+            state_backend.put('tasks', task['task_id'], task)
+        if task['status'] == 'assigned':
+            emit_to_agent(task['assigned_to'], 'task_assigned', task)
+        socketio.emit('task_updated', task, room=DASHBOARD_ROOM)
+
+def presence_expiry_loop():
+    """Expire agents whose heartbeats stopped; each tick only touches due timers"""
+    while True:
+        socketio.sleep(1)
+        try:
+            for delta in presence.expire():
+                logging.info(f"Agent heartbeat expired: {delta['agent']['agent_id']}")
+                publish_presence(delta)
+        except Exception as e:
+            logging.error(f"Error expiring agent presence: {str(e)}")
+        for agent_id in release_wheel.advance(time.time()):
+            try:
+                release_agent_tasks(agent_id)
+            except Exception as e:
+                logging.error(f"Error releasing tasks of {agent_id}: {str(e)}")
+
+def deadline_timestamp(deadline):
+    """Epoch seconds for an ISO deadline, or None when there is none (or it cannot be parsed)"""
+    if not deadline:
+        return None
+    try:
+        return datetime.fromisoformat(deadline).timestamp()
+    except (TypeError, ValueError):
+        logging.warning(f"Ignoring unparseable task deadline: {deadline}")
+        return None
+
+def track_deadline(task):
+    """(Re)arm the deadline timer of an open task; O(1)"""
+    when = deadline_timestamp(task.get('deadline'))
+    if when is None or task['status'] not in OPEN_TASK_STATUSES:
+        deadline_wheel.cancel(task['task_id'])
+    else:
+        deadline_wheel.schedule(task['task_id'], when)
+
+def enforce_deadline(task_id):
+    """A task's deadline passed: reassign it to another agent with a grace period, or escalate"""
+    task = tasks.get(task_id)
+    if task is None or task['status'] not in OPEN_TASK_STATUSES:
+        return
+    task['escalations'] = (task.get('escalations') or 0) + 1
+    previous = task['assigned_to']
+    if (DEADLINE_ACTION == 'reassign' and task_id in dispatcher.active and not task.get('pinned_to')
+            and task['escalations'] <= MAX_DEADLINE_REASSIGNMENTS):
+        task['deadline'] = (datetime.now() + timedelta(seconds=DEADLINE_GRACE_SECONDS)).isoformat()
+        apply_task_changes(dispatcher.reassign(task_id))
+        track_deadline(task)
+        if task['assigned_to'] != previous:
+            emit_to_agent(previous, 'task_revoked', {'task_id': task_id, 'reason': 'deadline'})
+        logging.warning(f"Task {task_id} missed its deadline on {previous}; now {task['status']} "
+                        f"{task['assigned_to'] or 'in queue'}")
+        return
+    
+    # Out of reassignments (or escalate-only policy): tell the operators and the assignee
+    persist_task(task)
+    escalation = {'task_id': task_id, 'assigned_to': previous, 'priority': task['priority'],
+                  'deadline': task.get('deadline'), 'escalations': task['escalations']}
+    socketio.emit('task_escalated', escalation, room=DASHBOARD_ROOM)
+    socketio.emit('task_updated', task, room=DASHBOARD_ROOM)
+    if previous:
+        emit_to_agent(previous, 'task_escalated', escalation)
+    logging.warning(f"Task {task_id} escalated after missing its deadline ({task['escalations']})")
+
+def task_deadline_loop():
+    """Enforce task deadlines once a second without scanning the tasks table"""
+    while True:
+        socketio.sleep(1)
+        for task_id in deadline_wheel.advance(time.time()):
+            try:
+                enforce_deadline(task_id)
+            except Exception as e:
+                logging.error(f"Error enforcing deadline of {task_id}: {str(e)}")
+
+def fragment_page(before, limit):
+    """Fragments with fragment_seq < before (newest first), served from the ring when it covers the page
+
+    With several workers each ring only holds the fragments its own worker stored, so pages come from SQLite.
+    """
+    if not SHARED_STATE:
+        page = []
+        for fragment in reversed(dream_fragments):
+            if before is None or fragment['fragment_seq'] < before:
+                page.append(fragment)
+                if len(page) == limit:
+                    return page
+        if history_ready.is_set() and len(dream_fragments) < HISTORY_SIZE:
+            # The ring has never overflowed, so it already holds every fragment
+            return page
+    
+    conn = get_connection(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT {', '.join(FRAGMENT_COLUMNS)} FROM dream_fragments
+        WHERE fragment_seq < ? ORDER BY fragment_seq DESC LIMIT ?
+    ''', (before if before is not None else 2 ** 63 - 1, limit))
+    page = [dict(zip(FRAGMENT_COLUMNS, row)) for row in cursor.fetchall()]
+    conn.close()
+    return page
+
 # REST API Endpoints
 @app.route('/api/agents', methods=['GET'])
 def get_agents():
-    """Get all registered agents"""
+    """Page through registered agents by agent_id; filters capability=, status=, fields=a,b,c
+    
+    X-Next-Cursor is the 'after' value for the next page.
+    """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        limit = max(1, min(request.args.get('limit', PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+        fields = [f for f in request.args.get('fields', '').split(',') if f] or list(AGENT_COLUMNS)
+        unknown = [f for f in fields if f not in AGENT_COLUMNS]
+        if unknown:
+            return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+        columns = fields if 'agent_id' in fields else ['agent_id'] + fields
+        
+        joins, clauses, params = '', [], []
+        if request.args.get('capability'):
+            # Seek on the (capability, agent_id) primary key instead of parsing every JSON blob
+            joins = 'JOIN agent_capabilities c ON c.agent_id = a.agent_id AND c.capability = ?'
+            params.append(request.args['capability'])
+        if request.args.get('status'):
+            clauses.append('a.status = ?')
+            params.append(request.args['status'])
+        if request.args.get('after'):
+            clauses.append('a.agent_id > ?')
+            params.append(request.args['after'])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM agents')
+        cursor.execute(f'''
+            SELECT {', '.join('a.' + column for column in columns)} FROM agents a {joins} {where}
+            ORDER BY a.agent_id LIMIT ?
+        ''', params + [limit])
         agents_data = []
         for row in cursor.fetchall():
-            agents_data.append({
-                'agent_id': row[0],
-                'agent_name': row[1],
-                'capabilities': row[2],
-                'status': row[3],
-                'last_seen': row[4],
-                'understanding_score': row[5],
-                'alignment_score': row[6],
-                'current_task': row[7]
-            })
+            agent = dict(zip(columns, row))
+            last_agent_id = agent['agent_id']
+            if 'capabilities' in agent:
+                agent['capabilities'] = json.loads(agent['capabilities'] or '[]')
+            agents_data.append({field: agent[field] for field in fields})
         conn.close()
-        return jsonify(agents_data)
+        
+        response = jsonify(agents_data)
+        if len(agents_data) == limit:
+            response.headers['X-Next-Cursor'] = last_agent_id
+        return response
     except Exception as e:
         logging.error(f"Error fetching agents: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -128,21 +683,10 @@ def get_agents():
 def get_tasks():
     """Get all tasks"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM tasks')
-        tasks_data = []
-        for row in cursor.fetchall():
-            tasks_data.append({
-                'task_id': row[0],
-                'task_type': row[1],
-                'description': row[2],
-                'assigned_to': row[3],
-                'priority': row[4],
-                'status': row[5],
-                'created_at': row[6],
-                'deadline': row[7]
-            })
+        cursor.execute(f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks")
+        tasks_data = [dict(zip(TASK_COLUMNS, row)) for row in cursor.fetchall()]
         conn.close()
         return jsonify(tasks_data)
     except Exception as e:
@@ -154,93 +698,221 @@ def create_task():
     """Create a new task"""
     try:
         data = request.json
-        task_id = f"TASK_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        task_id = f"TASK_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        
+        task = {
+            'task_id': task_id,
+            'task_type': data.get('task_type', 'general'),
+            'description': data.get('description', ''),
+            'assigned_to': '',
+            'pinned_to': data.get('assigned_to', ''),
+            'required_capability': data.get('required_capability', ''),
+            'priority': normalize_priority(data.get('priority')),
+            'status': 'pending',
+            'created_at': datetime.now().isoformat(),
+            'deadline': data.get('deadline', ''),
+            'escalations': 0
+        }
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
         cursor.execute('''
-            INSERT INTO tasks (task_id, task_type, description, assigned_to, priority, status, created_at, deadline)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO tasks (task_id, task_type, description, assigned_to, priority, status, created_at, deadline,
+                               required_capability)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             task_id,
-            data.get('task_type', 'general'),
-            data.get('description', ''),
-            data.get('assigned_to', ''),
-            data.get('priority', 'medium'),
-            'pending',
-            datetime.now().isoformat(),
-            data.get('deadline', '')
+            task['task_type'],
+            task['description'],
+            task['pinned_to'],
+            task['priority'],
+            task['status'],
+            task['created_at'],
+            task['deadline'],
+            task['required_capability']
         ))
         conn.commit()
         conn.close()
         
-        # Emit task creation event
-        socketio.emit('task_created', {
-            'task_id': task_id,
-            'task_type': data.get('task_type'),
-            'description': data.get('description'),
-            'assigned_to': data.get('assigned_to'),
-            'priority': data.get('priority')
-        }, broadcast=True)
+        # Assign (or queue) the task; only the assignee and dashboards hear about it
+        socketio.emit('task_created', task, room=DASHBOARD_ROOM)
+        if task_command('submit', task) is None:
+            # Queued for the task owner, which assigns it shortly
+            return jsonify({'task_id': task_id, 'status': 'pending', 'assigned_to': ''}), 202
         
-        return jsonify({'task_id': task_id, 'status': 'created'}), 201
+        return jsonify({'task_id': task_id, 'status': task['status'], 'assigned_to': task['assigned_to']}), 201
     except Exception as e:
         logging.error(f"Error creating task: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/tasks/<task_id>/complete', methods=['POST'])
+def complete_task(task_id):
+    """Mark an assigned task completed (or failed) and free the agent for queued work"""
+    try:
+        data = request.json or {}
+        status = data.get('status', 'completed')
+        if status not in ('completed', 'failed'):
+            return jsonify({'error': 'status must be completed or failed'}), 400
+        owner = task_owner
+        task = request_completion(task_id, data.get('agent_id'), status)
+        return jsonify(task), 200 if owner else 202
+    except KeyError:
+        return jsonify({'error': f'Task {task_id} is not assigned'}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
+    except Exception as e:
+        logging.error(f"Error completing task: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/tasks/queue', methods=['GET'])
+def get_task_queue():
+    """Queue depth per priority, per-agent load and capable agents per capability"""
+    if not task_owner:
+        # Published by the task owner every few seconds
+        return jsonify(state_backend.get('task_stats', 'dispatcher') or {})
+    return jsonify(dispatcher.stats())
+
+MESSAGE_COLUMNS = ('message_id', 'from_agent', 'to_agent', 'message_type', 'content', 'timestamp')
+MESSAGE_FILTERS = (('from_agent', 'from_agent = ?'), ('to_agent', 'to_agent = ?'),
+                   ('message_type', 'message_type = ?'), ('since', 'timestamp >= ?'), ('until', 'timestamp < ?'))
+
+def encode_message_cursor(message):
+    return base64.urlsafe_b64encode(f"{message['timestamp']}|{message['message_id']}".encode()).decode()
+
+def decode_message_cursor(cursor_value):
+    timestamp, message_id = base64.urlsafe_b64decode(cursor_value.encode()).decode().rsplit('|', 1)
+    return timestamp, int(message_id)
+
+@app.route('/api/messages', methods=['GET'])
+def get_messages():
+    """Page through persisted messages, newest first; X-Next-Cursor is the 'cursor' value for the next page"""
+    try:
+        limit = max(1, min(request.args.get('limit', PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+        clauses, params = [], []
+        for arg, clause in MESSAGE_FILTERS:
+            value = request.args.get(arg)
+            if value:
+                clauses.append(clause)
+                params.append(value)
+        if request.args.get('cursor'):
+            # Keyset pagination: continue strictly after the last row of the previous page
+            try:
+                clauses.append('(timestamp, message_id) < (?, ?)')
+                params.extend(decode_message_cursor(request.args['cursor']))
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        
+        conn = get_connection(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT {', '.join(MESSAGE_COLUMNS)} FROM messages {where}
+            ORDER BY timestamp DESC, message_id DESC LIMIT ?
+        ''', params + [limit])
+        messages = [dict(zip(MESSAGE_COLUMNS, row)) for row in cursor.fetchall()]
+        conn.close()
+        
+        response = jsonify(messages)
+        if len(messages) == limit:
+            response.headers['X-Next-Cursor'] = encode_message_cursor(messages[-1])
+        return response
+    except Exception as e:
+        logging.error(f"Error fetching messages: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/dream_fragments', methods=['GET'])
 def get_dream_fragments():
-    """Get all dream fragments"""
-    return jsonify(dream_fragments)
+    """Get a page of dream fragments (oldest first); X-Next-Cursor is the 'before' value for the next page"""
+    try:
+        limit = max(1, min(request.args.get('limit', PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+        before = request.args.get('before', type=int)
+        page = fragment_page(before, limit)
+        response = jsonify(list(reversed(page)))
+        if len(page) == limit:
+            response.headers['X-Next-Cursor'] = str(page[-1]['fragment_seq'])
+        return response
+    except Exception as e:
+        logging.error(f"Error fetching dream fragments: {str(e)}")
+        return jsonify({'error': str(e)}), 500
 
 @app.route('/api/dream_fragments', methods=['POST'])
 def add_dream_fragment():
     """Add a new dream fragment"""
     try:
-        data = request.json
-        fragment_id = f"DREAM_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
-        fragment = {
-            'fragment_id': fragment_id,
-            'agent_id': data.get('agent_id'),
-            'summary': data.get('summary', ''),
-            'symbols': data.get('symbols', ''),
-            'themes': data.get('themes', ''),
-            'ai_connection': data.get('ai_connection', ''),
-            'emotional_vibe': data.get('emotional_vibe', ''),
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        dream_fragments.append(fragment)
-        
-        # Emit dream fragment event
-        socketio.emit('dream_fragment_added', fragment, broadcast=True)
-        
-        return jsonify(fragment), 201
+        return jsonify(store_dream_fragment(request.json)), 201
     except Exception as e:
         logging.error(f"Error adding dream fragment: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def store_dream_fragment(data):
+    """Persist a fragment, add it to the history ring and announce it"""
+    fragment_id = f"DREAM_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    
+    fragment = {
+        'fragment_id': fragment_id,
+        'agent_id': data.get('agent_id'),
+        'summary': data.get('summary', ''),
+        'symbols': data.get('symbols', ''),
+        'themes': data.get('themes', ''),
+        'ai_connection': data.get('ai_connection', ''),
+        'emotional_vibe': data.get('emotional_vibe', ''),
+        'timestamp': datetime.now().isoformat()
+    }
+    
+    conn = get_connection(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO dream_fragments
+        (fragment_id, agent_id, summary, symbols, themes, ai_connection, emotional_vibe, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', tuple(fragment[column] for column in FRAGMENT_COLUMNS[1:]))
+    fragment['fragment_seq'] = cursor.lastrowid
+    conn.commit()
+    conn.close()
+    
+    dream_fragments.append(fragment)
+    
+    publish_dream_fragment(fragment)
+    return fragment
+
+def publish_dream_fragment(fragment):
+    """Fan a fragment out to unfiltered sockets and to subscribers of its topics, on every worker"""
+    rooms = fragment_rooms(fragment)
+    # One emit to all the rooms reaches each socket once, however many of its topics match
+    socketio.emit('dream_fragment_added', fragment, room=rooms)
+    FRAGMENT_DELIVERIES.inc(route='topic' if len(rooms) > 1 else 'all')
+
 # WebSocket Event Handlers
 @socketio.on('connect')
-def handle_connect():
-    """Handle client connection"""
+@timed_event('connect')
+def handle_connect(auth=None):
+    """Handle client connection; agents that offer codecs get batched event framing"""
     logging.info(f"Client connected: {request.sid}")
-    emit('connected', {'message': 'Connected to Web Node Server'})
+    response = {'message': 'Connected to Web Node Server'}
+    codec = choose_codec((auth or {}).get('codecs')) if EVENT_BATCHING else None
+    if codec:
+        envelope_codecs[request.sid] = codec
+        response['envelope'] = {'codec': codec, 'max_events': BATCH_MAX_EVENTS, 'max_delay_ms': BATCH_MAX_DELAY_MS}
+    # Agents ping only when idle, a few times per TTL
+    response['heartbeat'] = {'presence_ttl': PRESENCE_TTL, 'ping_interval': max(1, PRESENCE_TTL // 3)}
+    # Every socket starts unfiltered, receiving all fragments until it subscribes to topics
+    join_room(ALL_FRAGMENTS_ROOM)
+    emit('connected', response)
 
 @socketio.on('disconnect')
+@timed_event('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
     logging.info(f"Client disconnected: {request.sid}")
-    # Update agent status to offline
-    for agent_id, agent_data in agents.items():
-        if agent_data.get('socket_id') == request.sid:
-            agent_data['status'] = 'offline'
-            agent_data['last_seen'] = datetime.now().isoformat()
-            socketio.emit('agent_status_updated', agent_data, broadcast=True)
-            break
+    envelope_codecs.pop(request.sid, None)
+    fragment_topics.unsubscribe(request.sid)
+    # Agent goes offline once its last socket is gone
+    delta = presence.detach(request.sid)
+    if delta:
+        publish_presence(delta)
 
 @socketio.on('agent_register')
+@timed_event('agent_register')
 def handle_agent_register(data):
     """Handle agent registration"""
     try:
@@ -253,21 +925,41 @@ def handle_agent_register(data):
             'last_seen': datetime.now().isoformat(),
             'understanding_score': data.get('understanding_score', 0),
             'alignment_score': data.get('alignment_score', 0),
-            'current_task': data.get('current_task', ''),
-            'socket_id': request.sid
+            'current_task': data.get('current_task', '')
         }
         
-        agents[agent_id] = agent_data
+        # A valid resume token continues the previous session: same token, missed events replayed
+        resumed = sessions.verify(agent_id, data.get('resume_token'))
+        disconnected_at = sessions.resume(agent_id)
+        resume_token = data['resume_token'] if resumed else sessions.issue(agent_id)
         
-        # Save to database
-        conn = sqlite3.connect(DB_PATH)
+        sid = request.sid
+        if 'fragment_topics' in data:
+            # Applied before replay so a resuming agent only gets the fragments it asked for
+            apply_fragment_subscription(sid, data['fragment_topics'])
+        delta = presence.attach(agent_data, sid)
+        join_room(agent_room(agent_id))
+        emit('presence_snapshot', presence.snapshot())
+        socketio.emit('presence_delta', delta)
+        task_command('agent_online', agent_id, agent_data['capabilities'])
+        
+        # Save to database off the event path; the registration ack follows the commit
+        io_pool.submit('agent_register', save_agent, agent_data, sid, resume_token, resumed, sessions.epoch(agent_id))
+        if resumed:
+            replay_missed_events(agent_id, sid, int(data.get('last_event_seq', 0)), disconnected_at)
+        send_mailbox_page(agent_id, sid)
+        
+    except Exception as e:
+        logging.error(f"Error registering agent: {str(e)}")
+        emit('agent_registered', {'agent_id': data.get('agent_id'), 'status': 'error', 'error': str(e)})
+
+def save_agent(agent_data, sid, resume_token=None, resumed=False, session=None):
+    """Write the registration row and acknowledge it (runs on the I/O pool)"""
+    try:
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO agents 
-            (agent_id, agent_name, capabilities, status, last_seen, understanding_score, alignment_score, current_task)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            agent_id,
+        cursor.execute(AGENT_UPSERT_SQL, (
+            agent_data['agent_id'],
             agent_data['agent_name'],
             json.dumps(agent_data['capabilities']),
             agent_data['status'],
@@ -276,53 +968,45 @@ def handle_agent_register(data):
             agent_data['alignment_score'],
             agent_data['current_task']
         ))
+        cursor.execute('DELETE FROM agent_capabilities WHERE agent_id = ?', (agent_data['agent_id'],))
+        cursor.executemany('INSERT OR IGNORE INTO agent_capabilities (capability, agent_id) VALUES (?, ?)',
+                           [(capability, agent_data['agent_id']) for capability in agent_data['capabilities']])
         conn.commit()
         conn.close()
-        
-        emit('agent_registered', {'agent_id': agent_id, 'status': 'success'})
-        emit('agent_list_updated', list(agents.values()), broadcast=True)
-        logging.info(f"Agent registered: {agent_id}")
-        
+        socketio.emit('agent_registered', {'agent_id': agent_data['agent_id'], 'status': 'success',
+                                           'resume_token': resume_token, 'resumed': resumed,
+                                           'session': session}, room=sid)
+        logging.info(f"Agent registered: {agent_data['agent_id']}")
     except Exception as e:
-        logging.error(f"Error registering agent: {str(e)}")
-        emit('agent_registered', {'agent_id': data.get('agent_id'), 'status': 'error', 'error': str(e)})
+        logging.error(f"Error saving agent: {str(e)}")
+        socketio.emit('agent_registered', {'agent_id': agent_data['agent_id'], 'status': 'error', 'error': str(e)},
+                      room=sid)
 
 @socketio.on('status_update')
+@timed_event('status_update')
 def handle_status_update(data):
     """Handle agent status update"""
     try:
         agent_id = data['agent_id']
         if agent_id in agents:
-            agents[agent_id].update(data)
-            agents[agent_id]['last_seen'] = datetime.now().isoformat()
-            
-            # Update database
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute('''
-                UPDATE agents 
-                SET status = ?, last_seen = ?, current_task = ?
-                WHERE agent_id = ?
-            ''', (
-                data.get('status', agents[agent_id]['status']),
-                agents[agent_id]['last_seen'],
-                data.get('current_task', agents[agent_id]['current_task']),
-                agent_id
-            ))
-            conn.commit()
-            conn.close()
-            
-            emit('status_updated', data, broadcast=True)
-            logging.info(f"Status updated for agent: {agent_id}")
+            # Heartbeats that change nothing only refresh the TTL; changes go out as one delta
+            delta = presence.touch(agent_id, {k: v for k, v in data.items() if k != 'agent_id'})
+            if delta:
+                publish_presence(delta)
+            else:
+                persist_agent_status(agents[agent_id])
+            logging.debug(f"Status updated for agent: {agent_id}")
         
     except Exception as e:
         logging.error(f"Error updating status: {str(e)}")
         emit('status_update_error', {'error': str(e)})
 
 @socketio.on('send_message')
+@timed_event('send_message')
 def handle_send_message(data):
     """Handle message sending between agents"""
     try:
+        refresh_liveness()
         message = {
             'message_id': f"MSG_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
             'from_agent': data['from_agent'],
@@ -333,9 +1017,7 @@ def handle_send_message(data):
         }
         
         # Save to database
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute('''
+        persistence.enqueue('''
             INSERT INTO messages (from_agent, to_agent, message_type, content, timestamp)
             VALUES (?, ?, ?, ?, ?)
         ''', (
@@ -345,17 +1027,16 @@ def handle_send_message(data):
             message['content'],
             message['timestamp']
         ))
-        conn.commit()
-        conn.close()
         
         # Send to specific agent or broadcast
         if data['to_agent'] == 'broadcast':
             emit('message_received', message, broadcast=True)
         else:
-            # Find target agent's socket and send message
-            target_agent = agents.get(data['to_agent'])
-            if target_agent and 'socket_id' in target_agent:
-                emit('message_received', message, room=target_agent['socket_id'])
+            message = mailbox.store(data['to_agent'], message)
+            # Every socket of the target agent is in its agent room, on whichever worker holds it;
+            # sent even during a backlog replay, the client dedupes by delivery_seq and resyncs after it
+            if presence.is_online(data['to_agent']):
+                emit('message_received', message, room=agent_room(data['to_agent']))
         
         message_history.append(message)
         logging.info(f"Message sent from {data['from_agent']} to {data['to_agent']}")
@@ -364,7 +1045,139 @@ def handle_send_message(data):
         logging.error(f"Error sending message: {str(e)}")
         emit('message_error', {'error': str(e)})
 
+def send_mailbox_page(agent_id, sid, after_seq=None):
+    """Send the next page of an agent's backlog from the I/O pool; the agent's ack pulls the following page"""
+    # Acks keep pulling pages until the query finds nothing more
+    mailbox.replaying.add(agent_id)
+    
+    def deliver(page):
+        messages, last_seq, more = page
+        socketio.emit('message_batch', {'messages': messages, 'last_seq': last_seq, 'more': more}, room=sid)
+    
+    io_pool.submit('mailbox_page', mailbox.next_page, agent_id, after_seq, on_done=deliver)
+
+@socketio.on('message_ack')
+@timed_event('message_ack')
+def handle_message_ack(data):
+    """Cumulative ack of delivery seqs; continues a replay that is in progress"""
+    try:
+        refresh_liveness()
+        agent_id = data['agent_id']
+        seq = int(data['seq'])
+        mailbox.ack(agent_id, seq)
+        if agent_id in mailbox.replaying:
+            send_mailbox_page(agent_id, request.sid, seq)
+    except Exception as e:
+        logging.error(f"Error acknowledging messages: {str(e)}")
+        emit('message_error', {'error': str(e)})
+
+@socketio.on('mailbox_sync')
+@timed_event('mailbox_sync')
+def handle_mailbox_sync(data):
+    """Client saw a gap in delivery seqs; resend from its last processed seq"""
+    try:
+        send_mailbox_page(data['agent_id'], request.sid, int(data.get('after_seq', 0)))
+    except Exception as e:
+        logging.error(f"Error syncing mailbox: {str(e)}")
+        emit('message_error', {'error': str(e)})
+
+@socketio.on('task_complete')
+@timed_event('task_complete')
+def handle_task_complete(data):
+    """Agent finished (or failed) an assigned task"""
+    try:
+        status = data.get('status', 'completed')
+        if status not in ('completed', 'failed'):
+            status = 'failed'
+        request_completion(data['task_id'], data.get('agent_id'), status)
+        logging.info(f"Task {data['task_id']} {status} by {data.get('agent_id')}")
+    except (KeyError, ValueError) as e:
+        emit('task_error', {'task_id': data.get('task_id'), 'error': str(e)})
+    except Exception as e:
+        logging.error(f"Error completing task: {str(e)}")
+        emit('task_error', {'task_id': data.get('task_id'), 'error': str(e)})
+
+@socketio.on('agent_ping')
+@timed_event('agent_ping')
+def handle_agent_ping(data=None):
+    """Liveness only: refreshes the presence TTL without touching the database"""
+    refresh_liveness()
+
+@socketio.on('dream_fragment')
+@timed_event('dream_fragment')
+def handle_dream_fragment(data):
+    """Dream fragment submitted over the socket; stored on the I/O pool like other writes"""
+    refresh_liveness()
+    io_pool.submit('dream_fragment', store_dream_fragment, data)
+
+@socketio.on('event_batch')
+@timed_event('event_batch')
+def handle_event_batch(payload):
+    """Unpack a batched frame and run each event through its normal handler, in order"""
+    codec = envelope_codecs.get(request.sid)
+    if codec is None:
+        emit('envelope_error', {'error': 'No event envelope negotiated for this connection'})
+        return
+    try:
+        events = decode_batch(payload, codec)
+    except Exception as e:
+        logging.error(f"Error decoding event batch: {str(e)}")
+        emit('envelope_error', {'error': str(e)})
+        return
+    ENVELOPE_FRAMES.inc(codec=codec)
+    ENVELOPE_EVENTS.inc(len(events), codec=codec)
+    ENVELOPE_BYTES.inc(len(payload), codec=codec)
+    for index, (event, data) in enumerate(events):
+        handler = BATCHED_HANDLERS.get(event)
+        # One bad item is reported on its own; the rest of the frame still runs
+        if handler is None:
+            emit('envelope_error', {'error': f'Event {event} cannot be batched', 'index': index, 'event': event})
+            continue
+        try:
+            handler(data)
+        except Exception as e:
+            logging.error(f"Error in batched {event} event: {str(e)}")
+            emit('envelope_error', {'error': str(e), 'index': index, 'event': event})
+
+@socketio.on('presence_snapshot_request')
+@timed_event('presence_snapshot_request')
+def handle_presence_snapshot_request(data=None):
+    """Send the full presence state to a client that detected a gap in delta versions"""
+    emit('presence_snapshot', presence.snapshot())
+
+def apply_fragment_subscription(sid, filters):
+    """Move sid into its topics' rooms; empty filters mean every fragment again"""
+    previous = fragment_topics.topics_of(sid)
+    topics = fragment_topics.subscribe(sid, filters)
+    for topic in previous - topics:
+        leave_room(topic_room(topic), sid=sid)
+    for topic in topics - previous:
+        join_room(topic_room(topic), sid=sid)
+    if topics:
+        leave_room(ALL_FRAGMENTS_ROOM, sid=sid)
+    else:
+        join_room(ALL_FRAGMENTS_ROOM, sid=sid)
+    return topics
+
+@socketio.on('subscribe_fragments')
+@timed_event('subscribe_fragments')
+def handle_subscribe_fragments(data):
+    """Set this socket's dream fragment filters: {'tags': [...], 'themes': [...], 'emotional_vibe': [...]}"""
+    try:
+        topics = apply_fragment_subscription(request.sid, data or {})
+        emit('fragments_subscribed', {'status': 'success', 'topics': sorted(f'{field}:{value}' for field, value in topics)})
+    except ValueError as e:
+        emit('fragments_subscribed', {'status': 'error', 'error': str(e)})
+
+@socketio.on('unsubscribe_fragments')
+@timed_event('unsubscribe_fragments')
+def handle_unsubscribe_fragments(data=None):
+    """Drop this socket's filters; it receives every fragment again"""
+    apply_fragment_subscription(request.sid, {})
+    emit('fragments_subscribed', {'status': 'success', 'topics': []})
+
 @socketio.on('join_room')
+@timed_event('join_room')
 def handle_join_room(data):
     """Handle joining a room"""
     room = data['room']
@@ -373,6 +1186,7 @@ def handle_join_room(data):
     logging.info(f"Client {request.sid} joined room: {room}")
 
 @socketio.on('leave_room')
+@timed_event('leave_room')
 def handle_leave_room(data):
     """Handle leaving a room"""
     room = data['room']
@@ -380,6 +1194,13 @@ def handle_leave_room(data):
     emit('left_room', {'room': room})
     logging.info(f"Client {request.sid} left room: {room}")
 
+BATCHED_HANDLERS = {
+    'status_update': handle_status_update,
+    'send_message': handle_send_message,
+    'dream_fragment': handle_dream_fragment,
+    'message_ack': handle_message_ack,
+}
+
 # Dashboard route
 @app.route('/dashboard')
 def dashboard():
@@ -393,15 +1214,38 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'agents_count': len(agents),
-        'tasks_count': len(tasks),
-        'dream_fragments_count': len(dream_fragments)
+        'agents_count': state_backend.count('agents'),
+        'tasks_count': state_backend.count('tasks'),
+        'dream_fragments_count': len(dream_fragments),
+        'ready': history_ready.is_set()
     })
 
+@app.route('/ready')
+def readiness_check():
+    """Readiness probe: 503 until the warm start has finished loading history"""
+    if not history_ready.is_set():
+        return jsonify({'status': 'warming', 'agents_count': len(agents), 'tasks_count': len(tasks)}), 503
+    return jsonify({'status': 'ready', 'agents_count': len(agents), 'tasks_count': len(tasks)})
+
 if __name__ == '__main__':
     # Initialize database
     init_database()
+    # Agents and open tasks are small and needed by the first request; history fills in behind
+    hydrate_registry()
+    persistence.start()
+    socketio.start_background_task(task_owner_loop)
+    socketio.start_background_task(task_command_loop)
+    socketio.start_background_task(load_recent_history)
+    socketio.start_background_task(presence_expiry_loop)
+    socketio.start_background_task(task_deadline_loop)
+    atexit.register(log_listener.stop)
+    atexit.register(persistence.stop)
+    atexit.register(io_pool.shutdown)
+    if TRAFFIC_LOG:
+        recorder = TrafficRecorder(os.path.join(BASE_DIR, TRAFFIC_LOG))
+        recorder.attach(socketio, request)
+        atexit.register(recorder.stop)
     
     # Start the server
     logging.info("Starting Web Node Server...")
-    socketio.run(app, debug=True, host='0.0.0.0', port=5001)
+    socketio.run(app, debug=True, host='0.0.0.0', port=SERVER_PORT)
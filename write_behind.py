@@ -0,0 +1,162 @@
+# ID: [WOLFIE_AGI_UI_WRITE_BEHIND_20250923_001]
+# SUPERPOSITIONALLY: [dream_data_analysis, quantum_tabs, multi_agent_coordination, bridge_crew_tracking, web_node_system, database, performance]
+# DATE: 2025-09-23
+# TITLE: write_behind.py — Write-behind SQLite Persistence Pipeline
+# WHO: WOLFIE (Eric) - Project Architect & Dream Architect
+# WHAT: Bounded queue that batches writes into group commits and coalesces repeated per-key updates
+# WHERE: C:\START\WOLFIE_AGI_UI\
+# WHEN: 2025-09-23, 11:00 AM CDT (Sioux Falls Timezone)
+# WHY: Keep Socket.IO handler latency independent of disk latency (no fsync per heartbeat)
+# HOW: Writer thread drains the queue every few milliseconds into one transaction; producers block briefly when full
+# HELP: Contact WOLFIE for persistence or durability questions
+# AGAPE: Love, patience, kindness, humility in multi-agent collaboration
+
+import queue
+import time
+import logging
+import threading
+from db_connection import get_connection
+from service_metrics import REGISTRY
+
+WRITE_BATCH_SIZE = REGISTRY.histogram(
+    'write_behind_batch_size', 'Statements committed per group commit', ('queue',),
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000))
+WRITE_FLUSH_SECONDS = REGISTRY.histogram(
+    'write_behind_flush_duration_seconds', 'Time spent in one group commit', ('queue',))
+WRITE_BACKPRESSURE = REGISTRY.counter(
+    'write_behind_backpressure_total', 'Writes done inline because the queue stayed full', ('queue',))
+WRITE_FAILURES = REGISTRY.counter(
+    'write_behind_failed_writes_total', 'Statements that failed even when retried on their own', ('queue',))
+
+
+class WriteBehindQueue:
+    """Batches (sql, params) writes into group commits on a background thread"""
+
+    def __init__(self, db_path, name='default', max_queue=10000, flush_interval=0.005,
+                 max_batch=500, put_timeout=0.05):
+        self.db_path = db_path
+        self.name = name
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._coalesced = {}
+        self._coalesced_lock = threading.Lock()
+        self._running = False
+        self._thread = None
+        REGISTRY.gauge('write_behind_queue_depth', 'Writes waiting for the next group commit', ('queue',),
+                       callback=self.depth, labels={'queue': name})
+
+    def depth(self):
+        return self._queue.qsize() + len(self._coalesced)
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f'write-behind-{self.name}', daemon=True)
+        self._thread.start()
+        logging.info(f"Write-behind queue '{self.name}' started")
+
+    def stop(self):
+        """Stop the writer and flush everything still pending"""
+        if not self._running:
+            return
+        self._running = False
+        self._thread.join()
+        self.flush()
+        logging.info(f"Write-behind queue '{self.name}' stopped and flushed")
+
+    def enqueue(self, sql, params):
+        """Queue a write; blocks briefly when full, then falls back to writing inline"""
+        if not self._running:
+            self._write([(sql, params)])
+            return
+        try:
+            self._queue.put((sql, params), timeout=self.put_timeout)
+        except queue.Full:
+            WRITE_BACKPRESSURE.inc(queue=self.name)
+            self._write([(sql, params)])
+
+    def enqueue_coalesced(self, key, sql, params):
+        """Queue a write that supersedes any pending write with the same key (e.g. one agent's status)"""
+        if not self._running:
+            self._write([(sql, params)])
+            return
+        with self._coalesced_lock:
+            self._coalesced[key] = (sql, params)
+
+    def _drain(self):
+        batch = []
+        try:
+            while len(batch) < self.max_batch:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        with self._coalesced_lock:
+            # Coalesced writes go last so they win over queued writes to the same row
+            coalesced, self._coalesced = self._coalesced, {}
+        batch.extend(coalesced.values())
+        return batch
+
+    def flush(self):
+        """Commit everything pending right now"""
+        batch = self._drain()
+        while batch:
+            self._write(batch)
+            batch = self._drain()
+
+    def _run(self):
+        while self._running:
+            time.sleep(self.flush_interval)
+            batch = self._drain()
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        start = time.perf_counter()
+        conn = None
+        try:
+            conn = get_connection(self.db_path)
+            try:
+                self._write_batch(conn, batch)
+            except Exception as e:
+                conn.rollback()
+                # One bad statement must not take the rest of the batch down with it
+                logging.warning(f"Write-behind flush '{self.name}' failed ({len(batch)} writes), "
+                                f"retrying one by one: {str(e)}")
+                self._write_each(conn, batch)
+        except Exception as e:
+            WRITE_FAILURES.inc(len(batch), queue=self.name)
+            logging.error(f"Error in write-behind flush '{self.name}' ({len(batch)} writes): {str(e)}")
+        finally:
+            if conn is not None:
+                conn.close()
+            WRITE_BATCH_SIZE.observe(len(batch), queue=self.name)
+            WRITE_FLUSH_SECONDS.observe(time.perf_counter() - start, queue=self.name)
+
+    def _write_batch(self, conn, batch):
+        """Commit the whole batch as one transaction"""
+        cursor = conn.cursor()
+        # Group consecutive statements with the same SQL so each run becomes one executemany
+        run_sql, run_params = None, []
+        for sql, params in batch:
+            if sql != run_sql and run_params:
+                cursor.executemany(run_sql, run_params)
+                run_params = []
+            run_sql = sql
+            run_params.append(params)
+        if run_params:
+            cursor.executemany(run_sql, run_params)
+        conn.commit()
+
+    def _write_each(self, conn, batch):
+        """Commit statements individually, keeping every one that succeeds"""
+        for sql, params in batch:
+            try:
+                conn.execute(sql, params)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                WRITE_FAILURES.inc(queue=self.name)
+                logging.error(f"Dropped write-behind statement in '{self.name}': {str(e)} -- {sql.strip()[:80]} {params}")